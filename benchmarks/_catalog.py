@@ -0,0 +1,65 @@
+# benchmarks/_catalog.py
+"""
+Synthetic catalog shared by the benchmark scripts.
+"""
+import os
+import random
+import sys
+from typing import Any, Dict, List
+
+# Add project root to PYTHONPATH (same as tests/conftest.py)
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root not in sys.path:
+    sys.path.insert(0, root)
+
+from src.models import ProductModel  # noqa: E402
+
+INGREDIENTS = [
+    "Vitamin C", "Hyaluronic Acid", "Glycerin", "Niacinamide", "Retinol", "Squalane",
+    "Ceramides", "Peptides", "Salicylic Acid", "Zinc Oxide", "Aloe Vera", "Green Tea Extract",
+] + [f"Botanical Extract {i}" for i in range(200)]
+BENEFITS = [
+    "Brightening", "Hydration", "Fades dark spots", "Anti-aging", "Soothing", "Oil control",
+    "Barrier repair", "Sun protection",
+]
+
+
+def synthetic_products(n: int, seed: int = 7) -> List[ProductModel]:
+    rnd = random.Random(seed)
+    products = []
+    for i in range(n):
+        products.append(ProductModel.from_dict({
+            "product_id": f"sku-{i:07d}",
+            "name": f"Product {i}",
+            "description": rnd.choice(["", f"A lightweight {rnd.choice([5, 10, 15])}% serum."]),
+            "price": {"amount": rnd.choice([0, 299, 499, 699, 999, 1299]), "currency": rnd.choice(["INR", "USD"])},
+            "ingredients": rnd.sample(INGREDIENTS, rnd.randint(1, 8)),
+            "benefits": rnd.sample(BENEFITS, rnd.randint(0, 4)),
+            "how_to_use": rnd.choice(["", "Apply 2-3 drops in the morning."]),
+            "side_effects": rnd.choice(["", "Mild tingling in some users."]),
+            "metadata": {"source": "benchmark", "ingested_at": "2025-01-01T00:00:00+00:00"},
+        }))
+    return products
+
+
+def synthetic_facts(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    from src.agents.facts_extractor_agent import extract_facts
+    return [extract_facts(p) for p in synthetic_products(n, seed)]
+
+
+def synthetic_artifacts(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Rendered artifacts per product, keyed like the output files (product_page, faq, comparison_page).
+    """
+    from src.agents.comparison_agent import build_fictional_product_b, compare_products
+    from src.agents.question_generator_agent import generate_questions
+    from src.agents.template_engine_agent import render_faq, render_product_page
+
+    return [
+        {
+            "product_page": render_product_page(f),
+            "faq": render_faq(generate_questions(f), f),
+            "comparison_page": compare_products(f, build_fictional_product_b(f)),
+        }
+        for f in synthetic_facts(n, seed)
+    ]
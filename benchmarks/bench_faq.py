@@ -0,0 +1,42 @@
+# benchmarks/bench_faq.py
+"""
+FAQ rendering throughput: precomputed intents vs text classification fallback.
+
+    python benchmarks/bench_faq.py --products 20000
+"""
+import argparse
+import logging
+import time
+
+from _catalog import synthetic_facts
+
+from src.agents.question_generator_agent import generate_questions
+from src.agents.template_engine_agent import render_faq, classify_question
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    catalog = synthetic_facts(args.products)
+    questions = [generate_questions(f) for f in catalog]
+    free_form = [[{k: v for k, v in q.items() if k != "intent"} for q in qs] for qs in questions]
+
+    start = time.perf_counter()
+    with_intent = [render_faq(qs, f) for qs, f in zip(questions, catalog)]
+    dispatch_s = time.perf_counter() - start
+
+    classify_question.cache_clear()
+    start = time.perf_counter()
+    without_intent = [render_faq(qs, f) for qs, f in zip(free_form, catalog)]
+    fallback_s = time.perf_counter() - start
+
+    assert with_intent == without_intent, "intent dispatch changed FAQ output"
+    for label, seconds in (("intent dispatch", dispatch_s), ("text fallback", fallback_s)):
+        print(f"{label:16s} {seconds:7.3f}s  {args.products / seconds:10.0f} products/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_ingest_directory.py
+"""
+Ingesting a directory with one small JSON file per product: ingest_from_file per file
+(read_json: exists() + read_text) vs iter_directory (os.scandir, one open + read per file on
+a thread pool with bounded prefetch), ordered and unordered.
+
+--latency-ms adds a sleep to every filesystem round trip (two per file for read_json, one
+for iter_directory) to approximate a network filesystem, where per-file latency dominates.
+
+    python benchmarks/bench_ingest_directory.py --files 100000
+    python benchmarks/bench_ingest_directory.py --files 5000 --latency-ms 2
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from unittest import mock
+
+from _catalog import synthetic_products
+
+from src.agents import ingest_agent
+from src.utils import read_json
+
+
+def write_files(directory, n):
+    for product in synthetic_products(n):
+        with open(os.path.join(directory, f"{product.id}.json"), "w", encoding="utf-8") as fh:
+            json.dump(product.to_dict(), fh)
+
+
+def baseline(directory):
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json"))
+    return [ingest_agent.ingest_from_file(path) for path in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    latency = args.latency_ms / 1000
+
+    def slow_read_json(path):
+        time.sleep(2 * latency)  # exists() and read_text()
+        return read_json(path)
+
+    read_bytes = ingest_agent._read_bytes
+
+    def slow_read_bytes(path):
+        time.sleep(latency)
+        return read_bytes(path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_files(tmp, args.files)
+        runs = [
+            ("ingest_from_file loop", lambda: baseline(tmp)),
+            ("iter_directory 1 worker", lambda: list(ingest_agent.iter_directory(tmp, workers=1))),
+            (f"iter_directory {args.workers} ordered", lambda: list(ingest_agent.iter_directory(tmp, workers=args.workers))),
+            (
+                f"iter_directory {args.workers} unordered",
+                lambda: list(ingest_agent.iter_directory(tmp, workers=args.workers, ordered=False)),
+            ),
+        ]
+        patches = (
+            [mock.patch.object(ingest_agent, "read_json", slow_read_json),
+             mock.patch.object(ingest_agent, "_read_bytes", slow_read_bytes)]
+            if latency else []
+        )
+        for patch in patches:
+            patch.start()
+        try:
+            for label, run in runs:
+                start = time.perf_counter()
+                products = run()
+                seconds = time.perf_counter() - start
+                assert len(products) == args.files
+                print(f"{label:30s} {seconds:7.3f}s  {args.files / seconds:9.0f} files/s")
+        finally:
+            for patch in patches:
+                patch.stop()
+
+
+if __name__ == "__main__":
+    main()
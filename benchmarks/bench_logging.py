@@ -0,0 +1,61 @@
+# benchmarks/bench_logging.py
+"""
+Per-product generation cost with synchronous INFO logging (the old basicConfig setup)
+vs the queue-based batch setup from src.logging_setup. Logs go to a temporary file.
+
+    python benchmarks/bench_logging.py --products 20000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from _catalog import synthetic_products
+
+from src.logging_setup import TEXT_FORMAT, configure_logging, stop_logging
+from src.orchestrator import generate_artifacts
+
+
+def run(products):
+    start = time.perf_counter()
+    for product in products:
+        generate_artifacts(product)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=20000)
+    args = parser.parse_args()
+
+    products = synthetic_products(args.products)
+    root = logging.getLogger()
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_path = os.path.join(tmp, "sync.log")
+        handler = logging.FileHandler(sync_path)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        sync_s = run(products)
+        root.removeHandler(handler)
+        handler.close()
+
+        results = [("sync INFO", sync_s, os.path.getsize(sync_path))]
+        for label, kwargs in (
+            ("queued INFO", {}),
+            ("queued JSON", {"fmt": "json"}),
+            ("queued batch", {"batch": True}),
+        ):
+            path = os.path.join(tmp, label.replace(" ", "_") + ".log")
+            configure_logging(filename=path, **kwargs)
+            seconds = run(products)
+            stop_logging()  # drains the queue; not part of the caller's cost
+            results.append((label, seconds, os.path.getsize(path)))
+
+    for label, seconds, size in results:
+        print(f"{label:13s} {seconds:7.3f}s  {args.products / seconds:8.0f} products/s  {size / 1e6:8.1f} MB log")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# benchmarks/bench_serializers.py
+"""
+Output formats: encoded bytes and encode/decode time per artifact.
+
+    python benchmarks/bench_serializers.py --products 5000
+"""
+import argparse
+import logging
+import time
+
+from _catalog import synthetic_artifacts
+
+from src.serializers import SERIALIZERS, orjson
+
+ARTIFACTS = ("product_page", "faq", "comparison_page")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    catalog = synthetic_artifacts(args.products)
+    print(f"JSON backend for compact: {'orjson' if orjson is not None else 'stdlib json'}")
+    print(f"{'artifact':16s} {'format':8s} {'bytes/item':>11s} {'encode us':>10s} {'decode us':>10s}")
+    for artifact in ARTIFACTS:
+        objs = [entry[artifact] for entry in catalog]
+        for name, serializer in SERIALIZERS.items():
+            start = time.perf_counter()
+            encoded = [serializer.dumps(obj) for obj in objs]
+            encode_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            decoded = [serializer.loads(data) for data in encoded]
+            decode_s = time.perf_counter() - start
+
+            assert decoded == objs, f"{name} does not round-trip {artifact}"
+            size = sum(map(len, encoded)) / len(objs)
+            per_item = 1e6 / len(objs)
+            print(f"{artifact:16s} {name:8s} {size:11.0f} {encode_s * per_item:10.1f} {decode_s * per_item:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
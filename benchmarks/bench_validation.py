@@ -0,0 +1,78 @@
+# benchmarks/bench_validation.py
+"""
+Schema validation throughput for generated artifacts: one model_validate call per object
+(how the LLM path validated FAQ items), the compiled validator used by validate_outputs,
+validate_artifacts_batch, and the same schema as a single list validator (for comparison).
+
+    python benchmarks/bench_validation.py --products 5000
+"""
+import argparse
+import logging
+import time
+from typing import List
+
+from _catalog import synthetic_products
+from pydantic import TypeAdapter
+
+from src.models import (
+    ARTIFACTS_VALIDATOR,
+    ComparisonSchema,
+    FAQItem,
+    ProductArtifacts,
+    ProductPageSchema,
+    _plain_schema,
+    validate_artifacts_batch,
+)
+from src.orchestrator import generate_artifacts
+
+
+def per_object(items):
+    for item in items:
+        ProductPageSchema.model_validate(item["product_page"])
+        for faq_item in item["faq"]:
+            FAQItem.model_validate(faq_item)
+        ComparisonSchema.model_validate(item["comparison"])
+
+
+def per_product(items):
+    for item in items:
+        ARTIFACTS_VALIDATOR.validate_python(item)
+
+
+def batch(items):
+    errors = validate_artifacts_batch(items)
+    assert not any(errors)
+
+
+LIST_VALIDATOR = TypeAdapter(List[_plain_schema(ProductArtifacts)])
+
+
+def whole_list(items):
+    LIST_VALIDATOR.validate_python(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    items = []
+    for product in synthetic_products(args.products):
+        artifacts = generate_artifacts(product)
+        items.append({key: artifacts[key] for key in ("product_page", "faq", "comparison")})
+
+    for label, fn in (("per object", per_object), ("per product", per_product), ("batch", batch), ("whole list", whole_list)):
+        best = min(_timed(fn, items) for _ in range(args.repeat))
+        print(f"{label:12s} {best:7.3f}s  {args.products / best:9.0f} products/s")
+
+
+def _timed(fn, items):
+    start = time.perf_counter()
+    fn(items)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 # run.py
 import argparse
-import logging
+import contextlib
+import os
 
+from src import resilience
 from src.graph import run_graph
-
-logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
+from src.logging_setup import configure_logging, parse_logger_map
+from src.utils import get_write_stats
 
 
 def main():
@@ -21,19 +23,150 @@ def main():
         default="out",
         help="Output directory",
     )
+    parser.add_argument(
+        "--template",
+        "-t",
+        default=None,
+        help="Path to a JSON product page template (default: built-in block order)",
+    )
+    parser.add_argument(
+        "--output-mode",
+        choices=["files", "cas", "shards"],
+        default="files",
+        help=(
+            "files: one JSON file per artifact; cas: content-addressed store with per-product manifests; "
+            "shards: size-bounded JSONL shards per artifact type with an offset index"
+        ),
+    )
+    parser.add_argument(
+        "--compression",
+        choices=["none", "gzip", "lzma"],
+        default="none",
+        help="Shard compression (--output-mode shards only)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["pretty", "compact", "msgpack", "cbor"],
+        default="pretty",
+        help=(
+            "Artifact encoding for --output-mode files: indented JSON, compact JSON "
+            "(orjson when installed), MessagePack (.msgpack) or CBOR (.cbor)"
+        ),
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help="SQLite artifact index to update (query it with: python -m src.artifact_index --db PATH)",
+    )
+
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=["text", "json"],
+        default="text",
+        help="json: one JSON object per record, with product_id",
+    )
+    parser.add_argument(
+        "--log-file",
+        default=None,
+        help="Write logs to this file instead of stderr",
+    )
+    parser.add_argument(
+        "--log-sample",
+        default="",
+        help="Keep a fraction of a logger's INFO records, e.g. RendererAgent=0.01,SanityCheckAgent=0.1",
+    )
+    parser.add_argument(
+        "--log-rate-limit",
+        default="",
+        help="Max records per second per logger, e.g. LangGraphPipeline=20",
+    )
+
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "sample"],
+        default=None,
+        help="Profile the run: cProfile (exact, slower) or a low-overhead stack sampler",
+    )
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        help="Output prefix for .pstats/.collapsed/.json (default: <outdir>/profile)",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=0.001,
+        help="Sampling interval in seconds (--profile sample)",
+    )
+
+    parser.add_argument(
+        "--node-timeout",
+        type=float,
+        default=None,
+        help="Seconds an LLM fallback may take before the deterministic output is kept",
+    )
+    parser.add_argument(
+        "--product-timeout",
+        type=float,
+        default=None,
+        help="Seconds the whole product may take, including validation retries",
+    )
 
     args = parser.parse_args()
 
-    result = run_graph(
-        input_path=args.input,
-        outdir=args.outdir,
+    configure_logging(
+        level=args.log_level,
+        fmt=args.log_format,
+        filename=args.log_file,
+        sample=parse_logger_map(args.log_sample),
+        rate_limit=parse_logger_map(args.log_rate_limit),
     )
 
+    profiler = None
+    if args.profile:
+        from src.profiling import PipelineProfiler
+        profiler = PipelineProfiler(
+            args.profile,
+            output=args.profile_out or os.path.join(args.outdir, "profile"),
+            interval=args.profile_interval,
+        )
+
+    with profiler.run() if profiler else contextlib.nullcontext():
+        result = run_graph(
+            input_path=args.input,
+            outdir=args.outdir,
+            page_template=args.template,
+            output_mode=args.output_mode,
+            output_compression=None if args.compression == "none" else args.compression,
+            output_format=args.format,
+            index_path=args.index,
+            profiled=profiler is not None,
+            node_timeout=args.node_timeout,
+            product_timeout=args.product_timeout,
+        )
+
     print("\nPipeline finished.")
     print("Output Directory:", args.outdir)
     print("Product Title:", result["product_page"].get("title"))
     print("FAQ Count:", len(result["faq"]))
     print("Comparison Verdict:", result["comparison"].get("verdict"))
+    if result.get("degraded"):
+        print("Degraded (LLM fallback skipped):", ", ".join(result.get("degraded_nodes") or []))
+        print("LLM Circuit Breaker:", resilience.llm_breaker.stats())
+    stats = get_write_stats()
+    print(
+        "Files Written/Unchanged: %d/%d (%d/%d bytes)"
+        % (stats["files_written"], stats["files_skipped"], stats["bytes_written"], stats["bytes_skipped"])
+    )
+
+    if profiler is not None:
+        for kind, path in profiler.write().items():
+            print("Profile %s: %s" % (kind, path))
 
 
 if __name__ == "__main__":
@@ -1,6 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Tuple
+from collections import Counter, defaultdict
+import heapq
 import logging
 
+from ..utils import gc_paused
+
 logger = logging.getLogger("ComparisonAgent")
 
 
@@ -20,7 +24,7 @@ def build_fictional_product_b(facts: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     base_price = float(A.get("price", {}).get("amount", 0) or 0)
-    B["price"]["amount"] = round(base_price * 1.15, 2) if base_price else 0.0
+    B["price"]["amount"] = fictional_price(base_price)
     B["price"]["currency"] = A.get("price", {}).get("currency", "INR")
 
     logger.info(
@@ -31,6 +35,13 @@ def build_fictional_product_b(facts: Dict[str, Any]) -> Dict[str, Any]:
     return B
 
 
+def fictional_price(base_price: float) -> float:
+    """
+    Product B's price: 15% above Product A, or 0.0 when A has no price.
+    """
+    return round(base_price * 1.15, 2) if base_price else 0.0
+
+
 def compare_products(A: Dict[str, Any], B: Dict[str, Any]) -> Dict[str, Any]:
     """
     Comparison logic preserving the original casing of ingredients.
@@ -52,6 +63,36 @@ def compare_products(A: Dict[str, Any], B: Dict[str, Any]) -> Dict[str, Any]:
     A_only = [i for i in ingredients_A if i.lower() in A_only_lower]
     B_only = [i for i in ingredients_B if i.lower() in B_only_lower]
 
+    benefits_A = A.get("benefits", [])
+    benefits_B = B.get("benefits", [])
+
+    return _assemble_comparison(
+        A,
+        B,
+        ingredients_aspect={
+            "aspect": "ingredients",
+            "A_only": A_only,
+            "B_only": B_only,
+            "common": common,
+        },
+        benefits_aspect={
+            "aspect": "benefits",
+            "A_only": [b for b in benefits_A if b not in benefits_B],
+            "B_only": [b for b in benefits_B if b not in benefits_A],
+            "common": [b for b in benefits_A if b in benefits_B],
+        },
+    )
+
+
+def _assemble_comparison(
+    A: Dict[str, Any],
+    B: Dict[str, Any],
+    ingredients_aspect: Dict[str, Any],
+    benefits_aspect: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Price aspect, verdict and final layout shared by every comparison engine.
+    """
     priceA = A.get("price", {}).get("amount")
     priceB = B.get("price", {}).get("amount")
 
@@ -77,43 +118,164 @@ def compare_products(A: Dict[str, Any], B: Dict[str, Any]) -> Dict[str, Any]:
         "product_A": {
             "name": A.get("name"),
             "price": {"amount": priceA, "currency": currency} if priceA is not None else {"amount": 0, "currency": currency},
-            "ingredients": ingredients_A,
+            "ingredients": A.get("ingredients", []),
             "benefits": A.get("benefits"),
         },
         "product_B": {
             "name": B.get("name"),
             "price": {"amount": priceB, "currency": currency} if priceB is not None else {"amount": 0, "currency": currency},
-            "ingredients": ingredients_B,
+            "ingredients": B.get("ingredients", []),
             "benefits": B.get("benefits"),
         },
         "comparisons": [
-            {
-                "aspect": "ingredients",
-                "A_only": A_only,
-                "B_only": B_only,
-                "common": common,
-            },
+            ingredients_aspect,
             {
                 "aspect": "price",
                 "A_only": price_A_only,
                 "B_only": price_B_only,
                 "common": price_common,
             },
-            {
-                "aspect": "benefits",
-                "A_only": [
-                    b for b in A.get("benefits", [])
-                    if b not in B.get("benefits", [])
-                ],
-                "B_only": [
-                    b for b in B.get("benefits", [])
-                    if b not in A.get("benefits", [])
-                ],
-                "common": [
-                    b for b in A.get("benefits", [])
-                    if b in B.get("benefits", [])
-                ],
-            },
+            benefits_aspect,
         ],
         "verdict": verdict,
     }
+
+
+# -----------------------------
+# Bitset comparison engine
+# -----------------------------
+def _bit_flags(keys: List[List[str]]) -> Dict[str, int]:
+    """
+    Assign one bit per distinct key, most frequent keys first so typical masks stay small.
+    """
+    frequency: Counter = Counter()
+    for k in keys:
+        frequency.update(set(k))
+    return {key: 1 << bit for bit, (key, _) in enumerate(frequency.most_common())}
+
+
+def _encode(items: List[str], keys: List[str], flags: Dict[str, int]) -> Tuple[List[Tuple[str, int]], int]:
+    encoded = [(item, flags[key]) for item, key in zip(items, keys)]
+    mask = 0
+    for _, flag in encoded:
+        mask |= flag
+    return encoded, mask
+
+
+def _split(aspect: str, encoded_A, mask_A: int, encoded_B, mask_B: int) -> Dict[str, Any]:
+    common_mask = mask_A & mask_B
+    return {
+        "aspect": aspect,
+        "A_only": [item for item, flag in encoded_A if not flag & common_mask],
+        "B_only": [item for item, flag in encoded_B if not flag & common_mask],
+        "common": [item for item, flag in encoded_A if flag & common_mask],
+    }
+
+
+def compare_products_batch(
+    products: List[Dict[str, Any]], pairs: Iterable[Tuple[int, int]]
+) -> List[Dict[str, Any]]:
+    """
+    Compare many (A, B) index pairs from the same product list.
+    Ingredients (case-insensitive) and benefits (exact) are encoded once per product as
+    integer bitsets over a shared vocabulary, so each pair costs one AND per aspect plus a
+    pass over its own items. Output is identical to compare_products(products[a], products[b]).
+    """
+    ingredients = [p.get("ingredients", []) for p in products]
+    ingredient_keys = [[i.lower() for i in items] for items in ingredients]
+    benefits = [p.get("benefits", []) for p in products]
+
+    ingredient_flags = _bit_flags(ingredient_keys)
+    benefit_flags = _bit_flags(benefits)
+    encoded_ingredients = [
+        _encode(items, keys, ingredient_flags) for items, keys in zip(ingredients, ingredient_keys)
+    ]
+    encoded_benefits = [_encode(items, items, benefit_flags) for items in benefits]
+
+    results = []
+    with gc_paused():
+        for a, b in pairs:
+            results.append(_assemble_comparison(
+                products[a],
+                products[b],
+                _split("ingredients", *encoded_ingredients[a], *encoded_ingredients[b]),
+                _split("benefits", *encoded_benefits[a], *encoded_benefits[b]),
+            ))
+    return results
+
+
+# -----------------------------
+# Catalog-wide comparison
+# -----------------------------
+def _similarity_tokens(facts: Dict[str, Any]) -> frozenset:
+    return frozenset(
+        [f"i:{i.lower()}" for i in facts.get("ingredients", [])]
+        + [f"b:{b.lower()}" for b in facts.get("benefits", [])]
+    )
+
+
+def find_similar_products(
+    catalog: List[Dict[str, Any]],
+    k: int = 3,
+    max_posting: int = 1000,
+    candidate_pool: int = 50,
+) -> List[List[Tuple[int, float]]]:
+    """
+    For every product in the catalog, return up to k (index, jaccard) pairs of the most
+    similar other products, by Jaccard similarity over lowercased ingredients and benefits.
+
+    Candidates come from an inverted token index instead of a pairwise scan. Tokens shared by
+    more than max_posting products (e.g. "water", "glycerin") do not generate candidates, but
+    still count towards the exact score. Only the candidate_pool products sharing the most rare
+    tokens are scored exactly. Ties are broken by catalog order.
+    """
+    token_sets = [_similarity_tokens(f) for f in catalog]
+
+    postings: Dict[str, List[int]] = defaultdict(list)
+    for idx, tokens in enumerate(token_sets):
+        for t in tokens:
+            postings[t].append(idx)
+    frequent = {t for t, p in postings.items() if len(p) > max_posting}
+
+    results: List[List[Tuple[int, float]]] = []
+    for idx, tokens in enumerate(token_sets):
+        counts: Counter = Counter()
+        rare = [t for t in tokens if t not in frequent]
+        for t in rare:
+            counts.update(postings[t])
+        if not rare and tokens:
+            # Only common tokens: sample the shortest posting list
+            shortest = min(tokens, key=lambda t: len(postings[t]))
+            counts.update(postings[shortest][:max_posting])
+        counts.pop(idx, None)
+
+        scored = []
+        for other, _ in counts.most_common(candidate_pool):
+            other_tokens = token_sets[other]
+            inter = len(tokens & other_tokens)
+            union = len(tokens) + len(other_tokens) - inter
+            scored.append((inter / union if union else 0.0, -other))
+        top = heapq.nlargest(k, scored)
+        results.append([(-neg_idx, score) for score, neg_idx in top])
+
+    logger.info(
+        "Indexed %d products (%d tokens, %d frequent) for similarity search",
+        len(catalog),
+        len(postings),
+        len(frequent),
+    )
+    return results
+
+
+def compare_against_catalog(
+    catalog: List[Dict[str, Any]], k: int = 3, **search_kwargs: Any
+) -> List[List[Dict[str, Any]]]:
+    """
+    Compare every product with its top-k most similar real products from the same catalog.
+    Each comparison uses the compare_products schema, with the catalog product as Product B,
+    ordered from most to least similar (scores are available from find_similar_products).
+    """
+    neighbours = find_similar_products(catalog, k=k, **search_kwargs)
+    pairs = [(idx, other) for idx, matches in enumerate(neighbours) for other, _ in matches]
+    flat = iter(compare_products_batch(catalog, pairs))
+    return [[next(flat) for _ in matches] for matches in neighbours]
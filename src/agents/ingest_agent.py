@@ -1,4 +1,10 @@
-from typing import Dict, Any
+import json
+import os
+from collections import deque
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple
 from ..models import ProductModel
 from ..utils import read_json
 import logging
@@ -7,15 +13,178 @@ import logging
 logger = logging.getLogger("IngestAgent")
 
 
+def _product_from_data(data: Any) -> ProductModel:
+    # if input is top-level dict with product key, allow that
+    if isinstance(data, dict) and "product" in data and isinstance(data["product"], dict):
+        data = data["product"]
+    return ProductModel.from_dict(data)
+
+
 def ingest_from_file(path: str) -> ProductModel:
     """
     Read input JSON and convert to ProductModel. No external facts are introduced.
     """
     logger.info("Ingesting file: %s", path)
-    data = read_json(path)
-    # if input is top-level dict with product key, allow that
-    if isinstance(data, dict) and "product" in data and isinstance(data["product"], dict):
-        data = data["product"]
-    pm = ProductModel.from_dict(data)
+    pm = _product_from_data(read_json(path))
     logger.info("Ingested product: %s (id=%s)", pm.name, pm.id)
     return pm
+
+
+def ingest_catalog(path: str) -> List[ProductModel]:
+    """
+    Read a catalog file: a JSON array of products, {"products": [...]}, a single product
+    (optionally under "product"), or JSON Lines with one product per line.
+    """
+    logger.info("Ingesting catalog: %s", path)
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"{path} not found")
+    text = p.read_text(encoding="utf-8")
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # JSON Lines
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        if isinstance(data.get("products"), list):
+            data = data["products"]
+        elif isinstance(data.get("product"), dict):
+            data = [data["product"]]
+        else:
+            data = [data]
+    products = [ProductModel.from_dict(item) for item in data]
+    logger.info("Ingested %d products", len(products))
+    return products
+
+
+def iter_catalog(path: str) -> Iterator[ProductModel]:
+    """
+    Yield products one at a time. JSON Lines files (.jsonl / .ndjson) are streamed line by
+    line; other catalog formats are parsed whole by ingest_catalog. A directory is read as
+    one product per .json file (iter_directory).
+    """
+    if os.path.isdir(path):
+        yield from iter_directory(path)
+        return
+    if Path(path).suffix.lower() not in (".jsonl", ".ndjson"):
+        yield from ingest_catalog(path)
+        return
+    logger.info("Streaming catalog: %s", path)
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield ProductModel.from_dict(json.loads(line))
+
+
+# -----------------------------
+# Directories of product files
+# -----------------------------
+def list_product_files(directory: str, suffixes: Sequence[str] = (".json",)) -> List[str]:
+    """
+    Product files in directory (not recursive, hidden files skipped), sorted by name.
+    os.scandir reports file types from the directory listing, so no file is stat'ed.
+    """
+    suffixes = tuple(s.lower() for s in suffixes)
+    with os.scandir(directory) as entries:
+        paths = [
+            entry.path for entry in entries
+            if not entry.name.startswith(".") and entry.name.lower().endswith(suffixes) and entry.is_file()
+        ]
+    paths.sort()
+    return paths
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def _read_product(path: str) -> ProductModel:
+    # One open + read per file: no exists() round trip, and parsing runs on the reader thread
+    return _product_from_data(json.loads(_read_bytes(path)))
+
+
+def _read_chunk(paths: List[str]) -> List[Tuple[str, Any]]:
+    """
+    [(path, ProductModel or the exception reading it raised)]
+    """
+    results: List[Tuple[str, Any]] = []
+    for path in paths:
+        try:
+            results.append((path, _read_product(path)))
+        except Exception as exc:
+            results.append((path, exc))
+    return results
+
+
+def _log_unreadable(path: str, exc: Exception) -> None:
+    logger.error("Skipping unreadable product file %s: %s", path, exc)
+
+
+def iter_directory(
+    directory: str,
+    workers: int = 8,
+    prefetch: Optional[int] = None,
+    ordered: bool = True,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+    suffixes: Sequence[str] = (".json",),
+    chunk_size: int = 8,
+) -> Iterator[ProductModel]:
+    """
+    Yield the products of a directory with one product file each (as ingest_from_file reads them).
+    Files are read and parsed by `workers` threads, `chunk_size` files per task, at most
+    `prefetch` tasks (default 4 per worker) ahead of the consumer. ordered=True yields in file
+    name order; ordered=False yields each chunk as soon as it is parsed. Unreadable or invalid
+    files are passed to on_error(path, exc) (default: logged) and skipped.
+    """
+    paths = list_product_files(directory, suffixes)
+    logger.info("Ingesting %d product files from %s", len(paths), directory)
+    on_error = on_error or _log_unreadable
+    prefetch = max(1, prefetch or 4 * workers)
+    chunks = (paths[i:i + chunk_size] for i in range(0, len(paths), max(1, chunk_size)))
+    pool = ThreadPoolExecutor(max(1, workers), thread_name_prefix="ingest")
+    completed: "queue.SimpleQueue[Future]" = queue.SimpleQueue()
+
+    def submit() -> Optional[Future]:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return None
+        future = pool.submit(_read_chunk, chunk)
+        if not ordered:
+            future.add_done_callback(completed.put)
+        return future
+
+    try:
+        in_flight = deque(filter(None, (submit() for _ in range(prefetch))))
+        while in_flight:
+            if ordered:
+                future = in_flight.popleft()
+            else:
+                future = completed.get()
+                in_flight.remove(future)
+            refill = submit()
+            if refill is not None:
+                in_flight.append(refill)
+            for path, result in future.result():
+                if isinstance(result, Exception):
+                    on_error(path, result)
+                else:
+                    yield result
+    finally:
+        # Also reached when the consumer stops early: drop what was prefetched
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def ingest_directory(directory: str, **options) -> Tuple[List[ProductModel], List[Dict[str, str]]]:
+    """
+    All products of a directory (see iter_directory for the options), and
+    [{"path", "error"}] for the files that could not be read.
+    """
+    errors: List[Dict[str, str]] = []
+    products = list(iter_directory(
+        directory,
+        on_error=lambda path, exc: errors.append({"path": path, "error": f"{type(exc).__name__}: {exc}"}),
+        **options,
+    ))
+    logger.info("Ingested %d products from %s (%d unreadable)", len(products), directory, len(errors))
+    return products, errors
@@ -1,128 +1,145 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
 import logging
 
+from ..utils import gc_paused
+from .template_engine_agent import (
+    classify_question,
+    INTENT_NAME,
+    INTENT_PRODUCT_ID,
+    INTENT_DESCRIPTION,
+    INTENT_PRICE,
+    INTENT_INGREDIENT_LIST,
+    INTENT_INGREDIENT_COUNT,
+    INTENT_BENEFITS,
+    INTENT_BENEFIT_COUNT,
+    INTENT_PERCENTAGE,
+    INTENT_USAGE_HOW,
+    INTENT_USAGE_WHEN,
+    INTENT_SIDE_EFFECTS,
+    INTENT_METADATA_SOURCE,
+    INTENT_INGESTED_AT,
+)
+
 logger = logging.getLogger("QuestionGeneratorAgent")
 
+# One planned question: (id, category, question text or "{}" template, rationale, intent, slot).
+# slot is None for fixed questions, or ("ingredients" | "benefits", index) for interpolated ones,
+# whose intent is None until the final text is known.
+PlannedQuestion = Tuple[str, str, str, str, Optional[str], Optional[Tuple[str, int]]]
 
-def generate_questions(facts: Dict) -> List[Dict]:
+# 15. Fill remaining slots with template questions
+TEMPLATE_QUESTIONS = (
+    ("Product Information", "How many ingredients does the product contain?", INTENT_INGREDIENT_COUNT),
+    ("Benefits", "How many benefits does the product offer?", INTENT_BENEFIT_COUNT),
+    ("Product Information", "What percentage of Vitamin C does the serum contain?", INTENT_PERCENTAGE),
+    ("Metadata", "What is the metadata source of the product information?", INTENT_METADATA_SOURCE),
+    ("Metadata", "When was the product information ingested?", INTENT_INGESTED_AT),
+    ("Usage", "When is the recommended time to apply the product?", INTENT_USAGE_WHEN),
+    ("Side Effects", "What precaution is suggested before using the product?", INTENT_SIDE_EFFECTS),
+)
+
+
+@lru_cache(maxsize=None)
+def question_plan(
+    has_product_id: bool, has_price: bool, n_ingredients: int, n_benefits: int
+) -> Tuple[PlannedQuestion, ...]:
     """
-    Deterministic rule-based question generation.
-    Produces exactly 15 questions using the available facts only.
-    Uses simple numeric IDs ("1", "2", "3", ...) to match expected schema.
+    Build the 15-question skeleton for one facts "shape" (optional facts present, list
+    lengths capped at 5 ingredients / 3 benefits). Computed once per shape and shared.
     """
-    qs = []
-    name = facts.get("name", "the product")
-    ingredients = facts.get("ingredients", [])
-    benefits = facts.get("benefits", [])
-    price = facts.get("price", {}).get("amount")
-    qid = 1
+    plan = []
+
+    def add(category, question, rationale, intent, slot=None):
+        plan.append((str(len(plan) + 1), category, question, rationale, intent, slot))
 
     # 1. Basic info question
-    qs.append({
-        "id": str(qid),
-        "category": "Product Information",
-        "question": f"What is the name of the product?",
-        "rationale": "basic info"
-    })
-    qid += 1
+    add("Product Information", "What is the name of the product?", "basic info", INTENT_NAME)
 
     # 2. Product ID question
-    product_id = facts.get("product_id", "")
-    if product_id:
-        qs.append({
-            "id": str(qid),
-            "category": "Product Information",
-            "question": f"What is the product ID?",
-            "rationale": "product identification"
-        })
-        qid += 1
+    if has_product_id:
+        add("Product Information", "What is the product ID?", "product identification", INTENT_PRODUCT_ID)
 
     # 3. Description question
-    qs.append({
-        "id": str(qid),
-        "category": "Product Description",
-        "question": f"What is the description of the product?",
-        "rationale": "description"
-    })
-    qid += 1
+    add("Product Description", "What is the description of the product?", "description", INTENT_DESCRIPTION)
 
     # 4. Price question
-    if price is not None:
-        qs.append({
-            "id": str(qid),
-            "category": "Pricing",
-            "question": f"What is the price of the product?",
-            "rationale": "purchase decision"
-        })
-        qid += 1
+    if has_price:
+        add("Pricing", "What is the price of the product?", "purchase decision", INTENT_PRICE)
 
     # 5-9. Ingredient questions (up to 5)
-    for i, ing in enumerate(ingredients[:5], start=0):
-        if qid > 15:
-            break
-        qs.append({
-            "id": str(qid),
-            "category": "Ingredients",
-            "question": f"What ingredients are present in the product?" if i == 0 else f"Does the product contain {ing}?",
-            "rationale": "ingredient check"
-        })
-        qid += 1
+    for i in range(min(n_ingredients, 5)):
+        if i == 0:
+            add("Ingredients", "What ingredients are present in the product?", "ingredient check", INTENT_INGREDIENT_LIST)
+        else:
+            # Interpolated names can hit other keywords, so the intent comes from the final text
+            add("Ingredients", "Does the product contain {}?", "ingredient check", None, ("ingredients", i))
 
     # 10-12. Benefit questions (up to 3)
-    for i, b in enumerate(benefits[:3], start=0):
-        if qid > 15:
-            break
-        qs.append({
-            "id": str(qid),
-            "category": "Benefits",
-            "question": f"What are the benefits of using the product?" if i == 0 else f"What benefit does the product provide for {b}?",
-            "rationale": "benefit clarification"
-        })
-        qid += 1
+    for i in range(min(n_benefits, 3)):
+        if i == 0:
+            add("Benefits", "What are the benefits of using the product?", "benefit clarification", INTENT_BENEFITS)
+        else:
+            add("Benefits", "What benefit does the product provide for {}?", "benefit clarification", None, ("benefits", i))
 
     # 13. Usage question
-    if qid <= 15:
-        qs.append({
-            "id": str(qid),
-            "category": "Usage",
-            "question": f"How should the product be used?",
-            "rationale": "usage guidance"
-        })
-        qid += 1
+    add("Usage", "How should the product be used?", "usage guidance", INTENT_USAGE_HOW)
 
     # 14. Side effects question
-    if qid <= 15:
-        qs.append({
-            "id": str(qid),
-            "category": "Side Effects",
-            "question": f"Are there any side effects associated with this product?",
-            "rationale": "safety check"
-        })
-        qid += 1
-
-    # 15. Fill remaining slots with template questions
-    templates = [
-        ("Product Information", "How many ingredients does the product contain?"),
-        ("Benefits", "How many benefits does the product offer?"),
-        ("Product Information", "What percentage of Vitamin C does the serum contain?"),
-        ("Metadata", "What is the metadata source of the product information?"),
-        ("Metadata", "When was the product information ingested?"),
-        ("Usage", "When is the recommended time to apply the product?"),
-        ("Side Effects", "What precaution is suggested before using the product?"),
-    ]
-
-    for cat, qtext in templates:
-        if qid > 15:
+    add("Side Effects", "Are there any side effects associated with this product?", "safety check", INTENT_SIDE_EFFECTS)
+
+    for category, question, intent in TEMPLATE_QUESTIONS:
+        if len(plan) >= 15:
             break
+        add(category, question, "template", intent)
+
+    return tuple(plan[:15])
+
+
+def _instantiate(facts: Dict) -> List[Dict]:
+    ingredients = facts.get("ingredients", [])
+    benefits = facts.get("benefits", [])
+    plan = question_plan(
+        bool(facts.get("product_id", "")),
+        facts.get("price", {}).get("amount") is not None,
+        min(len(ingredients), 5),
+        min(len(benefits), 3),
+    )
+    values = {"ingredients": ingredients, "benefits": benefits}
+
+    qs = []
+    for qid, category, question, rationale, intent, slot in plan:
+        if slot is not None:
+            kind, idx = slot
+            question = question.format(values[kind][idx])
+            intent = classify_question(question.lower())
         qs.append({
-            "id": str(qid),
-            "category": cat,
-            "question": qtext,
-            "rationale": "template"
+            "id": qid,
+            "category": category,
+            "question": question,
+            "rationale": rationale,
+            "intent": intent,
         })
-        qid += 1
+    return qs
 
-    # Ensure exactly 15 questions
-    qs = qs[:15]
+
+def generate_questions(facts: Dict) -> List[Dict]:
+    """
+    Deterministic rule-based question generation.
+    Produces exactly 15 questions using the available facts only.
+    Uses simple numeric IDs ("1", "2", "3", ...) to match expected schema.
+    Each question carries the answer "intent" used by render_faq.
+    """
+    qs = _instantiate(facts)
     logger.info("Generated %d questions", len(qs))
     return qs
+
+
+def generate_questions_batch(facts_list: List[Dict]) -> List[List[Dict]]:
+    """
+    generate_questions for many facts bags at once, with a single summary log line.
+    """
+    with gc_paused():
+        batch = [_instantiate(facts) for facts in facts_list]
+    logger.info("Generated questions for %d products", len(batch))
+    return batch
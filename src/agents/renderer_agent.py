@@ -1,15 +1,64 @@
-from typing import Dict, Any, List
-from ..utils import write_json
+from typing import Dict, Any, List, Optional
+from ..serializers import get_serializer
+from ..utils import write_bytes_if_changed, sync_directories
 import logging
 from pathlib import Path
 
 logger = logging.getLogger("RendererAgent")
 
 
-def write_outputs(product_page: Dict[str, Any], faq: List[Dict[str, Any]], comparison: Dict[str, Any], outdir: str) -> None:
+def write_outputs(
+    product_page: Dict[str, Any],
+    faq: List[Dict[str, Any]],
+    comparison: Dict[str, Any],
+    outdir: str,
+    store: Any = None,
+    fsync: bool = False,
+    output_format: str = "pretty",
+    index: Any = None,
+    store_key: Optional[str] = None,
+) -> None:
+    """
+    Write the three artifacts as files under outdir, encoded with output_format
+    (see src.serializers: pretty, compact, msgpack, cbor), or hand them to a store
+    (src.artifact_store.ContentStore, src.shard_writer.ShardWriter) when one is given.
+    Files whose content is unchanged are left untouched; with fsync the three files and
+    their directory are flushed to disk once.
+    With an index (src.artifact_index.ArtifactIndex) the product and its artifact
+    locations are recorded too; a ShardWriter reports shard offsets itself.
+    store_key overrides the product_id a store files the artifacts under (e.g. per variant).
+    """
+    if store is not None:
+        product_id = store_key or (product_page or {}).get("product_id")
+        if not product_id:
+            raise ValueError("Storing artifacts requires a product_id or store_key")
+        manifest = store.put_product(product_id, {
+            "product_page": product_page,
+            "faq": faq,
+            "comparison_page": comparison,
+        })
+        if index is not None:
+            locations = {}
+            if manifest is not None:
+                manifest_path = str(store.manifest_path(product_id))
+                locations = {
+                    name: {"manifest": manifest_path, "sha256": entry["sha256"]}
+                    for name, entry in manifest["artifacts"].items()
+                }
+            index.add_product(product_page, faq, comparison, locations)
+        logger.info("Stored outputs for %s in %s", product_id, store.root)
+        return
+
+    serializer = get_serializer(output_format)
     outp = Path(outdir)
     outp.mkdir(parents=True, exist_ok=True)
-    write_json(product_page, str(outp / "product_page.json"))
-    write_json(faq, str(outp / "faq.json"))
-    write_json(comparison, str(outp / "comparison_page.json"))
-    logger.info("Wrote outputs to %s", outp)
+    paths = {name: str(outp / (name + serializer.extension)) for name in ("product_page", "faq", "comparison_page")}
+    written = sum(
+        write_bytes_if_changed(serializer.dumps(obj), paths[name], fsync=fsync)
+        for name, obj in (("product_page", product_page), ("faq", faq), ("comparison_page", comparison))
+    )
+    if index is not None:
+        index.add_product(product_page, faq, comparison, {name: {"path": path} for name, path in paths.items()})
+    if fsync:
+        sync_directories()
+    logger.info("Wrote outputs to %s (%d changed, %d unchanged)", outp, written, 3 - written)
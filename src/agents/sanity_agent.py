@@ -1,6 +1,13 @@
-from typing import Tuple, List
+import math
+from typing import Tuple, List, Sequence
 from ..models import ProductModel
+from ..utils import gc_paused
 import logging
+from collections import Counter
+from itertools import compress, repeat
+from operator import attrgetter
+
+import numpy as np
 
 logger = logging.getLogger("SanityCheckAgent")
 
@@ -9,14 +16,114 @@ def run_sanity_checks(product: ProductModel) -> Tuple[ProductModel, List[str]]:
     issues = []
     if not product.name:
         issues.append("missing_name")
-    if product.price is None:
+    # NaN counts as missing, as in run_batch_sanity_checks
+    missing_price = product.price is None or math.isnan(product.price)
+    if missing_price:
         issues.append("missing_price")
     if not isinstance(product.ingredients, list):
         issues.append("ingredients_not_list")
     if not product.benefits:
         issues.append("no_benefits_listed")
     # simple numeric check
-    if product.price < 0:
+    if not missing_price and product.price < 0:
         issues.append("negative_price")
     logger.info("Sanity check completed: %d issues", len(issues))
     return product, issues
+
+
+def run_batch_sanity_checks(
+    products: Sequence[ProductModel],
+    catalog_rules: bool = True,
+    outlier_threshold: float = 3.5,
+    outlier_min_group: int = 5,
+) -> List[List[str]]:
+    """
+    Vectorized sanity checks over a whole catalog.
+    Per-product rules produce the same issues, in the same order, as run_sanity_checks.
+    With catalog_rules, "duplicate_product_id" and "price_outlier" are appended afterwards.
+    A price is an outlier when its robust z-score (median/MAD) within its currency
+    exceeds outlier_threshold; currencies with fewer than outlier_min_group prices are skipped.
+    """
+    n = len(products)
+    if n == 0:
+        return []
+
+    # Column arrays (one pass per column over the objects, everything below is vectorized)
+    names = np.fromiter(map(bool, map(attrgetter("name"), products)), dtype=bool, count=n)
+    prices = np.array(list(map(attrgetter("price"), products)), dtype=np.float64)  # None -> nan
+    ingredients_ok = np.fromiter(
+        map(isinstance, map(attrgetter("ingredients"), products), repeat(list)), dtype=bool, count=n
+    )
+    has_benefits = np.fromiter(map(bool, map(attrgetter("benefits"), products)), dtype=bool, count=n)
+
+    missing_price = np.isnan(prices)
+    rules = [
+        ("missing_name", ~names),
+        ("missing_price", missing_price),
+        ("ingredients_not_list", ~ingredients_ok),
+        ("no_benefits_listed", ~has_benefits),
+        ("negative_price", ~missing_price & (prices < 0)),
+    ]
+
+    if catalog_rules:
+        rules.append(("duplicate_product_id", _duplicate_ids(list(map(attrgetter("id"), products)))))
+
+        currency_list = list(map(attrgetter("currency"), products))
+        codes = {c: i for i, c in enumerate(dict.fromkeys(currency_list))}
+        currencies = np.fromiter(map(codes.__getitem__, currency_list), dtype=np.int64, count=n)
+        rules.append((
+            "price_outlier",
+            _price_outliers(prices, currencies, outlier_threshold, outlier_min_group),
+        ))
+
+    matrix = np.vstack([mask for _, mask in rules])
+    flagged = np.flatnonzero(matrix.any(axis=0))
+    codes_in_order = [code for code, _ in rules]
+
+    with gc_paused():
+        issues: List[List[str]] = [[] for _ in range(n)]
+        for idx, row in zip(flagged.tolist(), matrix[:, flagged].T.tolist()):
+            issues[idx] = list(compress(codes_in_order, row))
+
+    logger.info(
+        "Batch sanity check completed: %d products, %d with issues", n, len(flagged)
+    )
+    return issues
+
+
+def _duplicate_ids(ids: List[str]) -> np.ndarray:
+    """
+    Mask of products whose id occurs more than once in the catalog.
+    """
+    if len(set(ids)) == len(ids):
+        return np.zeros(len(ids), dtype=bool)
+    counts = Counter(ids)
+    duplicates = {i for i, c in counts.items() if c > 1}
+    return np.fromiter(map(duplicates.__contains__, ids), dtype=bool, count=len(ids))
+
+
+def _price_outliers(prices: np.ndarray, currencies: np.ndarray, threshold: float, min_group: int) -> np.ndarray:
+    """
+    Flag prices whose modified z-score within their currency exceeds threshold.
+    """
+    outliers = np.zeros(len(prices), dtype=bool)
+    valid = np.flatnonzero(~np.isnan(prices))
+    # One stable sort groups the valid prices by currency; each group is then a slice
+    order = valid[np.argsort(currencies[valid], kind="stable")]
+    _, starts, sizes = np.unique(currencies[order], return_index=True, return_counts=True)
+    for start, size in zip(starts.tolist(), sizes.tolist()):
+        if size < min_group:
+            continue
+        members = order[start:start + size]
+        values = prices[members]
+        median = np.median(values)
+        deviation = np.abs(values - median)
+        mad = np.median(deviation)
+        if mad == 0:
+            # More than half the prices are identical: fall back to the mean absolute deviation
+            mean_ad = deviation.mean()
+            if mean_ad > 0:
+                outliers[members] = deviation / (1.253314 * mean_ad) > threshold
+            continue
+        outliers[members] = 0.6745 * deviation / mad > threshold
+    return outliers
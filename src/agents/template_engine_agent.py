@@ -1,4 +1,12 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Tuple, Union
+from functools import lru_cache
+import hashlib
+import json
+import os
+
+import jinja2
+
+from ..utils import read_json
 from .content_block_agent import (
     generate_summary_block,
     generate_ingredients_block,
@@ -12,11 +20,17 @@ import logging
 logger = logging.getLogger("TemplateEngineAgent")
 
 
-def render_product_page(facts: Dict[str, Any], template: Dict[str, Any] = None) -> Dict[str, Any]:
+def render_product_page(
+    facts: Dict[str, Any], template: Union[Dict[str, Any], str, os.PathLike, "CompiledPageTemplate"] = None
+) -> Dict[str, Any]:
     """
     Compose content blocks per a simple template definition.
     Template is optional: if not provided we use a default ordering.
+    A template may be a definition dict, a path to a JSON definition, or a compiled template.
     """
+    if template is not None:
+        return _resolve_template(template).render(facts)
+
     # Default template ordering
     page = {
         "product_id": facts.get("product_id"),
@@ -34,94 +48,272 @@ def render_product_page(facts: Dict[str, Any], template: Dict[str, Any] = None)
     return page
 
 
+# -----------------------------
+# Page templates
+# -----------------------------
+# A page template lists blocks in page order. A block either reuses a content block agent
+# ({"key": ..., "generator": "summary"}) or renders a Jinja2 text pattern against the facts
+# ({"key": ..., "title": ..., "text": "{{ how_to_use }}"}). "variants" maps a product
+# category (facts["category"] or facts["metadata"]["category"]) to its own "blocks" list.
+BLOCK_GENERATORS: Dict[str, Callable[[Dict], Any]] = {
+    "summary": generate_summary_block,
+    "ingredients": generate_ingredients_block,
+    "benefits": generate_benefits_block,
+    "usage": generate_usage_block,
+    "safety": generate_safety_block,
+    "price": generate_price_block,
+}
+
+# Same output as the hand-coded ordering in render_product_page
+DEFAULT_PAGE_TEMPLATE: Dict[str, Any] = {
+    "blocks": [
+        {"key": "summary_block", "generator": "summary"},
+        {"key": "ingredients_block", "generator": "ingredients"},
+        {"key": "benefits_block", "generator": "benefits"},
+        {
+            "key": "usage_block",
+            "title": "Usage Instructions",
+            "text": "{{ how_to_use or 'Follow product label instructions.' }}",
+        },
+        {
+            "key": "safety_block",
+            "title": "Safety Information",
+            "text": "{{ side_effects or 'No common side effects listed; patch test recommended.' }}",
+        },
+        {"key": "price_block", "generator": "price"},
+    ],
+}
+
+_JINJA = jinja2.Environment(autoescape=False, keep_trailing_newline=True)
+
+
+class CompiledPageTemplate:
+    """
+    A page template with every Jinja2 pattern parsed and compiled once.
+    """
+
+    def __init__(self, digest: str, definition: Dict[str, Any]):
+        self.digest = digest
+        self._blocks = _compile_blocks(definition.get("blocks", []))
+        self._variants = {
+            category: _compile_blocks(variant.get("blocks", []))
+            for category, variant in definition.get("variants", {}).items()
+        }
+
+    def render(self, facts: Dict[str, Any]) -> Dict[str, Any]:
+        page = {
+            "product_id": facts.get("product_id"),
+            "title": facts.get("name"),
+            "metadata": facts.get("metadata", {}),
+        }
+        blocks = self._blocks
+        if self._variants:
+            category = facts.get("category") or facts.get("metadata", {}).get("category")
+            blocks = self._variants.get(category, blocks)
+        for key, build in blocks:
+            page[key] = build(facts)
+        return page
+
+
+def _compile_blocks(blocks: List[Dict[str, Any]]) -> List[Tuple[str, Callable[[Dict], Any]]]:
+    compiled = []
+    for block in blocks:
+        key = block.get("key")
+        if not key:
+            raise ValueError(f"Page template block without key: {block}")
+        if "generator" in block:
+            if block["generator"] not in BLOCK_GENERATORS:
+                raise ValueError(f"Unknown block generator: {block['generator']}")
+            compiled.append((key, BLOCK_GENERATORS[block["generator"]]))
+        elif "text" in block:
+            compiled.append((key, _text_block(block.get("title", ""), _JINJA.from_string(block["text"]))))
+        else:
+            raise ValueError(f"Page template block {key} needs a generator or a text pattern")
+    return compiled
+
+
+def _text_block(title: str, pattern: jinja2.Template) -> Callable[[Dict], Dict[str, Any]]:
+    def build(facts: Dict[str, Any]) -> Dict[str, Any]:
+        return {"title": title, "text": pattern.render(facts)}
+    return build
+
+
+def compile_page_template(definition: Dict[str, Any]) -> CompiledPageTemplate:
+    """
+    Compile a template definition, reusing the cached compilation of identical definitions.
+    """
+    canonical = json.dumps(definition, sort_keys=True, ensure_ascii=False)
+    return _compile_cached(hashlib.sha256(canonical.encode("utf-8")).hexdigest(), canonical)
+
+
+@lru_cache(maxsize=128)
+def _compile_cached(digest: str, canonical: str) -> CompiledPageTemplate:
+    logger.info("Compiling page template %s", digest[:12])
+    return CompiledPageTemplate(digest, json.loads(canonical))
+
+
+def load_page_template(path: Union[str, os.PathLike]) -> CompiledPageTemplate:
+    """
+    Load and compile a JSON template definition; recompiled only when the file changes.
+    """
+    st = os.stat(path)
+    return _load_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=128)
+def _load_cached(path: str, mtime_ns: int, size: int) -> CompiledPageTemplate:
+    return compile_page_template(read_json(path))
+
+
+def _resolve_template(template: Any) -> CompiledPageTemplate:
+    if isinstance(template, CompiledPageTemplate):
+        return template
+    if isinstance(template, (str, os.PathLike)):
+        return load_page_template(template)
+    return compile_page_template(template)
+
+
+# -----------------------------
+# FAQ answering
+# -----------------------------
+# Intent IDs, one per answer rule. Questions produced by generate_questions carry their
+# intent precomputed; anything else is classified from its text by classify_question.
+INTENT_PERCENTAGE = "percentage"
+INTENT_NAME = "name"
+INTENT_PRODUCT_ID = "product_id"
+INTENT_DESCRIPTION = "description"
+INTENT_PRICE = "price"
+INTENT_INGREDIENT_COUNT = "ingredient_count"
+INTENT_INGREDIENT_LIST = "ingredient_list"
+INTENT_BENEFIT_COUNT = "benefit_count"
+INTENT_BENEFITS = "benefits"
+INTENT_USAGE_HOW = "usage_how"
+INTENT_USAGE_WHEN = "usage_when"
+INTENT_USAGE = "usage"
+INTENT_SIDE_EFFECTS = "side_effects"
+INTENT_METADATA_SOURCE = "metadata_source"
+INTENT_INGESTED_AT = "ingested_at"
+INTENT_FALLBACK = "fallback"
+
+
+@lru_cache(maxsize=65536)
+def classify_question(qtext: str) -> str:
+    """
+    Map a lowercased question to its answer intent using substring heuristics.
+    Only free-form questions reach this; results are cached per question text.
+    """
+    # IMPORTANT: Check percentage questions FIRST before generic "contain" check
+    # This handles questions like "What percentage of Vitamin C does the serum contain?"
+    if "percentage" in qtext:
+        return INTENT_PERCENTAGE
+    if "name of the product" in qtext or "what is the name" in qtext:
+        return INTENT_NAME
+    if "product id" in qtext:
+        return INTENT_PRODUCT_ID
+    if "description" in qtext:
+        return INTENT_DESCRIPTION
+    if "price" in qtext:
+        return INTENT_PRICE
+    if "ingredients" in qtext or "contain" in qtext:
+        return INTENT_INGREDIENT_COUNT if "how many" in qtext else INTENT_INGREDIENT_LIST
+    if "benefits" in qtext:
+        return INTENT_BENEFIT_COUNT if "how many" in qtext else INTENT_BENEFITS
+    if "use" in qtext or "usage" in qtext or "apply" in qtext:
+        if "how" in qtext:
+            return INTENT_USAGE_HOW
+        if "when" in qtext or "time" in qtext:
+            return INTENT_USAGE_WHEN
+        return INTENT_USAGE
+    if "side effects" in qtext or "irritation" in qtext or "precaution" in qtext:
+        return INTENT_SIDE_EFFECTS
+    if "metadata" in qtext or "source" in qtext:
+        return INTENT_METADATA_SOURCE
+    if "ingested" in qtext or "when was" in qtext:
+        return INTENT_INGESTED_AT
+    return INTENT_FALLBACK
+
+
+def _answer_percentage(ctx: Dict[str, Any], q: Dict[str, Any]) -> str:
+    # Try to extract percentage from description or ingredients
+    if "10%" in ctx["description"] or "10%" in str(ctx["ingredients"]):
+        return "10%"
+    return "Percentage not specified in product information."
+
+
+def _answer_price(ctx: Dict[str, Any], q: Dict[str, Any]) -> str:
+    amount = ctx["price"].get("amount", 0)
+    currency = ctx["price"].get("currency", "INR")
+    return f"{amount} {currency}" if amount else "Price not available."
+
+
+def _answer_benefits(ctx: Dict[str, Any], q: Dict[str, Any]) -> str:
+    benefits = ctx["benefits"]
+    if not benefits:
+        return "Benefits not specified."
+    # Extract specific benefit from question if mentioned
+    qtext = q.get("question", "").lower()
+    mentioned_benefit = next((b for b in benefits if b.lower() in qtext), None)
+    if mentioned_benefit:
+        return f"The product provides {mentioned_benefit.lower()} benefits."
+    return ", ".join(benefits)
+
+
+_ANSWERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Any]] = {
+    INTENT_PERCENTAGE: _answer_percentage,
+    INTENT_NAME: lambda ctx, q: ctx["name"],
+    INTENT_PRODUCT_ID: lambda ctx, q: ctx["product_id"] or "Product ID not available.",
+    INTENT_DESCRIPTION: lambda ctx, q: ctx["description"] or f"{ctx['name']} is a skincare product.",
+    INTENT_PRICE: _answer_price,
+    INTENT_INGREDIENT_COUNT: lambda ctx, q: str(len(ctx["ingredients"])) if ctx["ingredients"] else "0",
+    INTENT_INGREDIENT_LIST: lambda ctx, q: ", ".join(ctx["ingredients"]) if ctx["ingredients"] else "Ingredient list not available.",
+    INTENT_BENEFIT_COUNT: lambda ctx, q: str(len(ctx["benefits"])) if ctx["benefits"] else "0",
+    INTENT_BENEFITS: _answer_benefits,
+    INTENT_USAGE_HOW: lambda ctx, q: ctx["how_to_use"] or "Follow product label instructions.",
+    INTENT_USAGE_WHEN: lambda ctx, q: "Apply as directed on the product label, typically in the morning.",
+    INTENT_USAGE: lambda ctx, q: ctx["how_to_use"] or "Use according to product instructions.",
+    INTENT_SIDE_EFFECTS: lambda ctx, q: ctx["side_effects"] or "Patch test recommended for sensitive skin.",
+    INTENT_METADATA_SOURCE: lambda ctx, q: ctx["metadata"].get("source", "") or "Product information source not available.",
+    INTENT_INGESTED_AT: lambda ctx, q: ctx["metadata"].get("ingested_at", "") or "Ingestion timestamp not available.",
+    # Fallback: use description or generic answer
+    INTENT_FALLBACK: lambda ctx, q: ctx["description"] or f"{ctx['name']} is a product.",
+}
+
+
 def render_faq(questions: List[Dict[str, Any]], facts: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     For each generated question, produce an answer using rule-driven templating.
     Answers only use facts; if no direct fact exists we produce a conservative, safe answer.
-    Generates varied, specific answers to avoid repetition.
+    Questions carrying an "intent" are answered straight from the dispatch table;
+    free-form questions are classified from their text first.
     """
+    ctx = {
+        "name": facts.get("name", "the product"),
+        "product_id": facts.get("product_id", ""),
+        "description": facts.get("description", ""),
+        "price": facts.get("price", {}),
+        "ingredients": facts.get("ingredients", []),
+        "benefits": facts.get("benefits", []),
+        "how_to_use": facts.get("how_to_use", ""),
+        "side_effects": facts.get("side_effects", ""),
+        "metadata": facts.get("metadata", {}),
+    }
+
     answers = []
-    name = facts.get("name", "the product")
-    product_id = facts.get("product_id", "")
-    description = facts.get("description", "")
-    price = facts.get("price", {})
-    ingredients = facts.get("ingredients", [])
-    benefits = facts.get("benefits", [])
-    how_to_use = facts.get("how_to_use", "")
-    side_effects = facts.get("side_effects", "")
-    metadata = facts.get("metadata", {})
-    
     for q in questions:
-        qid = q.get("id")
-        qtext = q.get("question", "").lower()
-        cat = q.get("category", "General")
-        ans = ""
-        
-        # Specific answer matching based on question content
-        # IMPORTANT: Check percentage questions FIRST before generic "contain" check
-        # This handles questions like "What percentage of Vitamin C does the serum contain?"
-        if "percentage" in qtext:
-            # Try to extract percentage from description or ingredients
-            if "10%" in description or "10%" in str(ingredients):
-                ans = "10%"
-            else:
-                ans = "Percentage not specified in product information."
-        elif "name of the product" in qtext or "what is the name" in qtext:
-            ans = name
-        elif "product id" in qtext:
-            ans = product_id or "Product ID not available."
-        elif "description" in qtext:
-            ans = description or f"{name} is a skincare product."
-        elif "price" in qtext:
-            amount = price.get("amount", 0)
-            currency = price.get("currency", "INR")
-            ans = f"{amount} {currency}" if amount else "Price not available."
-        elif "ingredients" in qtext or "contain" in qtext:
-            if "how many" in qtext:
-                ans = str(len(ingredients)) if ingredients else "0"
-            elif ingredients:
-                ans = ", ".join(ingredients)
-            else:
-                ans = "Ingredient list not available."
-        elif "benefits" in qtext:
-            if "how many" in qtext:
-                ans = str(len(benefits)) if benefits else "0"
-            elif "benefit" in qtext and benefits:
-                # Extract specific benefit from question if mentioned
-                mentioned_benefit = None
-                for b in benefits:
-                    if b.lower() in qtext:
-                        mentioned_benefit = b
-                        break
-                if mentioned_benefit:
-                    ans = f"The product provides {mentioned_benefit.lower()} benefits."
-                else:
-                    ans = ", ".join(benefits)
-            else:
-                ans = ", ".join(benefits) if benefits else "Benefits not specified."
-        elif "use" in qtext or "usage" in qtext or "apply" in qtext:
-            if "how" in qtext:
-                ans = how_to_use or "Follow product label instructions."
-            elif "when" in qtext or "time" in qtext:
-                ans = "Apply as directed on the product label, typically in the morning."
-            else:
-                ans = how_to_use or "Use according to product instructions."
-        elif "side effects" in qtext or "irritation" in qtext or "precaution" in qtext:
-            ans = side_effects or "Patch test recommended for sensitive skin."
-        elif "metadata" in qtext or "source" in qtext:
-            source = metadata.get("source", "")
-            ans = source or "Product information source not available."
-        elif "ingested" in qtext or "when was" in qtext:
-            ingested = metadata.get("ingested_at", "")
-            ans = ingested or "Ingestion timestamp not available."
-        else:
-            # Fallback: use description or generic answer
-            ans = description or f"{name} is a product."
-        
+        answer_fn = _ANSWERS.get(q.get("intent"))
+        if answer_fn is None:
+            answer_fn = _ANSWERS[classify_question(q.get("question", "").lower())]
+        ans = answer_fn(ctx, q)
+
         # Ensure answer is not empty
         if not ans or ans.strip() == "":
             ans = "Information not available."
-        
-        answers.append({"id": qid, "category": cat, "question": q.get("question", ""), "answer": ans})
-    
+
+        answers.append({
+            "id": q.get("id"),
+            "category": q.get("category", "General"),
+            "question": q.get("question", ""),
+            "answer": ans,
+        })
+
     return answers
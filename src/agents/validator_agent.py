@@ -1,5 +1,10 @@
 # src/agents/validator_agent.py
 import logging
+import time
+
+from pydantic import ValidationError
+
+from src.models import ARTIFACTS_VALIDATOR, schema_errors
 from src.state import PipelineState
 
 logger = logging.getLogger("ValidatorAgent")
@@ -9,21 +14,42 @@ def validate_outputs(state: PipelineState) -> PipelineState:
     """
     LangGraph-compliant validation gate.
     Mutates and returns PipelineState.
+    Present artifacts are also checked field by field against the schemas in src.models;
+    failures are kept in state.validation_errors as {"loc", "type", "msg"} dicts.
+    A failure after the product's time budget ran out is final; validation_router stops.
     """
 
     errors = []
+    state.validation_errors = []
 
     if not state.product_page:
         errors.append("Missing product_page")
 
-    if not state.faq or len(state.faq) < 15:
+    if not state.faq:
         errors.append("FAQ missing or < 15 items")
+    elif len(state.faq) < 15:
+        if "faq" in state.degraded_nodes:
+            # The LLM top-up was skipped (src.resilience); ship the deterministic FAQ, flagged
+            logger.warning("Accepting degraded FAQ with %d items", len(state.faq))
+        else:
+            errors.append("FAQ missing or < 15 items")
 
     if not state.comparison:
         errors.append("Missing comparison")
 
+    if not errors:
+        try:
+            ARTIFACTS_VALIDATOR.validate_python(
+                {"product_page": state.product_page, "faq": state.faq, "comparison": state.comparison}
+            )
+        except ValidationError as exc:
+            state.validation_errors = schema_errors(exc)
+            errors.extend(f"{err['loc']}: {err['msg']}" for err in state.validation_errors)
+
     if errors:
         state.is_valid = False
+        if state.deadline_at is not None and time.monotonic() >= state.deadline_at:
+            errors.append("Product time budget exhausted")
         state.error = "; ".join(errors)
         state.errors.extend(errors)
         logger.error("Validation failed: %s", state.error)
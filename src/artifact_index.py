@@ -0,0 +1,272 @@
+# src/artifact_index.py
+"""
+SQLite index of generated artifacts.
+
+The renderer (and the shard writer, for offsets) record one row per product so downstream
+jobs can look products up by id, ingredient, benefit or verdict without rescanning the
+output tree:
+
+    products(product_id, title, price_amount, price_currency, verdict, faq_count)
+    ingredients(product_id, name)       benefits(product_id, name)
+    locations(product_id, artifact, location)   # JSON: file path, manifest or shard offsets
+
+Inserts are grouped into one transaction per `batch_size` products.
+
+    python -m src.artifact_index --db out/index.sqlite ingredient "Vitamin C"
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("ArtifactIndex")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    title TEXT,
+    price_amount REAL,
+    price_currency TEXT,
+    verdict TEXT,
+    faq_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS ingredients (
+    product_id TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (product_id, name)
+);
+CREATE TABLE IF NOT EXISTS benefits (
+    product_id TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (product_id, name)
+);
+CREATE TABLE IF NOT EXISTS locations (
+    product_id TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    location TEXT NOT NULL,
+    PRIMARY KEY (product_id, artifact)
+);
+CREATE INDEX IF NOT EXISTS ingredients_by_name ON ingredients (name);
+CREATE INDEX IF NOT EXISTS benefits_by_name ON benefits (name);
+CREATE INDEX IF NOT EXISTS products_by_verdict ON products (verdict);
+"""
+
+
+def _names(items: Iterable[Any]) -> List[str]:
+    # Comparison pages list plain strings; page blocks list {"name": ...} dicts
+    names = []
+    for item in items or []:
+        name = (item.get("name") or item.get("title")) if isinstance(item, dict) else item
+        if name and name not in names:
+            names.append(str(name))
+    return names
+
+
+class ArtifactIndex:
+    """
+    Batched writer and query helper over one SQLite database file.
+    Safe to share between the pipeline thread and a ShardWriter thread.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats = {"products": 0, "locations": 0, "commits": 0}
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def add_product(
+        self,
+        product_page: Dict[str, Any],
+        faq: List[Dict[str, Any]],
+        comparison: Dict[str, Any],
+        locations: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Index one product's artifacts, replacing any earlier rows for the same product_id.
+        """
+        page = product_page or {}
+        comparison = comparison or {}
+        product_id = page.get("product_id") or "product"
+        product_a = comparison.get("product_A") or {}
+        price = page.get("price_block") or product_a.get("price") or {}
+        ingredients = _names(product_a.get("ingredients") or page.get("ingredients_block"))
+        benefits = _names(product_a.get("benefits") or page.get("benefits_block"))
+
+        with self._lock:
+            conn = self._conn
+            conn.execute(
+                "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    product_id,
+                    page.get("title"),
+                    price.get("amount"),
+                    price.get("currency"),
+                    comparison.get("verdict"),
+                    len(faq or []),
+                ),
+            )
+            conn.execute("DELETE FROM ingredients WHERE product_id = ?", (product_id,))
+            conn.execute("DELETE FROM benefits WHERE product_id = ?", (product_id,))
+            conn.executemany("INSERT OR IGNORE INTO ingredients VALUES (?, ?)", [(product_id, n) for n in ingredients])
+            conn.executemany("INSERT OR IGNORE INTO benefits VALUES (?, ?)", [(product_id, n) for n in benefits])
+            self._add_locations(product_id, locations or {})
+            self.stats["products"] += 1
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._commit()
+        return product_id
+
+    def add_location(self, product_id: str, artifact: str, location: Any) -> None:
+        with self._lock:
+            self._add_locations(product_id, {artifact: location})
+
+    def _add_locations(self, product_id: str, locations: Dict[str, Any]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO locations VALUES (?, ?, ?)",
+            [(product_id, name, json.dumps(loc, ensure_ascii=False)) for name, loc in locations.items()],
+        )
+        self.stats["locations"] += len(locations)
+
+    def _commit(self) -> None:
+        self._conn.commit()
+        self._pending = 0
+        self.stats["commits"] += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self._commit()
+            self._conn.close()
+            self._conn = None
+        logger.info("Indexed %d products in %s (%d commits)", self.stats["products"], self.path, self.stats["commits"])
+
+    def __enter__(self) -> "ArtifactIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def _rows(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            columns = [c[0] for c in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._rows("SELECT * FROM products WHERE product_id = ?", (product_id,))
+        if not rows:
+            return None
+        product = rows[0]
+        product["ingredients"] = [r["name"] for r in self._rows(
+            "SELECT name FROM ingredients WHERE product_id = ? ORDER BY rowid", (product_id,))]
+        product["benefits"] = [r["name"] for r in self._rows(
+            "SELECT name FROM benefits WHERE product_id = ? ORDER BY rowid", (product_id,))]
+        product["locations"] = {r["artifact"]: json.loads(r["location"]) for r in self._rows(
+            "SELECT artifact, location FROM locations WHERE product_id = ?", (product_id,))}
+        return product
+
+    def products_with_ingredient(self, name: str) -> List[str]:
+        return [r["product_id"] for r in self._rows(
+            "SELECT product_id FROM ingredients WHERE name = ? ORDER BY product_id", (name,))]
+
+    def products_with_benefit(self, name: str) -> List[str]:
+        return [r["product_id"] for r in self._rows(
+            "SELECT product_id FROM benefits WHERE name = ? ORDER BY product_id", (name,))]
+
+    def products_with_verdict(self, verdict: str, substring: bool = False) -> List[str]:
+        if substring:
+            sql, param = "SELECT product_id FROM products WHERE verdict LIKE ? ORDER BY product_id", f"%{verdict}%"
+        else:
+            sql, param = "SELECT product_id FROM products WHERE verdict = ? ORDER BY product_id", verdict
+        return [r["product_id"] for r in self._rows(sql, (param,))]
+
+    def counts(self) -> Dict[str, Any]:
+        return {
+            "products": self._rows("SELECT COUNT(*) AS n FROM products")[0]["n"],
+            "verdicts": {r["verdict"]: r["n"] for r in self._rows(
+                "SELECT verdict, COUNT(*) AS n FROM products GROUP BY verdict ORDER BY n DESC")},
+            "top_ingredients": {r["name"]: r["n"] for r in self._rows(
+                "SELECT name, COUNT(*) AS n FROM ingredients GROUP BY name ORDER BY n DESC LIMIT 10")},
+        }
+
+
+class IndexRecorder:
+    """
+    Stand-in for ArtifactIndex in worker processes: records the writes so the parent can
+    replay them into the one index it owns, instead of every worker holding a SQLite write
+    transaction open on the same file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.calls: List[tuple] = []
+
+    def add_product(self, *args: Any) -> None:
+        self.calls.append(("add_product", args))
+
+    def add_location(self, *args: Any) -> None:
+        self.calls.append(("add_location", args))
+
+    def replay(self, index: ArtifactIndex) -> None:
+        for method, args in self.calls:
+            getattr(index, method)(*args)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the SQLite artifact index")
+    parser.add_argument("--db", "-d", required=True, help="Index database written with --index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("product", help="Show one product with its locations").add_argument("product_id")
+    sub.add_parser("ingredient", help="Products containing an ingredient").add_argument("name")
+    sub.add_parser("benefit", help="Products offering a benefit").add_argument("name")
+    verdict = sub.add_parser("verdict", help="Products whose comparison verdict matches")
+    verdict.add_argument("text")
+    verdict.add_argument("--contains", action="store_true", help="Substring match instead of exact")
+    sub.add_parser("stats", help="Product, verdict and ingredient counts")
+    args = parser.parse_args()
+    # sqlite3 would create an empty database for a mistyped path and report no results
+    if not os.path.isfile(args.db):
+        parser.error(f"index database not found: {args.db}")
+
+    index = ArtifactIndex(args.db)
+    try:
+        if args.command == "product":
+            result: Any = index.get_product(args.product_id)
+        elif args.command == "ingredient":
+            result = index.products_with_ingredient(args.name)
+        elif args.command == "benefit":
+            result = index.products_with_benefit(args.name)
+        elif args.command == "verdict":
+            result = index.products_with_verdict(args.text, substring=args.contains)
+        else:
+            result = index.counts()
+    finally:
+        index.close()
+
+    if isinstance(result, list):
+        for product_id in result:
+            print(product_id)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# src/artifact_store.py
+"""
+Content-addressed output store.
+
+The content blocks that repeat across a catalog (ingredients, benefits, usage and safety
+blocks of the product page) and the items of list artifacts (FAQ entries) are serialized
+canonically, hashed with SHA-256 and stored once under blobs/. Everything else (ids, titles, metadata,
+the comparison) is small or specific to one product and stays inline in the product's
+manifest under manifests/, as does any value shorter than min_blob_bytes: a product costs
+its manifest plus the blobs no earlier product produced.
+
+Layout:
+    <root>/blobs/ab/abcdef....json
+    <root>/manifests/<product_id>.json
+"""
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+from urllib.parse import quote
+
+from .utils import read_json, write_bytes_atomic, write_bytes_if_changed, write_json
+
+logger = logging.getLogger("ArtifactStore")
+
+ARTIFACT_FILES = {
+    "product_page": "product_page.json",
+    "faq": "faq.json",
+    "comparison_page": "comparison_page.json",
+}
+
+# Object fields stored as blobs; all other fields are kept inline in the manifest
+SHARED_BLOCKS = ("ingredients_block", "benefits_block", "usage_block", "safety_block")
+
+
+def _canonical(value: Any) -> bytes:
+    # Key order is preserved (not sorted) so reassembled artifacts match the originals
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ContentStore:
+    """
+    Deduplicating artifact store rooted at a directory.
+    """
+
+    def __init__(self, root: str, shared_blocks: Iterable[str] = SHARED_BLOCKS, min_blob_bytes: int = 64):
+        self.root = Path(root)
+        self.shared_blocks = frozenset(shared_blocks)
+        self.min_blob_bytes = min_blob_bytes
+        self.blob_dir = self.root / "blobs"
+        self.manifest_dir = self.root / "manifests"
+        self._known: set = set()
+        self._lock = threading.Lock()
+        self.stats = {
+            "blobs_written": 0,
+            "blobs_deduplicated": 0,
+            "bytes_written": 0,
+            "bytes_deduplicated": 0,
+        }
+
+    # -----------------------------
+    # Blobs
+    # -----------------------------
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.json"
+
+    def put_blob(self, value: Any) -> str:
+        data = _canonical(value)
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._known or self._blob_path(digest).exists():
+            self._count("blobs_deduplicated", "bytes_deduplicated", len(data))
+        else:
+            write_bytes_atomic(data, str(self._blob_path(digest)))
+            self._count("blobs_written", "bytes_written", len(data))
+        self._known.add(digest)
+        return digest
+
+    def get_blob(self, digest: str) -> Any:
+        return json.loads(self._blob_path(digest).read_bytes())
+
+    def _count(self, blobs_key: str, bytes_key: str, size: int) -> None:
+        with self._lock:
+            self.stats[blobs_key] += 1
+            self.stats[bytes_key] += size
+
+    # -----------------------------
+    # Artifacts
+    # -----------------------------
+    def _ref(self, value: Any, shared: bool) -> Dict[str, Any]:
+        if shared and len(_canonical(value)) >= self.min_blob_bytes:
+            return {"blob": self.put_blob(value)}
+        return {"value": value}
+
+    def _deref(self, ref: Any) -> Any:
+        if isinstance(ref, str):  # manifests written before inline values
+            return self.get_blob(ref)
+        return self.get_blob(ref["blob"]) if "blob" in ref else ref["value"]
+
+    def put_artifact(self, artifact: Any) -> Dict[str, Any]:
+        """
+        Store an artifact and return its manifest entry: objects field by field (only
+        shared blocks as blobs), lists item by item, anything else as a whole. FAQ answers
+        often name the product, so a whole-list blob would almost never be shared; the
+        generic items are.
+        """
+        entry: Dict[str, Any] = {"sha256": hashlib.sha256(_canonical(artifact)).hexdigest()}
+        if isinstance(artifact, dict):
+            entry["type"] = "object"
+            entry["fields"] = {
+                key: self._ref(value, key in self.shared_blocks) for key, value in artifact.items()
+            }
+        elif isinstance(artifact, list):
+            entry["type"] = "array"
+            entry["items"] = [self._ref(item, True) for item in artifact]
+        else:
+            entry["type"] = "value"
+            entry.update(self._ref(artifact, True))
+        return entry
+
+    def get_artifact(self, entry: Dict[str, Any]) -> Any:
+        if entry["type"] == "object":
+            return {key: self._deref(ref) for key, ref in entry["fields"].items()}
+        if entry["type"] == "array":
+            return [self._deref(ref) for ref in entry["items"]]
+        return self._deref(entry)
+
+    # -----------------------------
+    # Products
+    # -----------------------------
+    def manifest_path(self, product_id: str) -> Path:
+        return self.manifest_dir / f"{quote(str(product_id), safe='')}.json"
+
+    def put_product(self, product_id: str, artifacts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store all artifacts of one product and write its manifest.
+        """
+        manifest = {
+            "product_id": product_id,
+            "artifacts": {name: self.put_artifact(value) for name, value in artifacts.items()},
+        }
+        write_bytes_if_changed(_canonical(manifest), str(self.manifest_path(product_id)))
+        return manifest
+
+    def read_product(self, product_id: str) -> Dict[str, Any]:
+        """
+        Reassemble every artifact of a product from its manifest.
+        """
+        manifest = read_json(str(self.manifest_path(product_id)))
+        return {name: self.get_artifact(entry) for name, entry in manifest["artifacts"].items()}
+
+    def list_products(self) -> List[str]:
+        if not self.manifest_dir.exists():
+            return []
+        return sorted(read_json(str(p))["product_id"] for p in self.manifest_dir.glob("*.json"))
+
+    def export_product(self, product_id: str, outdir: str) -> None:
+        """
+        Write the reassembled artifacts as the regular per-product JSON files.
+        """
+        for name, artifact in self.read_product(product_id).items():
+            write_json(artifact, str(Path(outdir) / ARTIFACT_FILES.get(name, f"{name}.json")))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reassemble products from a content-addressed store")
+    parser.add_argument("--root", "-r", required=True, help="Store directory")
+    parser.add_argument("--product-id", "-p", help="Product to export (default: all)")
+    parser.add_argument("--outdir", "-o", required=True, help="Directory for the reassembled JSON files")
+    args = parser.parse_args()
+
+    store = ContentStore(args.root)
+    product_ids = [args.product_id] if args.product_id else store.list_products()
+    for pid in product_ids:
+        target = Path(args.outdir) / quote(str(pid), safe="") if len(product_ids) > 1 else Path(args.outdir)
+        store.export_product(pid, str(target))
+    print(f"Exported {len(product_ids)} product(s) to {args.outdir}")
+
+
+if __name__ == "__main__":
+    main()
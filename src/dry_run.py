@@ -0,0 +1,279 @@
+# src/dry_run.py
+"""
+Dry run: how many products of a catalog would hit the LLM fallback, and what would it cost?
+
+Every product goes through sanity checks, fact extraction and the deterministic generators,
+exactly as in src.graph, but nothing is written and no LLM is called. A node would fall back
+to the LLM when
+
+    product_page   the page has no title
+    faq            fewer than 15 FAQ items
+    comparison     the comparison has no verdict
+    (any node)     its deterministic generator raises
+
+For each such call the prompt is built as langchain_orchestrator would build it and its tokens
+counted with tiktoken (len/4 when tiktoken or its encoding is unavailable). Completion tokens
+are estimated from the deterministic output the call would replace, scaled to 15 items for
+the FAQ, or from the facts when there is none. Each fallback is counted as one attempt: the
+JSON retries in _invoke and the validation retries come on top.
+
+The projection models an LLM call as `latency` seconds plus completion tokens at
+`output_tps`, spreads products over `concurrency` workers and applies optional requests /
+tokens per minute limits.
+
+    python -m src.dry_run --catalog catalog.jsonl --concurrency 8
+"""
+import json
+import logging
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .agents.comparison_agent import build_fictional_product_b, compare_products
+from .agents.facts_extractor_agent import extract_facts
+from .agents.question_generator_agent import generate_questions
+from .agents.sanity_agent import run_sanity_checks
+from .agents.template_engine_agent import render_faq, render_product_page
+from .models import ProductModel
+
+logger = logging.getLogger("DryRun")
+
+NODES = ("product_page", "faq", "comparison")
+
+# USD per million tokens (gpt-4o-mini, the model get_llm uses)
+DEFAULT_INPUT_PRICE = 0.15
+DEFAULT_OUTPUT_PRICE = 0.60
+
+
+def token_counter(model: str = "gpt-4o-mini") -> Tuple[Callable[[str], int], str]:
+    """
+    (count(text) -> tokens, name of the method). tiktoken downloads its encodings on first
+    use, so it can be installed and still unavailable offline.
+    """
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception as exc:
+        logger.warning("tiktoken unavailable (%s); estimating tokens as characters / 4", exc)
+        return (lambda text: (len(text) + 3) // 4), "chars/4"
+    return (lambda text: len(encoding.encode(text, disallowed_special=()))), encoding.name
+
+
+def _prompts() -> Dict[str, Any]:
+    from .langchain_orchestrator import COMPARISON_PROMPT, FAQ_PROMPT, PRODUCT_PAGE_PROMPT
+
+    return {"product_page": PRODUCT_PAGE_PROMPT, "faq": FAQ_PROMPT, "comparison": COMPARISON_PROMPT}
+
+
+def _deterministic(facts: Dict[str, Any], page_template: Any) -> Dict[str, Tuple[Any, Optional[str]]]:
+    """
+    node -> (deterministic output or None, why the node would fall back or None)
+    """
+    outputs: Dict[str, Tuple[Any, Optional[str]]] = {}
+    try:
+        page = render_product_page(facts, page_template)
+        outputs["product_page"] = (page, None if page and page.get("title") else "missing title")
+    except Exception as exc:
+        outputs["product_page"] = (None, f"{type(exc).__name__}: {exc}")
+    try:
+        faq = render_faq(generate_questions(facts), facts)
+        outputs["faq"] = (faq, None if faq and len(faq) >= 15 else f"{len(faq or [])} FAQ items")
+    except Exception as exc:
+        outputs["faq"] = (None, f"{type(exc).__name__}: {exc}")
+    try:
+        comparison = compare_products(facts, build_fictional_product_b(facts))
+        outputs["comparison"] = (comparison, None if comparison and comparison.get("verdict") else "missing verdict")
+    except Exception as exc:
+        outputs["comparison"] = (None, f"{type(exc).__name__}: {exc}")
+    return outputs
+
+
+def plan_product(
+    product: ProductModel,
+    count_tokens: Callable[[str], int],
+    page_template: Any = None,
+    prompts: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    The fallbacks one product would need: {"product_id", "deterministic_s", "fallbacks":
+    {node: {"reason", "prompt_tokens", "completion_tokens"}}, "sanity_issues"}.
+    """
+    prompts = prompts or _prompts()
+    started = time.perf_counter()
+    product, issues = run_sanity_checks(product)
+    facts = extract_facts(product)
+    if not facts.get("price"):
+        facts["price"] = {"amount": 0, "currency": "INR"}  # as graph.facts_node
+    outputs = _deterministic(facts, page_template)
+    deterministic_s = time.perf_counter() - started
+
+    fallbacks = {}
+    facts_json = json.dumps(facts)
+    for node in NODES:
+        output, reason = outputs[node]
+        if reason is None:
+            continue
+        if output:
+            completion = count_tokens(json.dumps(output))
+            if node == "faq":
+                completion = completion * 15 // len(output)
+        else:
+            completion = count_tokens(facts_json)
+        fallbacks[node] = {
+            "reason": reason,
+            "prompt_tokens": count_tokens(prompts[node].format(facts_json=facts_json)),
+            "completion_tokens": completion,
+        }
+    return {
+        "product_id": product.id,
+        "deterministic_s": deterministic_s,
+        "fallbacks": fallbacks,
+        "sanity_issues": issues,
+    }
+
+
+def iter_plans(
+    products: Iterable[ProductModel],
+    page_template: Any = None,
+    count_tokens: Optional[Callable[[str], int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    count_tokens = count_tokens or token_counter()[0]
+    prompts = _prompts()
+    for product in products:
+        yield plan_product(product, count_tokens, page_template, prompts)
+
+
+def project(
+    plans: List[Dict[str, Any]],
+    concurrency: int = 1,
+    latency: float = 1.0,
+    output_tps: float = 80.0,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    input_price: float = DEFAULT_INPUT_PRICE,
+    output_price: float = DEFAULT_OUTPUT_PRICE,
+) -> Dict[str, Any]:
+    """
+    Projected wall time and cost of running the plans for real.
+    """
+    concurrency = max(1, concurrency)
+    durations = []
+    calls = prompt_tokens = completion_tokens = 0
+    deterministic_s = llm_s = 0.0
+    for plan in plans:
+        product_llm = sum(latency + f["completion_tokens"] / output_tps for f in plan["fallbacks"].values())
+        durations.append(plan["deterministic_s"] + product_llm)
+        deterministic_s += plan["deterministic_s"]
+        llm_s += product_llm
+        calls += len(plan["fallbacks"])
+        prompt_tokens += sum(f["prompt_tokens"] for f in plan["fallbacks"].values())
+        completion_tokens += sum(f["completion_tokens"] for f in plan["fallbacks"].values())
+
+    # Products are independent: the work spreads over the workers, but no faster than the slowest one
+    bounds = {"concurrency": sum(durations) / concurrency, "slowest_product": max(durations, default=0.0)}
+    if rpm:
+        bounds["rpm_limit"] = calls / rpm * 60
+    if tpm:
+        bounds["tpm_limit"] = (prompt_tokens + completion_tokens) / tpm * 60
+    limit = max(bounds, key=bounds.get)
+    return {
+        "concurrency": concurrency,
+        "llm_calls": calls,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "cost_usd": round((prompt_tokens * input_price + completion_tokens * output_price) / 1e6, 4),
+        "deterministic_s": round(deterministic_s, 3),
+        "llm_s": round(llm_s, 3),
+        "wall_s": round(bounds[limit], 3),
+        "bound_by": limit,
+    }
+
+
+def dry_run(
+    products: Iterable[ProductModel],
+    page_template: Any = None,
+    details_path: Optional[str] = None,
+    count_tokens: Optional[Callable[[str], int]] = None,
+    **projection,
+) -> Dict[str, Any]:
+    """
+    Plan every product and summarize: fallbacks per node and reason, and the projection
+    (keyword arguments are passed to project). details_path, when given, receives one JSON
+    line per product that would call the LLM. count_tokens defaults to token_counter().
+    """
+    if count_tokens is None:
+        count_tokens, counter = token_counter()
+    else:
+        counter = getattr(count_tokens, "__name__", "custom")
+    plans = []
+    by_node: Counter = Counter()
+    reasons: Counter = Counter()
+    details = open(details_path, "w", encoding="utf-8") if details_path else None
+    try:
+        for plan in iter_plans(products, page_template, count_tokens):
+            # Only what the projection needs is kept
+            plans.append({"deterministic_s": plan["deterministic_s"], "fallbacks": plan["fallbacks"]})
+            for node, fallback in plan["fallbacks"].items():
+                by_node[node] += 1
+                reasons[f"{node}: {fallback['reason']}"] += 1
+            if details is not None and plan["fallbacks"]:
+                details.write(json.dumps(plan, ensure_ascii=False) + "\n")
+    finally:
+        if details is not None:
+            details.close()
+
+    report = {
+        "products": len(plans),
+        "products_with_fallback": sum(1 for plan in plans if plan["fallbacks"]),
+        "fallbacks": {node: by_node[node] for node in NODES},
+        "reasons": dict(reasons.most_common()),
+        "token_counter": counter,
+        "projection": project(plans, **projection),
+    }
+    logger.info(
+        "%d of %d products would call the LLM (%d calls, %d tokens)",
+        report["products_with_fallback"], report["products"],
+        report["projection"]["llm_calls"], report["projection"]["total_tokens"],
+    )
+    return report
+
+
+def main():
+    import argparse
+
+    from .agents.ingest_agent import iter_catalog
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Predict LLM fallbacks, tokens, wall time and cost without generating")
+    parser.add_argument("--catalog", "-c", required=True)
+    parser.add_argument("--template", "-t", default=None)
+    parser.add_argument("--concurrency", "-w", type=int, default=1, help="Products processed in parallel")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per LLM call before the first token")
+    parser.add_argument("--output-tps", type=float, default=80.0, help="Completion tokens per second per call")
+    parser.add_argument("--rpm", type=float, default=None, help="LLM requests per minute limit")
+    parser.add_argument("--tpm", type=float, default=None, help="LLM tokens per minute limit")
+    parser.add_argument("--input-price", type=float, default=DEFAULT_INPUT_PRICE, help="USD per 1M prompt tokens")
+    parser.add_argument("--output-price", type=float, default=DEFAULT_OUTPUT_PRICE, help="USD per 1M completion tokens")
+    parser.add_argument("--details", default=None, help="JSON Lines file with the plan of every product that falls back")
+    args = parser.parse_args()
+
+    configure_logging(batch=True)
+    report = dry_run(
+        iter_catalog(args.catalog),
+        page_template=args.template,
+        details_path=args.details,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        output_tps=args.output_tps,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        input_price=args.input_price,
+        output_price=args.output_price,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 # src/graph.py
 import logging
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any
 from langgraph.graph import StateGraph, END
 
+from src import resilience
+from src.logging_setup import product_context
 from src.models import ProductModel
 from src.state import PipelineState
 
@@ -17,7 +23,28 @@ from src.langchain_orchestrator import (
 )
 
 logger = logging.getLogger("LangGraphPipeline")
-logging.basicConfig(level=logging.INFO)
+
+
+def _llm_fallback(state: PipelineState, node: str, generate, deterministic):
+    """
+    generate(facts) within the node / product time budget and through the shared circuit
+    breaker. When the breaker is open, the budget is spent or the call fails, the
+    deterministic output is kept and the state is marked degraded.
+    """
+    deadline = resilience.budget_deadline(state.node_timeout, resilience.remaining(state.deadline_at))
+    if deadline is not None and deadline <= time.monotonic():
+        reason = "product time budget exhausted"
+    else:
+        try:
+            return resilience.llm_breaker.call(generate, state.facts, deadline=deadline)
+        except Exception as e:
+            reason = f"{type(e).__name__}: {e}"
+    logger.warning("LLM fallback for %s skipped (%s), keeping deterministic output", node, reason)
+    state.degraded = True
+    if node not in state.degraded_nodes:
+        state.degraded_nodes.append(node)
+    return deterministic
+
 
 # -----------------------------
 # Graph Nodes
@@ -61,18 +88,18 @@ def product_page_node(state: PipelineState) -> PipelineState:
     
     try:
         # Primary path: deterministic template rendering
-        state.product_page = render_product_page(state.facts)
+        state.product_page = render_product_page(state.facts, state.page_template)
         
         # Validate deterministic output
         if not state.product_page or not state.product_page.get("title"):
             logger.warning("Deterministic product page incomplete, falling back to LLM")
-            state.product_page = generate_product_page(state.facts)
+            state.product_page = _llm_fallback(state, "product_page", generate_product_page, state.product_page)
         else:
             logger.info("Product page generated using deterministic agent")
     except Exception as e:
         logger.error(f"Deterministic product page generation failed: {e}, falling back to LLM")
         # Fallback to LLM on error
-        state.product_page = generate_product_page(state.facts)
+        state.product_page = _llm_fallback(state, "product_page", generate_product_page, None)
     
     return state
 
@@ -93,13 +120,13 @@ def faq_node(state: PipelineState) -> PipelineState:
         # Validate deterministic output
         if not state.faq or len(state.faq) < 15:
             logger.warning(f"Deterministic FAQ generated only {len(state.faq) if state.faq else 0} items, falling back to LLM")
-            state.faq = generate_faq(state.facts)
+            state.faq = _llm_fallback(state, "faq", generate_faq, state.faq)
         else:
-            logger.info(f"FAQ generated using deterministic agent: {len(state.faq)} items")
+            logger.info("FAQ generated using deterministic agent: %d items", len(state.faq))
     except Exception as e:
         logger.error(f"Deterministic FAQ generation failed: {e}, falling back to LLM")
         # Fallback to LLM on error
-        state.faq = generate_faq(state.facts)
+        state.faq = _llm_fallback(state, "faq", generate_faq, None)
     
     return state
 
@@ -119,13 +146,13 @@ def comparison_node(state: PipelineState) -> PipelineState:
         # Validate deterministic output
         if not state.comparison or not state.comparison.get("verdict"):
             logger.warning("Deterministic comparison incomplete, falling back to LLM")
-            state.comparison = generate_comparison(state.facts)
+            state.comparison = _llm_fallback(state, "comparison", generate_comparison, state.comparison)
         else:
             logger.info("Comparison generated using deterministic agent")
     except Exception as e:
         logger.error(f"Deterministic comparison generation failed: {e}, falling back to LLM")
         # Fallback to LLM on error
-        state.comparison = generate_comparison(state.facts)
+        state.comparison = _llm_fallback(state, "comparison", generate_comparison, None)
     
     return state
 
@@ -135,13 +162,56 @@ def validate_node(state: PipelineState) -> PipelineState:
     return state
 
 
+# ArtifactIndex and output store shared by the products of a run or worker
+# (run_product(index=..., store=...)), so index inserts are batched across products and
+# one ShardWriter owns the shards instead of one writer per product
+_shared_index: ContextVar = ContextVar("artifact_index", default=None)
+_shared_store: ContextVar = ContextVar("artifact_store", default=None)
+
+
+def open_store(output_mode: str, outdir: str, compression: str = None, index: Any = None) -> Any:
+    """
+    The store write_outputs hands artifacts to for output_mode, or None for plain files.
+    The caller closes it (ShardWriter.close flushes the last blocks to the shards and index).
+    """
+    if output_mode == "cas":
+        from src.artifact_store import ContentStore
+        return ContentStore(outdir)
+    if output_mode == "shards":
+        from src.shard_writer import ShardWriter
+        return ShardWriter(outdir, compression=compression, index=index)
+    return None
+
+
 def render_node(state: PipelineState) -> PipelineState:
-    write_outputs(
-        product_page=state.product_page,
-        faq=state.faq,
-        comparison=state.comparison,
-        outdir=state.outdir,
-    )
+    index = _shared_index.get()
+    owned_index = index is None and bool(state.index_path)
+    if owned_index:
+        from src.artifact_index import ArtifactIndex
+        index = ArtifactIndex(state.index_path)
+
+    store = _shared_store.get()
+    owned_store = store is None
+    try:
+        if owned_store:
+            store = open_store(state.output_mode, state.outdir, state.output_compression, index)
+        try:
+            write_outputs(
+                product_page=state.product_page,
+                faq=state.faq,
+                comparison=state.comparison,
+                outdir=state.outdir,
+                store=store,
+                output_format=state.output_format,
+                index=index,
+            )
+        finally:
+            # The shard writer reports offsets to the index while closing
+            if owned_store and hasattr(store, "close"):
+                store.close()
+    finally:
+        if owned_index:
+            index.close()
     return state
 
 
@@ -153,9 +223,20 @@ def validation_router(state: PipelineState) -> str:
     if state.is_valid:
         return "render"
 
+    # ⏱ No time left for another attempt
+    if state.deadline_at is not None and time.monotonic() >= state.deadline_at:
+        # validate_outputs has recorded it in state.errors
+        logger.error("Product time budget exhausted, not retrying")
+        return END
+
     # 🔁 Retry path
     if state.retry_count < state.max_retries:
         state.retry_count += 1
+        if state.validation_errors:
+            logger.warning(
+                "Retrying after schema errors in %s",
+                ", ".join(sorted({err["loc"] for err in state.validation_errors})),
+            )
 
         # Reset downstream artifacts before retry
         state.product_page = None
@@ -174,16 +255,26 @@ def validation_router(state: PipelineState) -> str:
 # -----------------------------
 # Graph Builder
 # -----------------------------
-def build_graph():
+def build_graph(profiled: bool = False):
+    """
+    profiled wraps every node so profilers attribute its time to "node:<name>"
+    (src.profiling); the plain graph has no wrappers and no overhead.
+    """
     graph = StateGraph(PipelineState)
-
-    graph.add_node("sanity", sanity_node)
-    graph.add_node("facts", facts_node)
-    graph.add_node("product_page", product_page_node)
-    graph.add_node("faq", faq_node)
-    graph.add_node("comparison", comparison_node)
-    graph.add_node("validate", validate_node)
-    graph.add_node("render", render_node)
+    nodes = {
+        "sanity": sanity_node,
+        "facts": facts_node,
+        "product_page": product_page_node,
+        "faq": faq_node,
+        "comparison": comparison_node,
+        "validate": validate_node,
+        "render": render_node,
+    }
+    if profiled:
+        from src.profiling import wrap_node
+        nodes = {name: wrap_node(name, fn) for name, fn in nodes.items()}
+    for name, fn in nodes.items():
+        graph.add_node(name, fn)
 
     graph.set_entry_point("sanity")
 
@@ -212,15 +303,89 @@ def build_graph():
 # -----------------------------
 # Public Entry
 # -----------------------------
-def run_graph(input_path: str, outdir: str):
-    from src.agents.ingest_agent import ingest_from_file
-
-    product_model = ingest_from_file(input_path)
-
+def get_compiled_graph(profiled: bool = False):
+    """
+    Compiled graph shared by every run in this process; compiling is much more
+    expensive than invoking, which matters when one worker runs many products.
+    """
+    return _compiled_graph(bool(profiled))
+
+
+@lru_cache(maxsize=None)
+def _compiled_graph(profiled: bool):
+    # Keyed by the normalized flag: get_compiled_graph() and get_compiled_graph(False)
+    # would otherwise be separate lru_cache entries, and compile twice
+    return build_graph(profiled)
+
+
+def run_product(
+    product_model: ProductModel,
+    outdir: str,
+    page_template: str = None,
+    output_mode: str = "files",
+    output_compression: str = None,
+    output_format: str = "pretty",
+    index_path: str = None,
+    profiled: bool = False,
+    node_timeout: float = None,
+    product_timeout: float = None,
+    index: Any = None,
+    store: Any = None,
+):
+    """
+    Run the graph for an already ingested product.
+    profiled selects the graph whose nodes are wrapped for src.profiling.
+    node_timeout / product_timeout bound the LLM fallbacks and retries in seconds (src.resilience).
+    index is an open src.artifact_index.ArtifactIndex (or IndexRecorder) to update instead of
+    opening index_path for this product; the caller opens it once per run and closes it.
+    store, likewise, is an open store from open_store (or a ShardRecorder) that receives the
+    artifacts instead of one opened for this product under outdir.
+    """
     initial_state = PipelineState(
         product=product_model.to_dict(),
         outdir=outdir,
+        page_template=page_template,
+        output_mode=output_mode,
+        output_compression=output_compression,
+        output_format=output_format,
+        index_path=index_path or getattr(index, "path", None),
+        node_timeout=node_timeout,
+        deadline_at=resilience.budget_deadline(product_timeout),
     )
+    index_token = _shared_index.set(index)
+    store_token = _shared_store.set(store)
+    try:
+        with product_context(product_model.id):
+            return get_compiled_graph(profiled).invoke(initial_state)
+    finally:
+        _shared_store.reset(store_token)
+        _shared_index.reset(index_token)
+
+
+def run_graph(
+    input_path: str,
+    outdir: str,
+    page_template: str = None,
+    output_mode: str = "files",
+    output_compression: str = None,
+    output_format: str = "pretty",
+    index_path: str = None,
+    profiled: bool = False,
+    node_timeout: float = None,
+    product_timeout: float = None,
+):
+    from src.agents.ingest_agent import ingest_from_file
 
-    graph = build_graph()
-    return graph.invoke(initial_state)
+    product_model = ingest_from_file(input_path)
+    return run_product(
+        product_model,
+        outdir,
+        page_template=page_template,
+        output_mode=output_mode,
+        output_compression=output_compression,
+        output_format=output_format,
+        index_path=index_path,
+        profiled=profiled,
+        node_timeout=node_timeout,
+        product_timeout=product_timeout,
+    )
@@ -9,64 +9,28 @@ Uses:
  - Deterministic FAQ fallback system (no empty answers)
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional
 import os
 import json
 import logging
+import time
 from pathlib import Path
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from pydantic import BaseModel, ValidationError
-
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 
-logger = logging.getLogger("LangChainOrchestrator")
-logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
-
-
-# ------------------------------------------------------------
-# Pydantic Schemas
-# ------------------------------------------------------------
-class ProductPageSchema(BaseModel):
-    product_id: str
-    title: str
-    metadata: Dict[str, Any]
-    summary_block: Dict[str, Any]
-    ingredients_block: List[Dict[str, Any]]
-    benefits_block: List[Dict[str, Any]]
-    usage_block: Dict[str, Any]
-    safety_block: Dict[str, Any]
-    price_block: Dict[str, Any]
-
+from .models import COMPARISON_VALIDATOR, FAQ_VALIDATOR, PRODUCT_PAGE_VALIDATOR
 
-class FAQItem(BaseModel):
-    id: str
-    category: str
-    question: str
-    answer: str
-
-
-class ComparisonAspect(BaseModel):
-    aspect: str
-    A_only: List[str]
-    B_only: List[str]
-    common: List[str]
-
-
-class ComparisonSchema(BaseModel):
-    product_A: Dict[str, Any]
-    product_B: Dict[str, Any]
-    comparisons: List[ComparisonAspect]
-    verdict: str
+logger = logging.getLogger("LangChainOrchestrator")
 
 
 # ------------------------------------------------------------
 # LLM Provider — GPT-4o-mini
 # ------------------------------------------------------------
-def get_llm():
+def get_llm(timeout: Optional[float] = None):
     key = os.environ.get("OPENAI_API_KEY")
     if not key:
         raise EnvironmentError("Missing OPENAI_API_KEY in .env")
@@ -74,10 +38,23 @@ def get_llm():
     return ChatOpenAI(
         model="gpt-4o-mini",
         temperature=0,
-        max_tokens=4096
+        max_tokens=4096,
+        timeout=timeout,
     )
 
 
+def _llm_for(deadline: Optional[float]):
+    """
+    get_llm with its request timeout bounded by deadline (a time.monotonic() timestamp).
+    """
+    if deadline is None:
+        return get_llm()
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError("LLM time budget exhausted")
+    return get_llm(timeout=left)
+
+
 # ------------------------------------------------------------
 # STRICT PROMPTS
 # ------------------------------------------------------------
@@ -166,8 +143,10 @@ COMPARISON_PROMPT = PromptTemplate(
 # ------------------------------------------------------------
 # INVOKE — with retry/trimming
 # ------------------------------------------------------------
-def _invoke(prompt: PromptTemplate, llm, facts: Dict[str, Any], retries=3):
-    for _ in range(retries):
+def _invoke(prompt: PromptTemplate, llm, facts: Dict[str, Any], retries=3, deadline: Optional[float] = None):
+    for attempt in range(retries):
+        if attempt and deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"LLM time budget exhausted after {attempt} attempts")
         resp = llm.invoke(prompt.format(facts_json=json.dumps(facts)))
         content = resp.content.strip()
 
@@ -244,8 +223,7 @@ def _sanitize_and_fill_faq(data: Any, facts: Dict[str, Any]):
 
     sanitized = sanitized[:15]
 
-    for item in sanitized:
-        FAQItem.parse_obj(item)
+    FAQ_VALIDATOR.validate_python(sanitized)
 
     return sanitized
 
@@ -253,20 +231,21 @@ def _sanitize_and_fill_faq(data: Any, facts: Dict[str, Any]):
 # ------------------------------------------------------------
 # Generators
 # ------------------------------------------------------------
-def generate_product_page(facts):
-    data = _invoke(PRODUCT_PAGE_PROMPT, get_llm(), facts)
-    ProductPageSchema.parse_obj(data)
+# deadline: time.monotonic() timestamp bounding the request timeouts and retries
+def generate_product_page(facts, deadline: Optional[float] = None):
+    data = _invoke(PRODUCT_PAGE_PROMPT, _llm_for(deadline), facts, deadline=deadline)
+    PRODUCT_PAGE_VALIDATOR.validate_python(data)
     return data
 
 
-def generate_faq(facts):
-    raw = _invoke(FAQ_PROMPT, get_llm(), facts)
+def generate_faq(facts, deadline: Optional[float] = None):
+    raw = _invoke(FAQ_PROMPT, _llm_for(deadline), facts, deadline=deadline)
     final = _sanitize_and_fill_faq(raw, facts)
     return final
 
 
-def generate_comparison(facts):
-    data = _invoke(COMPARISON_PROMPT, get_llm(), facts)
+def generate_comparison(facts, deadline: Optional[float] = None):
+    data = _invoke(COMPARISON_PROMPT, _llm_for(deadline), facts, deadline=deadline)
 
     # Patch price strings
     A_price = data["product_A"]["price"]["amount"]
@@ -288,7 +267,7 @@ def generate_comparison(facts):
     else:
         data["verdict"] = "Both priced equally"
 
-    ComparisonSchema.parse_obj(data)
+    COMPARISON_VALIDATOR.validate_python(data)
     return data
 
 
@@ -0,0 +1,290 @@
+# src/logging_setup.py
+"""
+One logging setup for the pipeline and its batch runners.
+
+Callers only enqueue records. A QueueListener thread formats them and writes them out, so
+log I/O never blocks a worker. Records can be plain text or JSON lines, and carry the
+product_id of the product being processed (set with product_context). Three filters can
+reduce volume:
+
+    batch mode   per-product INFO lines from the agents are counted, not written, and
+                 the counts are logged as one summary when logging stops
+    sampling     keep 1 in N INFO/DEBUG records of a logger, e.g. {"RendererAgent": 0.01}
+    rate limit   at most N records per second per logger (errors are never dropped)
+
+Configure once in the entry point (run.py, the module CLIs); library modules only call
+logging.getLogger.
+"""
+import atexit
+import contextlib
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, TextIO, Union
+
+TEXT_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+
+# Loggers that write INFO lines for every product; summarized in batch mode
+PER_PRODUCT_LOGGERS = frozenset({
+    "IngestAgent",
+    "SanityCheckAgent",
+    "FactsExtractorAgent",
+    "QuestionGeneratorAgent",
+    "TemplateEngineAgent",
+    "ContentBlockAgent",
+    "ComparisonAgent",
+    "RendererAgent",
+    "ValidatorAgent",
+    "Orchestrator",
+    "LangGraphPipeline",
+})
+
+product_id_var: ContextVar[Optional[str]] = ContextVar("product_id", default=None)
+
+
+@contextlib.contextmanager
+def product_context(product_id: Optional[str]) -> Iterator[None]:
+    """
+    Tag every record logged inside the block (in this thread / task) with product_id.
+    """
+    token = product_id_var.set(product_id)
+    try:
+        yield
+    finally:
+        product_id_var.reset(token)
+
+
+# -----------------------------
+# Filters (run in the calling thread, before a record is queued)
+# -----------------------------
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "product_id"):
+            record.product_id = product_id_var.get()
+        return True
+
+
+class BatchSummaryFilter(logging.Filter):
+    """
+    Drops INFO/DEBUG records of per-product loggers and counts them by message template.
+    """
+
+    def __init__(self, loggers: frozenset = PER_PRODUCT_LOGGERS):
+        super().__init__()
+        self.loggers = loggers
+        self.suppressed: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or record.name not in self.loggers:
+            return True
+        with self._lock:
+            self.suppressed[(record.name, str(record.msg))] += 1
+        return False
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-logger sampling (keep every Nth INFO/DEBUG record for a rate of 1/N) and
+    rate limits (token bucket, records per second) for anything below ERROR.
+    """
+
+    def __init__(
+        self,
+        sample: Optional[Dict[str, float]] = None,
+        rate_limit: Optional[Dict[str, float]] = None,
+        clock=time.monotonic,
+    ):
+        super().__init__()
+        self.every = {name: max(1, round(1 / rate)) for name, rate in (sample or {}).items() if rate > 0}
+        self.muted = {name for name, rate in (sample or {}).items() if rate <= 0}
+        self.rate_limit = dict(rate_limit or {})
+        self.dropped: Counter = Counter()
+        self._seen: Counter = Counter()
+        self._buckets: Dict[str, list] = {}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        name = record.name
+        if record.levelno >= logging.ERROR:
+            return True
+        with self._lock:
+            if record.levelno < logging.WARNING:
+                if name in self.muted:
+                    self.dropped[name] += 1
+                    return False
+                every = self.every.get(name)
+                if every is not None:
+                    self._seen[name] += 1
+                    if (self._seen[name] - 1) % every:
+                        self.dropped[name] += 1
+                        return False
+            limit = self.rate_limit.get(name)
+            if limit is not None:
+                now = self._clock()
+                tokens, last = self._buckets.get(name, (limit, now))
+                tokens = min(limit, tokens + (now - last) * limit)
+                if tokens < 1:
+                    self._buckets[name] = [tokens, now]
+                    self.dropped[name] += 1
+                    return False
+                self._buckets[name] = [tokens - 1, now]
+        return True
+
+
+# -----------------------------
+# Formatting (runs in the listener thread)
+# -----------------------------
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "product_id", None) is not None:
+            entry["product_id"] = record.product_id
+        if getattr(record, "summary", None) is not None:
+            entry["summary"] = record.summary
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records with their message merged but otherwise unformatted, so formatting
+    happens in the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks hold frames that must not outlive this thread's stack
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LoggingSetup:
+    """
+    Handle returned by configure_logging; stop() writes the batch summary and flushes.
+    """
+
+    def __init__(self, listener, queue_handler, batch_filter, sampling_filter, started):
+        self.listener = listener
+        self.queue_handler = queue_handler
+        self.batch_filter = batch_filter
+        self.sampling_filter = sampling_filter
+        self.started = started
+        self._stopped = False
+
+    def summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {"elapsed_s": round(time.perf_counter() - self.started, 3)}
+        if self.batch_filter is not None:
+            with self.batch_filter._lock:
+                summary["suppressed"] = {
+                    f"{name}: {msg}": count for (name, msg), count in self.batch_filter.suppressed.most_common()
+                }
+        if self.sampling_filter is not None:
+            with self.sampling_filter._lock:
+                summary["dropped"] = dict(self.sampling_filter.dropped)
+        return summary
+
+    def stop(self) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        summary = self.summary()
+        if summary.get("suppressed") or summary.get("dropped"):
+            lines = [f"{count:>8d}  {key}" for key, count in summary.get("suppressed", {}).items()]
+            lines += [f"{count:>8d}  {name} (sampled out / rate limited)" for name, count in summary.get("dropped", {}).items()]
+            logging.getLogger("Logging").info("Batch summary:\n%s", "\n".join(lines), extra={"summary": summary})
+        self.listener.stop()
+        logging.getLogger().removeHandler(self.queue_handler)
+
+
+_active: Optional[LoggingSetup] = None
+
+
+def configure_logging(
+    level: Union[int, str] = logging.INFO,
+    fmt: str = "text",
+    stream: Optional[TextIO] = None,
+    filename: Optional[str] = None,
+    batch: bool = False,
+    sample: Optional[Dict[str, float]] = None,
+    rate_limit: Optional[Dict[str, float]] = None,
+) -> LoggingSetup:
+    """
+    Route all logging through a queue to a stream (stderr by default) or file.
+    Replaces a previous configure_logging setup; handlers added by others are removed too,
+    so the records are not written twice.
+    """
+    global _active
+    if _active is not None:
+        _active.stop()
+
+    if filename:
+        target: logging.Handler = logging.FileHandler(filename, encoding="utf-8")
+    else:
+        target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ContextFilter())
+    batch_filter = BatchSummaryFilter() if batch else None
+    if batch_filter is not None:
+        queue_handler.addFilter(batch_filter)
+    sampling_filter = SamplingFilter(sample, rate_limit) if (sample or rate_limit) else None
+    if sampling_filter is not None:
+        queue_handler.addFilter(sampling_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level if isinstance(level, int) else level.upper())
+
+    listener = logging.handlers.QueueListener(queue_handler.queue, target, respect_handler_level=True)
+    listener.start()
+    _active = LoggingSetup(listener, queue_handler, batch_filter, sampling_filter, time.perf_counter())
+    return _active
+
+
+def stop_logging() -> None:
+    """
+    Write the batch summary and flush queued records (also runs at interpreter exit).
+    """
+    global _active
+    if _active is not None:
+        _active.stop()
+        _active = None
+
+
+atexit.register(stop_logging)
+
+
+def parse_logger_map(text: str) -> Dict[str, float]:
+    """
+    "RendererAgent=0.01,SanityCheckAgent=0.1" -> {"RendererAgent": 0.01, "SanityCheckAgent": 0.1}
+    """
+    values = {}
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        name, _, value = part.partition("=")
+        values[name.strip()] = float(value)
+    return values
@@ -1,7 +1,8 @@
 # src/models.py
 from __future__ import annotations
 from dataclasses import dataclass, asdict, field
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Sequence, get_args, get_origin
 from datetime import datetime
 import uuid
 
@@ -69,7 +70,8 @@ class ProductModel:
 # =====================================================
 # NEW: Output validation schemas (LangGraph + rubric)
 # =====================================================
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing_extensions import TypedDict
 
 
 class ProductPageSchema(BaseModel):
@@ -103,3 +105,73 @@ class ComparisonSchema(BaseModel):
     product_B: Dict[str, Any]
     comparisons: List[ComparisonAspect]
     verdict: str
+
+
+class ProductArtifacts(BaseModel):
+    product_page: ProductPageSchema
+    faq: List[FAQItem]
+    comparison: ComparisonSchema
+
+
+def _plain_type(tp: Any) -> Any:
+    """
+    tp with every pydantic model replaced by its _plain_schema TypedDict.
+    """
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        return _plain_schema(tp)
+    origin, args = get_origin(tp), get_args(tp)
+    if origin is list:
+        return List[_plain_type(args[0])]
+    if origin is dict:
+        return Dict[args[0], _plain_type(args[1])]
+    return tp
+
+
+@lru_cache(maxsize=None)
+def _plain_schema(model: type) -> Any:
+    """
+    A TypedDict with the fields of a pydantic model. Validating against it checks the same
+    fields and types but builds no model instances, which is about twice as fast; the
+    models above stay the single definition of the schemas.
+    """
+    return TypedDict(
+        f"{model.__name__}Dict",
+        {name: _plain_type(info.annotation) for name, info in model.model_fields.items()},
+    )
+
+
+# Validators are compiled once, at import, and shared by the LLM path,
+# validator_agent.validate_outputs and batch validation
+PRODUCT_PAGE_VALIDATOR = TypeAdapter(_plain_schema(ProductPageSchema))
+FAQ_VALIDATOR = TypeAdapter(List[_plain_schema(FAQItem)])
+COMPARISON_VALIDATOR = TypeAdapter(_plain_schema(ComparisonSchema))
+ARTIFACTS_VALIDATOR = TypeAdapter(_plain_schema(ProductArtifacts))
+
+
+def schema_errors(exc: ValidationError) -> List[Dict[str, Any]]:
+    """
+    Structured errors: {"loc": "faq.3.answer", "type": "string_type", "msg": ...} per failing field.
+    """
+    return [
+        {"loc": ".".join(str(part) for part in err["loc"]), "type": err["type"], "msg": err["msg"]}
+        for err in exc.errors(include_url=False, include_input=False)
+    ]
+
+
+def validate_artifacts_batch(items: Sequence[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Validate many {"product_page", "faq", "comparison"} dicts in one call.
+    Returns the structured errors of each item (empty when valid), in order.
+    Items go through the compiled validator one at a time: validating the whole list at once
+    holds every validated copy until the end and is slower (benchmarks/bench_validation.py).
+    """
+    errors: List[List[Dict[str, Any]]] = []
+    validate = ARTIFACTS_VALIDATOR.validate_python
+    for item in items:
+        try:
+            validate(item)
+        except ValidationError as exc:
+            errors.append(schema_errors(exc))
+        else:
+            errors.append([])
+    return errors
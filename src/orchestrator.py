@@ -10,6 +10,8 @@ from .agents.content_block_agent import generate_summary_block  # (kept for refe
 from .agents.template_engine_agent import render_product_page, render_faq
 from .agents.comparison_agent import build_fictional_product_b, compare_products
 from .agents.renderer_agent import write_outputs
+from .logging_setup import product_context
+from .models import ProductModel
 
 logger = logging.getLogger("Orchestrator")
 
@@ -29,32 +31,45 @@ def run_pipeline(input_path: str, outdir: str) -> Dict[str, Any]:
     # 1. Ingest
     product = ingest_from_file(input_path)
 
-    # 2. Sanity
-    product, issues = run_sanity_checks(product)
-    if issues:
-        logger.warning("Sanity issues found: %s", issues)
+    # 2-6. Generate
+    artifacts = generate_artifacts(product)
 
-    # 3. Facts extraction
-    facts = extract_facts(product)
+    # 7. Renderer -> write outputs
+    write_outputs(artifacts["product_page"], artifacts["faq"], artifacts["comparison"], outdir)
 
-    # 4. Question generation
-    questions = generate_questions(facts)
+    # return key artifacts for inspection/testing
+    return artifacts
 
-    # 5. Render product page & FAQ
-    product_page = render_product_page(facts)
-    faq = render_faq(questions, facts)
 
-    # 6. Comparison
-    product_b = build_fictional_product_b(facts)
-    comparison = compare_products(facts, product_b)
+def generate_artifacts(product: ProductModel) -> Dict[str, Any]:
+    """
+    Deterministic generation for one ingested product, without any I/O
+    (steps 2-6 of run_pipeline). Also used by the HTTP server.
+    Records logged meanwhile carry the product's ID.
+    """
+    with product_context(product.id):
+        # 2. Sanity
+        product, issues = run_sanity_checks(product)
+        if issues:
+            logger.warning("Sanity issues found: %s", issues)
 
-    # 7. Renderer -> write outputs
-    write_outputs(product_page, faq, comparison, outdir)
+        # 3. Facts extraction
+        facts = extract_facts(product)
 
-    # return key artifacts for inspection/testing
-    return {
-        "product_page": product_page,
-        "faq": faq,
-        "comparison": comparison,
-        "issues": issues
-    }
+        # 4. Question generation
+        questions = generate_questions(facts)
+
+        # 5. Render product page & FAQ
+        product_page = render_product_page(facts)
+        faq = render_faq(questions, facts)
+
+        # 6. Comparison
+        product_b = build_fictional_product_b(facts)
+        comparison = compare_products(facts, product_b)
+
+        return {
+            "product_page": product_page,
+            "faq": faq,
+            "comparison": comparison,
+            "issues": issues
+        }
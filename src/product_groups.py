@@ -0,0 +1,253 @@
+# src/product_groups.py
+"""
+Variant-aware batch generation.
+
+Size and pack variants of a product usually share everything except name, product_id,
+price and metadata. Products are grouped by a fingerprint of their other facts. Each group
+is generated once, from its first product, and every other member gets a copy with only
+the variant-dependent parts re-rendered:
+
+    product page   product_id, title, metadata, price_block (+ summary_block without a description)
+    FAQ            answers about name, ID, price and metadata (+ description answers without one)
+    comparison     product names and prices, price aspect and verdict
+
+Ingredient, benefit, usage and safety blocks, the question set and the ingredient / benefit
+comparison aspects are shared by the group. A short FAQ completed by the LLM fallback is
+not: its free text may name the variant anywhere, so the fallback runs for every member.
+Outputs are identical to generate_artifacts run product by product.
+
+    python -m src.product_groups --catalog catalog.jsonl --outdir out
+"""
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from .agents.comparison_agent import _assemble_comparison, build_fictional_product_b, compare_products
+from .agents.content_block_agent import generate_price_block, generate_summary_block
+from .agents.facts_extractor_agent import extract_facts
+from .agents.question_generator_agent import generate_questions
+from .agents.renderer_agent import write_outputs
+from .agents.sanity_agent import run_batch_sanity_checks
+from .agents.template_engine_agent import (
+    INTENT_DESCRIPTION,
+    INTENT_FALLBACK,
+    INTENT_INGESTED_AT,
+    INTENT_METADATA_SOURCE,
+    INTENT_NAME,
+    INTENT_PRICE,
+    INTENT_PRODUCT_ID,
+    classify_question,
+    render_faq,
+    render_product_page,
+)
+from .models import ProductModel
+
+logger = logging.getLogger("ProductGroups")
+
+# Facts that may differ inside a group
+VARIANT_FIELDS = ("product_id", "name", "price", "metadata")
+
+# FAQ answers that read variant fields; description answers fall back to the name
+_VARIANT_INTENTS = frozenset({INTENT_NAME, INTENT_PRODUCT_ID, INTENT_PRICE, INTENT_METADATA_SOURCE, INTENT_INGESTED_AT})
+_NAME_FALLBACK_INTENTS = frozenset({INTENT_DESCRIPTION, INTENT_FALLBACK})
+
+
+def group_key(facts: Dict[str, Any]) -> str:
+    """
+    Fingerprint of everything generation depends on apart from the variant fields.
+    Whether a product ID and a price are present changes the question set, so those count.
+    """
+    shared = {k: v for k, v in facts.items() if k not in VARIANT_FIELDS}
+    shared["_has_product_id"] = bool(facts.get("product_id", ""))
+    shared["_has_price"] = facts.get("price", {}).get("amount") is not None
+    return json.dumps(shared, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def group_products(facts_list: List[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Indices of facts_list grouped by group_key, in order of first appearance.
+    """
+    groups: Dict[str, List[int]] = {}
+    for i, facts in enumerate(facts_list):
+        groups.setdefault(group_key(facts), []).append(i)
+    return list(groups.values())
+
+
+def _variant_faq_items(faq: List[Dict[str, Any]], description: str) -> List[int]:
+    intents = _VARIANT_INTENTS if description else _VARIANT_INTENTS | _NAME_FALLBACK_INTENTS
+    return [
+        i for i, item in enumerate(faq)
+        if (item.get("intent") or classify_question(item.get("question", "").lower())) in intents
+    ]
+
+
+def generate_group(
+    facts_group: List[Dict[str, Any]],
+    page_template: Any = None,
+    faq_fallback: Optional[Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Artifacts (product_page, faq, comparison) for every member of one group.
+    faq_fallback (e.g. langchain_orchestrator.generate_faq) runs when the deterministic FAQ is
+    short, once per member: its free-text answers may mention the name or price anywhere, so
+    they cannot be patched like the deterministic ones.
+    timings, when given, accumulates "shared_s" (first member) and "patch_s" (the others).
+    """
+    started = time.perf_counter()
+    base = facts_group[0]
+    page = render_product_page(base, page_template)
+    questions = generate_questions(base)
+    faq = render_faq(questions, base)
+    use_fallback = faq_fallback is not None and len(faq) < 15
+    if use_fallback:
+        logger.warning(
+            "Deterministic FAQ generated only %d items, falling back to LLM for %d products",
+            len(faq), len(facts_group),
+        )
+        faq = faq_fallback(base)
+    comparison = compare_products(base, build_fictional_product_b(base))
+    ingredients_aspect, _, benefits_aspect = comparison["comparisons"]
+    variant_items = [] if use_fallback else _variant_faq_items(questions, base.get("description", ""))
+    results = [{"product_page": page, "faq": faq, "comparison": comparison}]
+    shared = time.perf_counter()
+
+    for facts in facts_group[1:]:
+        if page_template is not None:
+            # Template blocks may read any fact
+            variant_page = render_product_page(facts, page_template)
+        else:
+            variant_page = dict(
+                page,
+                product_id=facts.get("product_id"),
+                title=facts.get("name"),
+                metadata=facts.get("metadata", {}),
+                price_block=generate_price_block(facts),
+            )
+            if not facts.get("description"):
+                variant_page["summary_block"] = generate_summary_block(facts)
+        if use_fallback:
+            variant_faq = faq_fallback(facts)
+        else:
+            variant_faq = list(faq)
+            for i, item in zip(variant_items, render_faq([questions[i] for i in variant_items], facts)):
+                variant_faq[i] = item
+        comparison = _assemble_comparison(facts, build_fictional_product_b(facts), ingredients_aspect, benefits_aspect)
+        results.append({"product_page": variant_page, "faq": variant_faq, "comparison": comparison})
+
+    if timings is not None:
+        timings["shared_s"] = timings.get("shared_s", 0.0) + shared - started
+        timings["patch_s"] = timings.get("patch_s", 0.0) + time.perf_counter() - shared
+    return results
+
+
+def generate_grouped(
+    products: Iterable[ProductModel],
+    page_template: Any = None,
+    faq_fallback: Optional[Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Generate a catalog group by group. Returns {"artifacts": [...] in product order
+    (as generate_artifacts returns them), "report": {...}}.
+    """
+    started = time.perf_counter()
+    products = list(products)
+    issues = run_batch_sanity_checks(products, catalog_rules=False)
+    for product, product_issues in zip(products, issues):
+        if product_issues:
+            logger.warning("Sanity issues for %s: %s", product.id, product_issues)
+    facts_list = [extract_facts(p) for p in products]
+    groups = group_products(facts_list)
+
+    artifacts: List[Optional[Dict[str, Any]]] = [None] * len(products)
+    timings: Dict[str, float] = {}
+    for members in groups:
+        results = generate_group([facts_list[i] for i in members], page_template, faq_fallback, timings)
+        for i, result in zip(members, results):
+            artifacts[i] = dict(result, issues=issues[i])
+
+    report = _report(len(products), groups, time.perf_counter() - started, timings)
+    logger.info(
+        "Generated %d products in %d groups (dedup ratio %.2f), saving an estimated %.2fs",
+        report["products"], report["groups"], report["dedup_ratio"], report["estimated_saved_s"],
+    )
+    return {"artifacts": artifacts, "report": report}
+
+
+def _report(n_products: int, groups: List[List[int]], wall: float, timings: Dict[str, float]) -> Dict[str, Any]:
+    shared = timings.get("shared_s", 0.0)
+    patch = timings.get("patch_s", 0.0)
+    # Generating a variant from scratch costs about as much as generating a group's first member
+    per_product = shared / len(groups) if groups else 0.0
+    return {
+        "products": n_products,
+        "groups": len(groups),
+        "dedup_ratio": round(n_products / len(groups), 2) if groups else 0.0,
+        "largest_group": max(map(len, groups), default=0),
+        "shared_s": round(shared, 4),
+        "patch_s": round(patch, 4),
+        "estimated_saved_s": round(max(per_product * (n_products - len(groups)) - patch, 0.0), 4),
+        "wall_s": round(wall, 4),
+    }
+
+
+def run_grouped(
+    products: Iterable[ProductModel],
+    outdir: str,
+    store: Any = None,
+    index: Any = None,
+    output_format: str = "pretty",
+    page_template: Any = None,
+    faq_fallback: Optional[Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """
+    generate_grouped, then write every product to <outdir>/<product_id>/ (or the store).
+    """
+    result = generate_grouped(products, page_template, faq_fallback)
+    for artifacts in result["artifacts"]:
+        page = artifacts["product_page"]
+        write_outputs(
+            page,
+            artifacts["faq"],
+            artifacts["comparison"],
+            f"{outdir}/{quote(str(page.get('product_id')), safe='')}",
+            store=store,
+            index=index,
+            output_format=output_format,
+        )
+    return result["report"]
+
+
+def main():
+    import argparse
+
+    from .agents.ingest_agent import iter_catalog
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Generate a catalog once per group of near-identical variants")
+    parser.add_argument("--catalog", "-c", required=True)
+    parser.add_argument("--outdir", "-o", default="out")
+    parser.add_argument("--template", "-t", default=None)
+    parser.add_argument("--format", choices=["pretty", "compact", "msgpack", "cbor"], default="pretty")
+    parser.add_argument("--llm-fallback", action="store_true", help="Complete short FAQs with the LLM, once per product")
+    args = parser.parse_args()
+
+    configure_logging(batch=True)
+
+    faq_fallback = None
+    if args.llm_fallback:
+        from .langchain_orchestrator import generate_faq as faq_fallback
+    report = run_grouped(
+        iter_catalog(args.catalog),
+        args.outdir,
+        output_format=args.format,
+        page_template=args.template,
+        faq_fallback=faq_fallback,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+# src/profiling.py
+"""
+CPU profiling for run.py and the batch runners.
+
+    cprofile  deterministic: every call is traced (exact counts, noticeable overhead)
+    sample    a background thread records the profiled threads' stacks every `interval`
+              seconds (low overhead; works across worker threads)
+
+Either profiles the whole run, or only every Nth product. Output, for a prefix such as out/profile:
+
+    profile.pstats      cProfile stats (python -m pstats, snakeviz); cprofile mode only
+    profile.collapsed   "frame;frame;frame count" lines for flamegraph.pl / speedscope / inferno
+    profile.json        time per graph node, products profiled, top functions
+
+Graph nodes run under frames named "node:<name>" (e.g. node:faq) in both outputs. The node
+wrappers are only compiled into the graph when profiling is requested (graph.get_compiled_graph),
+so an unprofiled run executes exactly the same code as before.
+"""
+import cProfile
+import contextlib
+import itertools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import types
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MODES = ("cprofile", "sample")
+
+# node name -> [calls, seconds]; filled by wrapped nodes
+_node_times: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+_node_lock = threading.Lock()
+
+
+def wrap_node(name: str, fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """
+    fn wrapped in a function whose code object is named "node:<name>", so profilers and
+    stack samples attribute the node's time to it. Also accumulates wall time per node.
+    """
+
+    def node(state):
+        started = time.perf_counter()
+        try:
+            return fn(state)
+        finally:
+            elapsed = time.perf_counter() - started
+            with _node_lock:
+                entry = _node_times[name]
+                entry[0] += 1
+                entry[1] += elapsed
+
+    label = f"node:{name}"
+    code = node.__code__.replace(co_name=label, co_qualname=label)
+    return types.FunctionType(code, node.__globals__, label, node.__defaults__, node.__closure__)
+
+
+def node_times() -> Dict[str, Dict[str, float]]:
+    with _node_lock:
+        return {
+            name: {"calls": int(calls), "total_s": round(total, 4), "mean_ms": round(1000 * total / calls, 3)}
+            for name, (calls, total) in sorted(_node_times.items(), key=lambda kv: -kv[1][1])
+            if calls
+        }
+
+
+def reset_node_times() -> None:
+    with _node_lock:
+        _node_times.clear()
+
+
+# -----------------------------
+# Collapsed stacks
+# -----------------------------
+def _frame_label(code: types.CodeType, cache: Dict[types.CodeType, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        name = code.co_qualname
+        label = name if name.startswith("node:") else f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        cache[code] = label
+    return label
+
+
+def _func_label(func: Tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if name.startswith("node:") or filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def pstats_to_collapsed(stats: pstats.Stats, min_us: int = 1) -> Dict[str, int]:
+    """
+    Approximate call stacks (in microseconds of self time) from cProfile's caller graph:
+    each function's time is split among its callers in proportion to the time they spent
+    calling it. Recursive cycles are cut.
+    """
+    raw = stats.stats
+    children: Dict[Any, List[Tuple[Any, float]]] = defaultdict(list)
+    for func, (_, _, _, ct, callers) in raw.items():
+        for caller, edge in callers.items():
+            if caller in raw and ct > 0:
+                children[caller].append((func, edge[3] / ct))
+    roots = [func for func, entry in raw.items() if not any(c in raw for c in entry[4])]
+
+    stacks: Counter = Counter()
+
+    def walk(func, path: List[str], on_path: set, share: float, depth: int) -> None:
+        _, _, tt, _, _ = raw[func]
+        path = path + [_func_label(func)]
+        micros = int(tt * share * 1e6)
+        if micros >= min_us:
+            stacks[";".join(path)] += micros
+        if depth > 200:
+            return
+        for child, fraction in children.get(func, ()):
+            if child not in on_path and share * fraction * raw[child][3] * 1e6 >= min_us:
+                walk(child, path, on_path | {child}, share * fraction, depth + 1)
+
+    for root in roots:
+        walk(root, [], {root}, 1.0, 0)
+    return dict(stacks)
+
+
+def write_collapsed(stacks: Dict[str, int], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        for stack, count in sorted(stacks.items()):
+            fh.write(f"{stack} {count}\n")
+
+
+# -----------------------------
+# Sampling profiler
+# -----------------------------
+class SamplingProfiler:
+    """
+    Samples the stacks of the threads inside activate() blocks from a daemon thread.
+    Counts are samples, one per `interval` seconds of wall time in the stack.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._active: Dict[int, int] = {}  # thread id -> nesting depth
+        self._labels: Dict[types.CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[None]:
+        """
+        Sample the calling thread for the duration of the block.
+        """
+        tid = threading.get_ident()
+        with self._lock:
+            self._active[tid] = self._active.get(tid, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[tid] -= 1
+                if not self._active[tid]:
+                    del self._active[tid]
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = set(self._active)
+            if not active:
+                continue
+            for tid, frame in sys._current_frames().items():
+                if tid == own or tid not in active:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code, self._labels))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+
+# -----------------------------
+# Pipeline profiler
+# -----------------------------
+class PipelineProfiler:
+    """
+    Profile a run or every Nth product:
+
+        profiler = PipelineProfiler("sample", every=100, output="out/profile")
+        for product in products:
+            with profiler.product():
+                run_product(product, ..., profiled=True)
+        profiler.write()
+
+    In cprofile mode only one product is traced at a time (the tracer is process-wide and
+    also records other threads while enabled); products started while another is being
+    traced are skipped and counted.
+    """
+
+    def __init__(self, mode: str = "cprofile", every: int = 1, output: str = "profile", interval: float = 0.005):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.every = max(1, every)
+        self.output = output
+        self.profiled = 0
+        self.skipped = 0
+        self._counter = itertools.count()
+        self._started = time.perf_counter()
+        self._whole_run = False
+        self._cprofile = cProfile.Profile() if mode == "cprofile" else None
+        self._cprofile_lock = threading.Lock()
+        self._sampler = SamplingProfiler(interval) if mode == "sample" else None
+        if self._sampler is not None:
+            self._sampler.start()
+        reset_node_times()
+
+    @contextlib.contextmanager
+    def run(self) -> Iterator[None]:
+        """
+        Profile everything inside the block (the calling thread in sample mode).
+        """
+        self._whole_run = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+            try:
+                yield
+            finally:
+                self._cprofile.disable()
+        else:
+            with self._sampler.activate():
+                yield
+
+    @contextlib.contextmanager
+    def product(self) -> Iterator[bool]:
+        """
+        Profile the block if it is the 1st, (N+1)th, ... product; yields whether it is.
+        """
+        if next(self._counter) % self.every:
+            yield False
+            return
+        if self._sampler is not None:
+            self.profiled += 1
+            with self._sampler.activate():
+                yield True
+            return
+        if not self._cprofile_lock.acquire(blocking=False):
+            self.skipped += 1
+            yield False
+            return
+        try:
+            self.profiled += 1
+            self._cprofile.enable()
+            try:
+                yield True
+            finally:
+                self._cprofile.disable()
+        finally:
+            self._cprofile_lock.release()
+
+    def write(self) -> Dict[str, str]:
+        """
+        Stop sampling and write the output files; returns their paths.
+        """
+        Path(self.output).parent.mkdir(parents=True, exist_ok=True)
+        paths = {"collapsed": f"{self.output}.collapsed", "summary": f"{self.output}.json"}
+        summary: Dict[str, Any] = {
+            "mode": self.mode,
+            "every": self.every,
+            "whole_run": self._whole_run,
+            "products_profiled": self.profiled,
+            "products_skipped": self.skipped,
+            "wall_s": round(time.perf_counter() - self._started, 4),
+            "nodes": node_times(),
+        }
+        if self._cprofile is not None:
+            paths["pstats"] = f"{self.output}.pstats"
+            self._cprofile.dump_stats(paths["pstats"])
+            stats = pstats.Stats(self._cprofile)
+            write_collapsed(pstats_to_collapsed(stats), paths["collapsed"])
+            top = sorted(stats.stats.items(), key=lambda kv: -kv[1][2])[:25]
+            summary["top_self_s"] = {_func_label(func): round(entry[2], 4) for func, entry in top}
+        else:
+            self._sampler.stop()
+            write_collapsed(self._sampler.stacks, paths["collapsed"])
+            summary["samples"] = self._sampler.samples
+            summary["interval_s"] = self._sampler.interval
+            leaves = Counter()
+            for stack, count in self._sampler.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            summary["top_self_samples"] = dict(leaves.most_common(25))
+        with open(paths["summary"], "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+        return paths
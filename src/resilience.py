@@ -0,0 +1,192 @@
+# src/resilience.py
+"""
+Time budgets and a circuit breaker for the LLM fallbacks.
+
+The deterministic agents produce every artifact; the LLM is only called when their output
+is incomplete. When the endpoint degrades, those calls are what stall a product, so:
+
+    node budget      an LLM fallback may take at most `node_timeout` seconds (HTTP timeout,
+                     and no further _invoke attempts once it is spent)
+    product budget   a product must finish within `product_timeout` seconds; fallbacks get
+                     what is left of it and validation retries stop when it runs out
+    circuit breaker  shared by every product in the process. It opens when the failure rate
+                     over the last `window` calls reaches `failure_rate` (after `min_calls`);
+                     while open, fallbacks are skipped at once. After `cooldown` seconds one
+                     probe call is let through (half-open): success closes the breaker,
+                     failure opens it again.
+
+A skipped or failed fallback keeps the deterministic output, and the pipeline state is
+marked degraded with the nodes concerned. stats() reports the breaker state, its counters
+and the time spent closed, open and half-open.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def remaining(deadline: Optional[float], clock: Callable[[], float] = time.monotonic) -> Optional[float]:
+    """
+    Seconds left until deadline (a clock() timestamp), or None for no deadline.
+    """
+    if deadline is None:
+        return None
+    return deadline - clock()
+
+
+def budget_deadline(*budgets: Optional[float], clock: Callable[[], float] = time.monotonic) -> Optional[float]:
+    """
+    The earliest of several budgets in seconds from now (None entries are unbounded),
+    as a clock() timestamp; None if all are unbounded.
+    """
+    bounded = [b for b in budgets if b is not None]
+    if not bounded:
+        return None
+    return clock() + min(bounded)
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker with a single half-open probe. Thread-safe.
+
+        if breaker.allow():
+            try:
+                result = call()
+            except Exception:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+    or breaker.call(fn, *args), which raises CircuitOpenError when the call is not allowed.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        self.failure_rate = failure_rate
+        self.min_calls = max(1, min_calls)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: deque = deque(maxlen=max(window, self.min_calls))  # True = failure
+        self._state = CLOSED
+        self._since = clock()
+        self._opened_at = 0.0
+        self._probing = False
+        self._time_in: Dict[str, float] = {CLOSED: 0.0, OPEN: 0.0, HALF_OPEN: 0.0}
+        self.counts = {"calls": 0, "failures": 0, "short_circuits": 0, "trips": 0, "probes": 0}
+
+    # -----------------------------
+    # State transitions (lock held)
+    # -----------------------------
+    def _enter(self, state: str) -> None:
+        now = self._clock()
+        self._time_in[self._state] += now - self._since
+        self._state, self._since = state, now
+        if state == OPEN:
+            self._opened_at = now
+            self.counts["trips"] += 1
+        elif state == CLOSED:
+            self._outcomes.clear()
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go ahead now. In half-open state only one probe is in flight.
+        """
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self._enter(HALF_OPEN)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self.counts["probes"] += 1
+                return True
+            self.counts["short_circuits"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.counts["calls"] += 1
+            if self._state == HALF_OPEN:
+                self._enter(CLOSED)
+            elif self._state == CLOSED:
+                self._outcomes.append(False)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.counts["calls"] += 1
+            self.counts["failures"] += 1
+            if self._state == HALF_OPEN:
+                self._enter(OPEN)
+            elif self._state == CLOSED:
+                self._outcomes.append(True)
+                if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                    self._enter(OPEN)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            # Includes interrupts and cancellations: a probe that never reports back would
+            # leave the breaker half-open with _probing set, short-circuiting every call
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._enter(CLOSED)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            time_in = dict(self._time_in)
+            time_in[self._state] += now - self._since
+            failures = sum(self._outcomes)
+            return dict(
+                self.counts,
+                state=self._state,
+                window_calls=len(self._outcomes),
+                window_failure_rate=round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+                time_in_state_s={state: round(seconds, 3) for state, seconds in time_in.items()},
+            )
+
+
+# Shared by every product run in this process (worker_pool processes each have their own)
+llm_breaker = CircuitBreaker()
+
+
+def configure_breaker(**settings) -> CircuitBreaker:
+    """
+    Replace the shared breaker, e.g. configure_breaker(failure_rate=0.3, cooldown=60).
+    """
+    global llm_breaker
+    llm_breaker = CircuitBreaker(**settings)
+    return llm_breaker
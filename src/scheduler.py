@@ -0,0 +1,369 @@
+# src/scheduler.py
+"""
+Priority scheduler for catalog runs.
+
+Each product is classified by diffing it against the previous build manifest:
+
+    new              not in the previous build
+    price_changed    price or currency differs
+    content_changed  any other product field differs
+    unchanged        same fingerprints as last time
+
+Classes share the workers through weighted fair queuing (self-clocked: a job's finish tag
+is max(virtual time, class's last tag) + 1 / weight), so urgent classes are served first
+while bulk classes still get their weighted share and never starve. Per-class queue wait
+and end-to-end latency are reported, and a new manifest is written for the next build.
+
+    python -m src.scheduler --catalog catalog.jsonl --outdir out --manifest out/build_manifest.json
+"""
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from .models import ProductModel
+from .utils import read_json, write_json
+
+logger = logging.getLogger("Scheduler")
+
+NEW, PRICE_CHANGED, CONTENT_CHANGED, UNCHANGED = "new", "price_changed", "content_changed", "unchanged"
+CLASSES = (NEW, PRICE_CHANGED, CONTENT_CHANGED, UNCHANGED)
+DEFAULT_WEIGHTS = {NEW: 8.0, PRICE_CHANGED: 8.0, CONTENT_CHANGED: 2.0, UNCHANGED: 1.0}
+
+# Set at ingest time, so they differ on every build without the product changing
+_VOLATILE_METADATA = ("ingested_at", "normalized_at")
+
+
+# -----------------------------
+# Build manifest
+# -----------------------------
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def fingerprint(product: ProductModel) -> Dict[str, str]:
+    data = asdict(product)
+    price = (data.pop("price"), data.pop("currency"))
+    data["metadata"] = {k: v for k, v in data["metadata"].items() if k not in _VOLATILE_METADATA}
+    return {"price": _digest(price), "content": _digest(data)}
+
+
+def classify(product: ProductModel, previous: Dict[str, Dict[str, str]]) -> str:
+    before = previous.get(product.id)
+    if before is None:
+        return NEW
+    current = fingerprint(product)
+    if current["price"] != before.get("price"):
+        return PRICE_CHANGED
+    if current["content"] != before.get("content"):
+        return CONTENT_CHANGED
+    return UNCHANGED
+
+
+def load_manifest(path: Optional[str]) -> Dict[str, Dict[str, str]]:
+    if not path or not Path(path).exists():
+        return {}
+    return read_json(path).get("products", {})
+
+
+# -----------------------------
+# Weighted fair queue
+# -----------------------------
+class WeightedFairQueue:
+    """
+    Blocking multi-class queue served in order of virtual finish tags.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = dict(weights)
+        self._heap: List[Tuple[float, int, str, Any]] = []
+        self._last_finish = {cls: 0.0 for cls in self.weights}
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item: Any, cls: str, cost: float = 1.0) -> None:
+        if cls not in self.weights:
+            raise ValueError(f"Unknown priority class {cls!r}; expected one of {sorted(self.weights)}")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Queue is closed")
+            finish = max(self._vtime, self._last_finish[cls]) + cost / self.weights[cls]
+            self._last_finish[cls] = finish
+            heapq.heappush(self._heap, (finish, next(self._seq), cls, item))
+            self._cond.notify()
+
+    def get(self) -> Optional[Tuple[str, Any]]:
+        """
+        Next (class, item), blocking while empty; None once closed and drained.
+        """
+        with self._cond:
+            while not self._heap and not self._closed:
+                self._cond.wait()
+            if not self._heap:
+                return None
+            finish, _, cls, item = heapq.heappop(self._heap)
+            self._vtime = finish
+            return cls, item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]  # noqa: E731
+    return {
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(pick(0.50), 4),
+        "p95": round(pick(0.95), 4),
+        "max": round(values[-1], 4),
+    }
+
+
+class PriorityScheduler:
+    """
+    Feed classified products through `workers` threads in weighted-fair order.
+    `run_one(product)` does the work; by default graph.run_product into <outdir>/<product_id>/
+    with `run_options` (e.g. node_timeout / product_timeout, see src.resilience).
+    With a profiler (src.profiling.PipelineProfiler) every job runs under profiler.product().
+    """
+
+    def __init__(
+        self,
+        outdir: str,
+        previous_manifest: Optional[Dict[str, Dict[str, str]]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        workers: int = 1,
+        skip_unchanged: bool = False,
+        run_one: Optional[Callable[[ProductModel], Any]] = None,
+        profiler: Any = None,
+        run_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.outdir = Path(outdir)
+        self.previous = previous_manifest or {}
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.workers = workers
+        self.skip_unchanged = skip_unchanged
+        self._run_one = run_one or self._run_graph
+        self.profiler = profiler
+        self.run_options = dict(run_options or {})
+        self._queue = WeightedFairQueue(self.weights)
+        self._lock = threading.Lock()
+        self._latency: Dict[str, List[float]] = {cls: [] for cls in self.weights}
+        self._wait: Dict[str, List[float]] = {cls: [] for cls in self.weights}
+        self.counts = {cls: {"submitted": 0, "done": 0, "failed": 0, "skipped": 0} for cls in self.weights}
+        self.order: List[Tuple[str, str]] = []  # (class, product_id) in completion order
+        self.manifest = dict(self.previous)
+        self._threads: List[threading.Thread] = []
+        self.index = None  # one ArtifactIndex for all workers when run_options has index_path
+        self.store = None  # one ContentStore / ShardWriter under outdir for all workers
+
+    def _run_graph(self, product: ProductModel) -> None:
+        from .graph import run_product
+
+        result = run_product(
+            product,
+            str(self.outdir / quote(product.id, safe="")),
+            profiled=self.profiler is not None,
+            index=self.index,
+            store=self.store,
+            **self.run_options,
+        )
+        if not result.get("is_valid"):
+            raise RuntimeError("; ".join(str(e) for e in result.get("errors") or ["validation failed"]))
+
+    def start(self) -> "PriorityScheduler":
+        if self._run_one == self._run_graph:
+            # Import and compile up front so the first job's latency is not the import time
+            from .graph import get_compiled_graph, open_store
+
+            get_compiled_graph(self.profiler is not None)
+            if self.run_options.get("index_path"):
+                from .artifact_index import ArtifactIndex
+
+                self.index = ArtifactIndex(self.run_options["index_path"])
+            self.store = open_store(
+                self.run_options.get("output_mode", "files"),
+                str(self.outdir),
+                self.run_options.get("output_compression"),
+                self.index,
+            )
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"scheduler-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def submit(self, product: ProductModel, cls: Optional[str] = None) -> str:
+        """
+        Queue a product, classifying it against the previous manifest unless cls is given.
+        May be called while workers are running.
+        """
+        cls = cls or classify(product, self.previous)
+        with self._lock:
+            self.counts[cls]["submitted"] += 1
+        if cls == UNCHANGED and self.skip_unchanged:
+            with self._lock:
+                self.counts[cls]["skipped"] += 1
+            return cls
+        self._queue.put((product, time.perf_counter()), cls)
+        return cls
+
+    def _work(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            cls, (product, submitted) = entry
+            started = time.perf_counter()
+            try:
+                if self.profiler is not None:
+                    with self.profiler.product():
+                        self._run_one(product)
+                else:
+                    self._run_one(product)
+            except Exception as exc:
+                logger.error("Failed %s (%s): %s", product.id, cls, exc)
+                # Its old fingerprint stays in the manifest, so the next build retries it
+                with self._lock:
+                    self.counts[cls]["failed"] += 1
+                continue
+            finished = time.perf_counter()
+            with self._lock:
+                self.counts[cls]["done"] += 1
+                self._wait[cls].append(started - submitted)
+                self._latency[cls].append(finished - submitted)
+                self.order.append((cls, product.id))
+                self.manifest[product.id] = fingerprint(product)
+
+    def join(self) -> Dict[str, Any]:
+        """
+        Stop accepting work, wait for the queue to drain and return per-class metrics.
+        """
+        self._queue.close()
+        for t in self._threads:
+            t.join()
+        if hasattr(self.store, "close"):
+            self.store.close()  # flushes shard locations into the index
+        if self.index is not None:
+            self.index.close()
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                cls: dict(
+                    self.counts[cls],
+                    weight=self.weights[cls],
+                    wait_s=_summary(self._wait[cls]),
+                    latency_s=_summary(self._latency[cls]),
+                )
+                for cls in self.weights
+            }
+
+    def write_manifest(self, path: str) -> None:
+        write_json({"format": 1, "products": self.manifest}, path)
+
+
+def run_scheduled(
+    products: Iterable[ProductModel],
+    outdir: str,
+    manifest_path: Optional[str] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Classify a catalog against manifest_path, process it in priority order and
+    write the updated manifest back to manifest_path.
+    """
+    scheduler = PriorityScheduler(outdir, load_manifest(manifest_path), **kwargs)
+    # Queue the whole catalog before starting, so the first picks already follow priority
+    for product in products:
+        scheduler.submit(product)
+    report = scheduler.start().join()
+    if manifest_path:
+        scheduler.write_manifest(manifest_path)
+    for cls, stats in report.items():
+        if stats["submitted"]:
+            logger.info(
+                "%s: %d done, %d failed, %d skipped, p95 latency %.3fs",
+                cls, stats["done"], stats["failed"], stats["skipped"], stats["latency_s"].get("p95", 0.0),
+            )
+    return report
+
+
+def _parse_weights(text: str) -> Dict[str, float]:
+    weights = {}
+    for part in filter(None, text.split(",")):
+        cls, _, value = part.partition("=")
+        weights[cls.strip()] = float(value)
+    return weights
+
+
+def main():
+    import argparse
+
+    from .agents.ingest_agent import iter_catalog
+    from .logging_setup import configure_logging
+    from .resilience import configure_breaker
+
+    parser = argparse.ArgumentParser(description="Process a catalog with priority classes and weighted fair queuing")
+    parser.add_argument("--catalog", "-c", required=True)
+    parser.add_argument("--outdir", "-o", default="out")
+    parser.add_argument("--manifest", "-m", default=None, help="Build manifest to diff against and update")
+    parser.add_argument("--workers", "-w", type=int, default=1)
+    parser.add_argument("--weights", default="", help="e.g. new=8,price_changed=8,content_changed=2,unchanged=1")
+    parser.add_argument("--skip-unchanged", action="store_true", help="Do not regenerate unchanged products")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], default=None)
+    parser.add_argument("--profile-every", type=int, default=1, help="Profile every Nth product")
+    parser.add_argument("--profile-out", default=None, help="Output prefix (default: <outdir>/profile)")
+    parser.add_argument("--node-timeout", type=float, default=None, help="Seconds an LLM fallback may take")
+    parser.add_argument("--product-timeout", type=float, default=None, help="Seconds a product may take")
+    parser.add_argument("--breaker-failure-rate", type=float, default=0.5, help="LLM failure rate that opens the breaker")
+    parser.add_argument("--breaker-cooldown", type=float, default=30.0, help="Seconds before a half-open probe")
+    args = parser.parse_args()
+
+    configure_logging(batch=True)
+    breaker = configure_breaker(failure_rate=args.breaker_failure_rate, cooldown=args.breaker_cooldown)
+    profiler = None
+    if args.profile:
+        from .profiling import PipelineProfiler
+        profiler = PipelineProfiler(
+            args.profile, every=args.profile_every, output=args.profile_out or str(Path(args.outdir) / "profile")
+        )
+    report = run_scheduled(
+        iter_catalog(args.catalog),
+        args.outdir,
+        manifest_path=args.manifest or str(Path(args.outdir) / "build_manifest.json"),
+        weights=_parse_weights(args.weights),
+        workers=args.workers,
+        skip_unchanged=args.skip_unchanged,
+        profiler=profiler,
+        run_options={"node_timeout": args.node_timeout, "product_timeout": args.product_timeout},
+    )
+    report["llm_breaker"] = breaker.stats()
+    if profiler is not None:
+        report["profile"] = profiler.write()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# src/serializers.py
+"""
+Pluggable artifact serializers for the output files.
+
+    pretty   JSON, indent=2 (stdlib; byte-identical to earlier runs)
+    compact  JSON without whitespace (orjson when installed, else stdlib)
+    msgpack  MessagePack, implemented locally
+    cbor     CBOR (RFC 8949), implemented locally
+
+"pretty" deliberately stays on the stdlib encoder: alternative backends format some floats
+differently (e.g. 1e+16 vs 1e16), which would rewrite every unchanged file on the next run.
+"""
+import json
+import struct
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+
+class Serializer:
+    def __init__(self, name: str, extension: str, dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any]):
+        self.name = name
+        self.extension = extension
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"Serializer({self.name!r})"
+
+
+# -----------------------------
+# JSON
+# -----------------------------
+def _pretty_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _compact_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:  # non-str keys, ints beyond 64 bits, ...
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# -----------------------------
+# MessagePack
+# -----------------------------
+def _msgpack_dumps(obj: Any) -> bytes:
+    out = bytearray()
+    _msgpack_pack(obj, out)
+    return bytes(out)
+
+
+def _msgpack_pack(obj: Any, out: bytearray) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif obj >= 0:
+            for limit, code, fmt in ((0xFF, 0xCC, ">B"), (0xFFFF, 0xCD, ">H"), (0xFFFFFFFF, 0xCE, ">I"),
+                                     (0xFFFFFFFFFFFFFFFF, 0xCF, ">Q")):
+                if obj <= limit:
+                    out.append(code)
+                    out += struct.pack(fmt, obj)
+                    return
+            raise OverflowError(f"Integer too large for MessagePack: {obj}")
+        else:
+            for limit, code, fmt in ((-0x80, 0xD0, ">b"), (-0x8000, 0xD1, ">h"), (-0x80000000, 0xD2, ">i"),
+                                     (-0x8000000000000000, 0xD3, ">q")):
+                if obj >= limit:
+                    out.append(code)
+                    out += struct.pack(fmt, obj)
+                    return
+            raise OverflowError(f"Integer too small for MessagePack: {obj}")
+    elif isinstance(obj, float):
+        out.append(0xCB)
+        out += struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        _msgpack_header(len(data), out, 0xA0, 32, (0xD9, 0xDA, 0xDB))
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        _msgpack_header(len(obj), out, None, 0, (0xC4, 0xC5, 0xC6))
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        _msgpack_header(len(obj), out, 0x90, 16, (None, 0xDC, 0xDD))
+        for item in obj:
+            _msgpack_pack(item, out)
+    elif isinstance(obj, dict):
+        _msgpack_header(len(obj), out, 0x80, 16, (None, 0xDE, 0xDF))
+        for key, value in obj.items():
+            _msgpack_pack(key, out)
+            _msgpack_pack(value, out)
+    else:
+        raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+def _msgpack_header(length: int, out: bytearray, fix: Any, fix_limit: int, codes: Tuple) -> None:
+    code8, code16, code32 = codes
+    if fix is not None and length < fix_limit:
+        out.append(fix | length)
+    elif code8 is not None and length <= 0xFF:
+        out.append(code8)
+        out.append(length)
+    elif length <= 0xFFFF:
+        out.append(code16)
+        out += struct.pack(">H", length)
+    else:
+        out.append(code32)
+        out += struct.pack(">I", length)
+
+
+_MSGPACK_FIXED = {
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+    0xCA: ">f", 0xCB: ">d",
+}
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    obj, pos = _msgpack_unpack(memoryview(data), 0)
+    if pos != len(data):
+        raise ValueError("Trailing data after MessagePack object")
+    return obj
+
+
+def _msgpack_unpack(buf: memoryview, pos: int) -> Tuple[Any, int]:
+    code = buf[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if code >= 0xE0:
+        return code - 0x100, pos
+    if 0xA0 <= code <= 0xBF:
+        return _read_str(buf, pos, code & 0x1F)
+    if 0x90 <= code <= 0x9F:
+        return _read_array(buf, pos, code & 0x0F, _msgpack_unpack)
+    if 0x80 <= code <= 0x8F:
+        return _read_map(buf, pos, code & 0x0F, _msgpack_unpack)
+    if code == 0xC0:
+        return None, pos
+    if code == 0xC2:
+        return False, pos
+    if code == 0xC3:
+        return True, pos
+    if code in _MSGPACK_FIXED:
+        fmt = _MSGPACK_FIXED[code]
+        return struct.unpack_from(fmt, buf, pos)[0], pos + struct.calcsize(fmt)
+    length_fmt = {0xD9: ">B", 0xDA: ">H", 0xDB: ">I", 0xC4: ">B", 0xC5: ">H", 0xC6: ">I",
+                  0xDC: ">H", 0xDD: ">I", 0xDE: ">H", 0xDF: ">I"}.get(code)
+    if length_fmt is None:
+        raise ValueError(f"Unsupported MessagePack type 0x{code:02x}")
+    length = struct.unpack_from(length_fmt, buf, pos)[0]
+    pos += struct.calcsize(length_fmt)
+    if code in (0xD9, 0xDA, 0xDB):
+        return _read_str(buf, pos, length)
+    if code in (0xC4, 0xC5, 0xC6):
+        return bytes(buf[pos:pos + length]), pos + length
+    if code in (0xDC, 0xDD):
+        return _read_array(buf, pos, length, _msgpack_unpack)
+    return _read_map(buf, pos, length, _msgpack_unpack)
+
+
+# -----------------------------
+# CBOR
+# -----------------------------
+def _cbor_dumps(obj: Any) -> bytes:
+    out = bytearray()
+    _cbor_pack(obj, out)
+    return bytes(out)
+
+
+def _cbor_head(major: int, value: int, out: bytearray) -> None:
+    major <<= 5
+    if value < 24:
+        out.append(major | value)
+    elif value <= 0xFF:
+        out.append(major | 24)
+        out.append(value)
+    elif value <= 0xFFFF:
+        out.append(major | 25)
+        out += struct.pack(">H", value)
+    elif value <= 0xFFFFFFFF:
+        out.append(major | 26)
+        out += struct.pack(">I", value)
+    elif value <= 0xFFFFFFFFFFFFFFFF:
+        out.append(major | 27)
+        out += struct.pack(">Q", value)
+    else:
+        raise OverflowError(f"Integer too large for CBOR: {value}")
+
+
+def _cbor_pack(obj: Any, out: bytearray) -> None:
+    if obj is None:
+        out.append(0xF6)
+    elif obj is True:
+        out.append(0xF5)
+    elif obj is False:
+        out.append(0xF4)
+    elif isinstance(obj, int):
+        if obj >= 0:
+            _cbor_head(0, obj, out)
+        else:
+            _cbor_head(1, -1 - obj, out)
+    elif isinstance(obj, float):
+        out.append(0xFB)
+        out += struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        _cbor_head(3, len(data), out)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        _cbor_head(2, len(obj), out)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        _cbor_head(4, len(obj), out)
+        for item in obj:
+            _cbor_pack(item, out)
+    elif isinstance(obj, dict):
+        _cbor_head(5, len(obj), out)
+        for key, value in obj.items():
+            _cbor_pack(key, out)
+            _cbor_pack(value, out)
+    else:
+        raise TypeError(f"Object of type {type(obj).__name__} is not CBOR serializable")
+
+
+def _cbor_loads(data: bytes) -> Any:
+    obj, pos = _cbor_unpack(memoryview(data), 0)
+    if pos != len(data):
+        raise ValueError("Trailing data after CBOR object")
+    return obj
+
+
+_CBOR_ARG = {24: ">B", 25: ">H", 26: ">I", 27: ">Q"}
+_CBOR_SIMPLE = {20: False, 21: True, 22: None, 23: None}
+_CBOR_FLOAT = {25: ">e", 26: ">f", 27: ">d"}
+
+
+def _cbor_unpack(buf: memoryview, pos: int) -> Tuple[Any, int]:
+    initial = buf[pos]
+    pos += 1
+    major, info = initial >> 5, initial & 0x1F
+    if major == 7:
+        if info in _CBOR_SIMPLE:
+            return _CBOR_SIMPLE[info], pos
+        if info in _CBOR_FLOAT:
+            fmt = _CBOR_FLOAT[info]
+            return struct.unpack_from(fmt, buf, pos)[0], pos + struct.calcsize(fmt)
+        raise ValueError(f"Unsupported CBOR simple value {info}")
+    if info < 24:
+        value = info
+    elif info in _CBOR_ARG:
+        fmt = _CBOR_ARG[info]
+        value = struct.unpack_from(fmt, buf, pos)[0]
+        pos += struct.calcsize(fmt)
+    else:
+        raise ValueError("Indefinite-length CBOR items are not supported")
+    if major == 0:
+        return value, pos
+    if major == 1:
+        return -1 - value, pos
+    if major == 2:
+        return bytes(buf[pos:pos + value]), pos + value
+    if major == 3:
+        return _read_str(buf, pos, value)
+    if major == 4:
+        return _read_array(buf, pos, value, _cbor_unpack)
+    if major == 5:
+        return _read_map(buf, pos, value, _cbor_unpack)
+    raise ValueError("Tagged CBOR items are not supported")
+
+
+# -----------------------------
+# Shared decoding helpers
+# -----------------------------
+def _read_str(buf: memoryview, pos: int, length: int) -> Tuple[str, int]:
+    return str(buf[pos:pos + length], "utf-8"), pos + length
+
+
+def _read_array(buf: memoryview, pos: int, length: int, unpack: Callable) -> Tuple[list, int]:
+    items = []
+    for _ in range(length):
+        item, pos = unpack(buf, pos)
+        items.append(item)
+    return items, pos
+
+
+def _read_map(buf: memoryview, pos: int, length: int, unpack: Callable) -> Tuple[dict, int]:
+    result = {}
+    for _ in range(length):
+        key, pos = unpack(buf, pos)
+        value, pos = unpack(buf, pos)
+        result[key] = value
+    return result, pos
+
+
+SERIALIZERS: Dict[str, Serializer] = {
+    "pretty": Serializer("pretty", ".json", _pretty_dumps, _json_loads),
+    "compact": Serializer("compact", ".json", _compact_dumps, _json_loads),
+    "msgpack": Serializer("msgpack", ".msgpack", _msgpack_dumps, _msgpack_loads),
+    "cbor": Serializer("cbor", ".cbor", _cbor_dumps, _cbor_loads),
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output format {name!r}; expected one of {sorted(SERIALIZERS)}") from None
@@ -0,0 +1,267 @@
+# src/server.py
+"""
+Local HTTP server that renders artifacts on demand from a catalog file.
+
+    python -m src.server --catalog catalog.jsonl --port 8080
+
+    GET /products/<product_id>                  all three artifacts
+    GET /products/<product_id>/product_page     (also: faq, comparison)
+    GET /stats                                  cache hit rate, coalescing and latency
+    GET /health
+
+Generated artifacts are kept, already JSON-encoded, in a bounded LRU with a TTL.
+Concurrent requests for a product that is being generated wait for that generation
+instead of starting their own.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .agents.ingest_agent import ingest_catalog
+from .models import ProductModel
+from .orchestrator import generate_artifacts
+
+logger = logging.getLogger("Server")
+
+ARTIFACTS = ("product_page", "faq", "comparison")
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class TTLCache:
+    """
+    Thread-safe LRU mapping whose entries also expire `ttl` seconds after insertion.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        expires = self._clock() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ArtifactService:
+    """
+    On-demand generation with caching, request coalescing and latency stats.
+    """
+
+    def __init__(
+        self,
+        catalog: Dict[str, ProductModel],
+        cache_size: int = 1024,
+        ttl: Optional[float] = 300.0,
+        generate: Callable[[ProductModel], Dict[str, Any]] = generate_artifacts,
+        latency_window: int = 10000,
+    ):
+        self.catalog = catalog
+        self.cache = TTLCache(cache_size, ttl)
+        self._generate = generate
+        self._inflight: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=latency_window)
+        self.counters = {"requests": 0, "hits": 0, "misses": 0, "coalesced": 0, "generated": 0, "errors": 0}
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ArtifactService":
+        return cls({p.id: p for p in ingest_catalog(path)}, **kwargs)
+
+    def get(self, product_id: str) -> Optional[Dict[str, bytes]]:
+        """
+        Encoded artifacts for a product, or None when the product is not in the catalog.
+        """
+        start = time.perf_counter()
+        try:
+            return self._get(product_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.counters["requests"] += 1
+                self._latencies.append(elapsed)
+
+    def _get(self, product_id: str) -> Optional[Dict[str, bytes]]:
+        cached = self.cache.get(product_id)
+        if cached is not None:
+            self._count("hits")
+            return cached
+        product = self.catalog.get(product_id)
+        if product is None:
+            return None
+
+        with self._lock:
+            # A leader may have cached the value and left _inflight since the lookup above
+            cached = self.cache.get(product_id)
+            if cached is not None:
+                self.counters["hits"] += 1
+                return cached
+            call = self._inflight.get(product_id)
+            leader = call is None
+            if leader:
+                call = self._inflight[product_id] = _Call()
+                self.counters["misses"] += 1
+            else:
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            artifacts = self._generate(product)
+            call.value = {name: _encode(artifacts[name]) for name in ARTIFACTS}
+            self.cache.put(product_id, call.value)
+            self._count("generated")
+            return call.value
+        except BaseException as exc:
+            call.error = exc
+            self._count("errors")
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[product_id]
+            call.done.set()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            latencies = sorted(self._latencies)
+        lookups = counters["hits"] + counters["misses"] + counters["coalesced"]
+        stats: Dict[str, Any] = dict(counters)
+        stats["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        stats["cached"] = len(self.cache)
+        stats["evictions"] = self.cache.evictions
+        stats["expirations"] = self.cache.expirations
+        stats["catalog_size"] = len(self.catalog)
+        if latencies:
+            pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]  # noqa: E731
+            stats["latency_ms"] = {
+                "mean": 1000 * sum(latencies) / len(latencies),
+                "p50": 1000 * pick(0.50),
+                "p95": 1000 * pick(0.95),
+                "p99": 1000 * pick(0.99),
+                "max": 1000 * latencies[-1],
+            }
+        return stats
+
+
+class ArtifactRequestHandler(BaseHTTPRequestHandler):
+    service: ArtifactService  # set by make_server
+
+    def do_GET(self) -> None:
+        parts = [unquote(p) for p in urlsplit(self.path).path.split("/") if p]
+        if parts == ["health"]:
+            return self._send(200, b'{"status":"ok"}')
+        if parts == ["stats"]:
+            return self._send(200, _encode(self.service.stats()))
+        if len(parts) not in (2, 3) or parts[0] != "products":
+            return self._error(404, "Not found")
+        if len(parts) == 3 and parts[2] not in ARTIFACTS:
+            return self._error(404, f"Unknown artifact {parts[2]!r}; expected one of {list(ARTIFACTS)}")
+
+        try:
+            encoded = self.service.get(parts[1])
+        except Exception as exc:
+            logger.error("Generation failed for %s: %s", parts[1], exc)
+            return self._error(500, "Generation failed")
+        if encoded is None:
+            return self._error(404, f"Unknown product {parts[1]!r}")
+        if len(parts) == 3:
+            return self._send(200, encoded[parts[2]])
+        body = b"{" + b",".join(b'"%s":%s' % (name.encode(), encoded[name]) for name in ARTIFACTS) + b"}"
+        self._send(200, body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, _encode({"error": message}))
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(service: ArtifactService, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    handler = type("BoundArtifactRequestHandler", (ArtifactRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    import argparse
+
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Serve generated product artifacts over HTTP")
+    parser.add_argument("--catalog", "-c", required=True, help="Catalog file (JSON array, {\"products\": [...]} or JSONL)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", "-p", type=int, default=8080)
+    parser.add_argument("--cache-size", type=int, default=1024, help="Products kept in the LRU cache")
+    parser.add_argument("--ttl", type=float, default=300.0, help="Seconds before a cached product is regenerated (0: never)")
+    args = parser.parse_args()
+
+    configure_logging()
+    service = ArtifactService.from_file(args.catalog, cache_size=args.cache_size, ttl=args.ttl or None)
+    server = make_server(service, args.host, args.port)
+    logger.info("Serving %d products on http://%s:%d", len(service.catalog), args.host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
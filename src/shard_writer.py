@@ -0,0 +1,350 @@
+# src/shard_writer.py
+"""
+Sharded JSONL output for large catalogs.
+
+Artifacts are appended to size-bounded JSONL shards, one series per artifact type,
+instead of three small files per product:
+
+    <root>/shards.json                              # format + compression settings
+    <root>/index.jsonl                              # product_id -> shard/offset entries
+    <root>/<artifact>/shard-00000.jsonl[.gz|.xz]
+
+With compression, records are grouped into independently compressed blocks (concatenated
+gzip members / xz streams, so `zcat shard-00000.jsonl.gz` still yields plain JSONL).
+Each index entry points at its block and at the record inside the decompressed block,
+so reading one product costs one seek and at most one block decompression.
+
+Several writers may append to the same root (threads or processes): every block and every
+batch of index lines is appended under an exclusive lock, and its offset is the file size
+read while holding it.
+"""
+import gzip
+import json
+import logging
+import lzma
+import os
+import queue
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from .utils import write_bytes_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in one process are still serialized
+    fcntl = None
+
+logger = logging.getLogger("ShardWriter")
+
+COMPRESSORS = {
+    None: (lambda data: data, lambda data: data, ""),
+    "gzip": (lambda data: gzip.compress(data, mtime=0), gzip.decompress, ".gz"),
+    "lzma": (lzma.compress, lzma.decompress, ".xz"),
+}
+
+_STOP = object()
+
+
+def _shard_name(number: int, compression: Optional[str]) -> str:
+    return f"shard-{number:05d}.jsonl{COMPRESSORS[compression][2]}"
+
+
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _append_locked(fh: BinaryIO, data: bytes) -> int:
+    """
+    Append data to an "ab" file and return the offset it was written at. flock excludes
+    other processes (and other handles of this process); the per-path lock covers
+    platforms without it.
+    """
+    with _path_locks_guard:
+        lock = _path_locks.setdefault(os.path.abspath(fh.name), threading.Lock())
+    with lock:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            offset = os.fstat(fh.fileno()).st_size
+            fh.write(data)
+            fh.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    return offset
+
+
+class _Series:
+    """
+    Append state of one artifact type: current shard file and the pending block.
+    """
+
+    def __init__(self, directory: Path, compression: Optional[str], max_shard_bytes: int):
+        self.directory = directory
+        self.compression = compression
+        self.max_shard_bytes = max_shard_bytes
+        directory.mkdir(parents=True, exist_ok=True)
+        existing = sorted(directory.glob("shard-*.jsonl*"))
+        self.number = int(existing[-1].name[6:11]) if existing else 0
+        self.fh = open(directory / _shard_name(self.number, compression), "ab")
+        self.block = bytearray()
+        self.pending: List[Tuple[str, int, int]] = []  # (product_id, offset in block, length)
+
+    def rotate_if_full(self, incoming: int) -> None:
+        size = os.fstat(self.fh.fileno()).st_size  # other writers may have appended
+        if size and size + incoming > self.max_shard_bytes:
+            self.fh.close()
+            self.number += 1
+            self.fh = open(self.directory / _shard_name(self.number, self.compression), "ab")
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+class ShardWriter:
+    """
+    Buffered, thread-backed writer. put_product() only enqueues (blocking when the queue is
+    full); serialization, compression and file I/O happen on the writer thread.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_shard_bytes: int = 64 * 1024 * 1024,
+        compression: Optional[str] = None,
+        block_bytes: int = 64 * 1024,
+        queue_size: int = 1024,
+        index: Any = None,
+    ):
+        """
+        index: optional src.artifact_index.ArtifactIndex that receives each record's
+        shard location once its block has been written.
+        """
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        settings_path = self.root / "shards.json"
+        if settings_path.exists():
+            settings = json.loads(settings_path.read_text(encoding="utf-8"))
+            if settings.get("compression") != compression:
+                raise ValueError(
+                    f"{root} already holds {settings.get('compression')!r} shards, not {compression!r}"
+                )
+        else:
+            # Atomic: a writer starting concurrently on the same root must not read it half-written
+            write_bytes_atomic(json.dumps({"format": 1, "compression": compression}).encode("utf-8"), str(settings_path))
+
+        self.compression = compression
+        self.max_shard_bytes = max_shard_bytes
+        # Uncompressed records go straight to the shard; compressed ones are grouped in blocks
+        self.block_bytes = block_bytes if compression else 0
+        self._compress = COMPRESSORS[compression][0]
+        self.index = index
+        self._series: Dict[str, _Series] = {}
+        self._index = open(self.root / "index.jsonl", "ab")
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self.stats = {"products": 0, "records": 0, "raw_bytes": 0, "written_bytes": 0}
+        self._thread = threading.Thread(target=self._run, name="ShardWriter", daemon=True)
+        self._thread.start()
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def put_product(self, product_id: str, artifacts: Dict[str, Any]) -> None:
+        if self._error is not None:
+            raise RuntimeError("Shard writer thread failed") from self._error
+        if self._closed:
+            raise RuntimeError("Shard writer is closed")
+        self._queue.put((product_id, artifacts))
+
+    def flush(self) -> None:
+        """
+        Block until every queued product is in the shards and the index (pending blocks are
+        written out, so a long-running producer can make its records readable).
+        """
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.1):
+            if self._error is not None or not self._thread.is_alive():
+                break
+        if self._error is not None:
+            raise RuntimeError("Shard writer thread failed") from self._error
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("Shard writer thread failed") from self._error
+        logger.info(
+            "Wrote %d products to %s (%d raw bytes -> %d bytes)",
+            self.stats["products"],
+            self.root,
+            self.stats["raw_bytes"],
+            self.stats["written_bytes"],
+        )
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -----------------------------
+    # Writer thread
+    # -----------------------------
+    def _run(self) -> None:
+        stopped = False
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    stopped = True
+                    break
+                if isinstance(item, threading.Event):  # flush()
+                    for name, series in self._series.items():
+                        self._flush_block(name, series)
+                    item.set()
+                    continue
+                product_id, artifacts = item
+                for name, value in artifacts.items():
+                    self._append(name, product_id, value)
+                self.stats["products"] += 1
+            for name, series in self._series.items():
+                self._flush_block(name, series)
+                series.close()
+            self._index.close()
+        except BaseException as exc:  # surfaced to the producer on put/close
+            self._error = exc
+            logger.error("Shard writer failed: %s", exc)
+            # Keep draining so producers blocked on a full queue are released
+            while not stopped:
+                stopped = self._queue.get() is _STOP
+
+    def _append(self, name: str, product_id: str, value: Any) -> None:
+        series = self._series.get(name)
+        if series is None:
+            series = self._series[name] = _Series(self.root / name, self.compression, self.max_shard_bytes)
+        record = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        series.pending.append((product_id, len(series.block), len(record)))
+        series.block += record
+        self.stats["records"] += 1
+        self.stats["raw_bytes"] += len(record)
+        if len(series.block) >= self.block_bytes:
+            self._flush_block(name, series)
+
+    def _flush_block(self, name: str, series: _Series) -> None:
+        if not series.pending:
+            return
+        data = self._compress(bytes(series.block))
+        series.rotate_if_full(len(data))
+        offset = _append_locked(series.fh, data)
+        shard = _shard_name(series.number, self.compression)
+        lines = []
+        for product_id, rec_offset, rec_length in series.pending:
+            entry = {
+                "product_id": product_id,
+                "artifact": name,
+                "shard": shard,
+                "offset": offset,
+                "length": len(data),
+                "record_offset": rec_offset,
+                "record_length": rec_length,
+            }
+            lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+            if self.index is not None:
+                self.index.add_location(product_id, name, {"root": str(self.root), **entry})
+        # Whole lines in one locked append, so concurrent writers never interleave them
+        _append_locked(self._index, "".join(lines).encode("utf-8"))
+        self.stats["written_bytes"] += len(data)
+        series.block = bytearray()
+        series.pending = []
+
+
+class ShardRecorder:
+    """
+    Stand-in for ShardWriter in worker processes: keeps the products so the parent can put
+    them into the one writer it owns, and shards are appended by a single writer.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.products: List[Tuple[str, Dict[str, Any]]] = []
+
+    def put_product(self, product_id: str, artifacts: Dict[str, Any]) -> None:
+        self.products.append((product_id, artifacts))
+
+    def replay(self, writer: ShardWriter) -> None:
+        for product_id, artifacts in self.products:
+            writer.put_product(product_id, artifacts)
+
+
+class ShardReader:
+    """
+    Random access to sharded artifacts by product_id through the offset index.
+    """
+
+    def __init__(self, root: str, cached_blocks: int = 16):
+        self.root = Path(root)
+        settings = json.loads((self.root / "shards.json").read_text(encoding="utf-8"))
+        self._decompress = COMPRESSORS[settings.get("compression")][1]
+        self._index: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with open(self.root / "index.jsonl", encoding="utf-8") as fh:
+            for line in fh:
+                entry = json.loads(line)
+                # Later entries win when a product was written more than once
+                self._index.setdefault(entry["product_id"], {})[entry["artifact"]] = entry
+        self._files: Dict[Path, Any] = {}
+        self._blocks: "OrderedDict[Tuple[Path, int], bytes]" = OrderedDict()
+        self._cached_blocks = cached_blocks
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._index
+
+    def product_ids(self) -> List[str]:
+        return list(self._index)
+
+    def get(self, product_id: str, artifact: str) -> Any:
+        entry = self._index[product_id][artifact]
+        block = self._read_block(self.root / artifact / entry["shard"], entry["offset"], entry["length"])
+        start = entry["record_offset"]
+        return json.loads(block[start:start + entry["record_length"]])
+
+    def get_product(self, product_id: str) -> Dict[str, Any]:
+        return {name: self.get(product_id, name) for name in self._index[product_id]}
+
+    def _read_block(self, path: Path, offset: int, length: int) -> bytes:
+        key = (path, offset)
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            return block
+        fh = self._files.get(path)
+        if fh is None:
+            fh = self._files[path] = open(path, "rb")
+        fh.seek(offset)
+        block = self._decompress(fh.read(length))
+        self._blocks[key] = block
+        if len(self._blocks) > self._cached_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def close(self) -> None:
+        for fh in self._files.values():
+            fh.close()
+        self._files.clear()
+
+    def __enter__(self) -> "ShardReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -24,12 +24,24 @@ class PipelineState(BaseModel):
     is_valid: bool = False
     error: Optional[str] = None
     errors: List[str] = Field(default_factory=list)
+    validation_errors: List[Dict[str, Any]] = Field(default_factory=list)  # schema errors: {"loc", "type", "msg"}
 
     # 🔁 Retry control (KEY FIX)
     retry_count: int = 0
     max_retries: int = 2
 
+    # ⏱ Time budgets (src.resilience)
+    node_timeout: Optional[float] = None  # seconds an LLM fallback may take
+    deadline_at: Optional[float] = None  # time.monotonic() by which the product must be done
+    degraded: bool = False  # an LLM fallback was skipped or failed; deterministic output kept
+    degraded_nodes: List[str] = Field(default_factory=list)
+
     # --------------------
     # IO
     # --------------------
     outdir: Optional[str] = None
+    page_template: Optional[str] = None  # path to a JSON page template definition
+    output_mode: str = "files"  # "files" | "cas" (content-addressed store) | "shards" (JSONL shards)
+    output_compression: Optional[str] = None  # shards only: None | "gzip" | "lzma"
+    output_format: str = "pretty"  # files only: "pretty" | "compact" | "msgpack" | "cbor"
+    index_path: Optional[str] = None  # SQLite artifact index to update (src.artifact_index)
@@ -0,0 +1,322 @@
+# src/streaming.py
+"""
+Streaming catalog executor: reading, generation and writing run as overlapping stages.
+
+    reader thread --[input queue]--> N generation workers --[output queue]--> M writer threads
+
+Both queues are bounded, so a slow stage applies backpressure upstream instead of letting
+the catalog pile up in memory. Generation and writing reuse generate_artifacts and
+write_outputs unchanged.
+
+All stages are threads. The deterministic agents are CPU-bound and hold the GIL, so more
+generation workers only help while generation waits on I/O (LLM fallbacks, a slow store);
+for CPU-bound catalogs use the process pool in src.worker_pool.
+
+    python -m src.streaming --catalog catalog.jsonl --outdir out --workers 4
+"""
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from urllib.parse import quote
+
+from .agents.ingest_agent import iter_catalog
+from .agents.renderer_agent import write_outputs
+from .models import ProductModel
+from .orchestrator import generate_artifacts
+
+logger = logging.getLogger("StreamingExecutor")
+
+_STOP = object()
+
+
+class _Stage:
+    """
+    Time accounting for one stage: busy (doing work), waiting on an empty upstream queue,
+    and blocked on a full downstream queue.
+    """
+
+    def __init__(self, name: str, threads: int):
+        self.name = name
+        self.threads = threads
+        self.items = 0
+        self.busy = 0.0
+        self.waiting = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy: float = 0.0, waiting: float = 0.0, blocked: float = 0.0, items: int = 0) -> None:
+        with self._lock:
+            self.busy += busy
+            self.waiting += waiting
+            self.blocked += blocked
+            self.items += items
+
+    def report(self, wall: float) -> Dict[str, Any]:
+        capacity = wall * self.threads or 1.0
+        return {
+            "threads": self.threads,
+            "items": self.items,
+            "busy_s": round(self.busy, 4),
+            "waiting_s": round(self.waiting, 4),
+            "blocked_s": round(self.blocked, 4),
+            "utilization": round(self.busy / capacity, 4),
+        }
+
+
+class _Queue:
+    """
+    Bounded queue that records its depth on every put.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.maxsize = maxsize
+        self.samples = 0
+        self.depth_total = 0
+        self.depth_max = 0
+        self._lock = threading.Lock()
+
+    def put(self, item: Any) -> float:
+        start = time.perf_counter()
+        self.queue.put(item)
+        blocked = time.perf_counter() - start
+        depth = self.queue.qsize()
+        with self._lock:
+            self.samples += 1
+            self.depth_total += depth
+            if depth > self.depth_max:
+                self.depth_max = depth
+        return blocked
+
+    def get(self) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        item = self.queue.get()
+        return item, time.perf_counter() - start
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.maxsize,
+            "max_depth": self.depth_max,
+            "mean_depth": round(self.depth_total / self.samples, 2) if self.samples else 0.0,
+        }
+
+
+class StreamingExecutor:
+    """
+    Run generation for a stream of products with overlapping read / generate / write stages.
+
+    Files are written to <outdir>/<product_id>/ unless a store (ContentStore, ShardWriter)
+    is given. A product whose generation raises an Exception is reported and skipped;
+    reader or writer failures, and anything else a worker raises, abort the run.
+    """
+
+    def __init__(
+        self,
+        outdir: str,
+        workers: int = 4,
+        writers: int = 1,
+        queue_size: int = 256,
+        store: Any = None,
+        index: Any = None,
+        output_format: str = "pretty",
+        generate: Callable[[ProductModel], Dict[str, Any]] = generate_artifacts,
+    ):
+        self.outdir = Path(outdir)
+        self.workers = workers
+        self.writers = writers
+        self.queue_size = queue_size
+        self.store = store
+        self.index = index
+        self.output_format = output_format
+        self._generate = generate
+
+    def run(self, products: Iterable[ProductModel]) -> Dict[str, Any]:
+        inputs = _Queue(self.queue_size)
+        outputs = _Queue(self.queue_size)
+        stages = {
+            "read": _Stage("read", 1),
+            "generate": _Stage("generate", self.workers),
+            "write": _Stage("write", self.writers),
+        }
+        failures: List[Dict[str, str]] = []
+        fatal: List[BaseException] = []
+
+        def reader() -> None:
+            iterator = iter(products)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        product = next(iterator)
+                    except StopIteration:
+                        break
+                    busy = time.perf_counter() - start
+                    stages["read"].add(busy=busy, blocked=inputs.put(product), items=1)
+                    if fatal:
+                        break
+            except BaseException as exc:
+                fatal.append(exc)
+                logger.error("Reader failed: %s", exc)
+            finally:
+                for _ in range(self.workers):
+                    inputs.put(_STOP)
+
+        def worker() -> None:
+            stage = stages["generate"]
+            while True:
+                product, waited = inputs.get()
+                if product is _STOP:
+                    stage.add(waiting=waited)
+                    return
+                if fatal:
+                    continue  # keep draining so the reader is never blocked on a full queue
+                start = time.perf_counter()
+                try:
+                    result: Any = self._generate(product)
+                except Exception as exc:
+                    result = exc
+                    logger.error("Generation failed for %s: %s", product.id, exc)
+                except BaseException as exc:
+                    # A worker that died here would leave the reader blocked on a full queue
+                    fatal.append(exc)
+                    logger.error("Worker failed on %s: %r", product.id, exc)
+                    continue
+                busy = time.perf_counter() - start
+                stage.add(busy=busy, waiting=waited, blocked=outputs.put((product.id, result)), items=1)
+
+        def writer() -> None:
+            stage = stages["write"]
+            while True:
+                item, waited = outputs.get()
+                if item is _STOP:
+                    stage.add(waiting=waited)
+                    return
+                if fatal:
+                    continue  # keep draining so workers are never blocked on a full queue
+                product_id, result = item
+                if isinstance(result, Exception):
+                    failures.append({"product_id": product_id, "error": f"{type(result).__name__}: {result}"})
+                    continue
+                start = time.perf_counter()
+                try:
+                    write_outputs(
+                        result["product_page"],
+                        result["faq"],
+                        result["comparison"],
+                        str(self.outdir / quote(str(product_id), safe="")),
+                        store=self.store,
+                        index=self.index,
+                        output_format=self.output_format,
+                    )
+                except BaseException as exc:
+                    fatal.append(exc)
+                    logger.error("Writer failed: %s", exc)
+                    continue
+                stage.add(busy=time.perf_counter() - start, waiting=waited, items=1)
+
+        started = time.perf_counter()
+        producers = [threading.Thread(target=reader, name="stream-reader", daemon=True)]
+        producers += [
+            threading.Thread(target=worker, name=f"stream-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        writers = [
+            threading.Thread(target=writer, name=f"stream-writer-{i}", daemon=True) for i in range(self.writers)
+        ]
+        for t in producers + writers:
+            t.start()
+        for t in producers:
+            t.join()
+        # Every generated product is queued ahead of these sentinels
+        for _ in writers:
+            outputs.put(_STOP)
+        for t in writers:
+            t.join()
+        wall = time.perf_counter() - started
+
+        if fatal:
+            raise RuntimeError("Streaming run aborted") from fatal[0]
+
+        written = stages["write"].items
+        report = {
+            "products": stages["read"].items,
+            "written": written,
+            "failed": failures,
+            "wall_s": round(wall, 4),
+            "products_per_s": round(written / wall, 1) if wall else 0.0,
+            "stages": {name: stage.report(wall) for name, stage in stages.items()},
+            "queues": {"input": inputs.report(), "output": outputs.report()},
+        }
+        logger.info(
+            "Streamed %d products in %.2fs (%d failed); utilization read=%.0f%% generate=%.0f%% write=%.0f%%",
+            written,
+            wall,
+            len(failures),
+            100 * report["stages"]["read"]["utilization"],
+            100 * report["stages"]["generate"]["utilization"],
+            100 * report["stages"]["write"]["utilization"],
+        )
+        return report
+
+
+def run_streaming(catalog_path: str, outdir: str, **kwargs) -> Dict[str, Any]:
+    return StreamingExecutor(outdir, **kwargs).run(iter_catalog(catalog_path))
+
+
+def main():
+    import argparse
+    import json
+
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Generate artifacts for a whole catalog with a streaming executor")
+    parser.add_argument("--catalog", "-c", required=True, help="Catalog file (JSONL is streamed line by line)")
+    parser.add_argument("--outdir", "-o", default="out")
+    parser.add_argument("--workers", "-w", type=int, default=4, help="Generation worker threads (only help while generation waits on I/O)")
+    parser.add_argument("--writers", type=int, default=1, help="Writer threads (file I/O releases the GIL)")
+    parser.add_argument("--queue-size", type=int, default=256, help="Capacity of each stage queue")
+    parser.add_argument("--output-mode", choices=["files", "cas", "shards"], default="files")
+    parser.add_argument("--compression", choices=["none", "gzip", "lzma"], default="none")
+    parser.add_argument("--format", choices=["pretty", "compact", "msgpack", "cbor"], default="pretty")
+    parser.add_argument("--index", default=None, help="SQLite artifact index to update")
+    args = parser.parse_args()
+
+    configure_logging(batch=True)
+
+    index = None
+    if args.index:
+        from .artifact_index import ArtifactIndex
+        index = ArtifactIndex(args.index)
+    store = None
+    try:
+        if args.output_mode == "cas":
+            from .artifact_store import ContentStore
+            store = ContentStore(args.outdir)
+        elif args.output_mode == "shards":
+            from .shard_writer import ShardWriter
+            compression = None if args.compression == "none" else args.compression
+            store = ShardWriter(args.outdir, compression=compression, index=index)
+        try:
+            report = run_streaming(
+                args.catalog,
+                args.outdir,
+                workers=args.workers,
+                writers=args.writers,
+                queue_size=args.queue_size,
+                store=store,
+                index=index,
+                output_format=args.format,
+            )
+        finally:
+            if hasattr(store, "close"):
+                store.close()
+    finally:
+        if index is not None:
+            index.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import gc
 import json
+import os
+import secrets
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Set, Tuple
 
 
 def read_json(path: str) -> Dict[str, Any]:
@@ -10,10 +15,140 @@ def read_json(path: str) -> Dict[str, Any]:
     return json.loads(p.read_text(encoding="utf-8"))
 
 
-def write_json(obj: Any, path: str, pretty: bool = True) -> None:
-    p = Path(path)
-    p.parent.mkdir(parents=True, exist_ok=True)
+def write_json(obj: Any, path: str, pretty: bool = True, fsync: bool = False) -> bool:
+    """
+    Serialize in memory and write atomically, skipping the write when the file already
+    holds identical content. Returns True when the file was (re)written.
+    """
     if pretty:
-        p.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+        data = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
     else:
-        p.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8")
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return write_bytes_if_changed(data, path, fsync=fsync)
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Suspend the cyclic garbage collector while allocating many small containers.
+    Bulk allocations otherwise trigger repeated collections over the whole catalog.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+# -----------------------------
+# Atomic, skip-unchanged writes
+# -----------------------------
+_stats_lock = threading.Lock()
+_write_stats = {"files_written": 0, "bytes_written": 0, "files_skipped": 0, "bytes_skipped": 0}
+_pending_dir_syncs: Set[str] = set()
+
+
+def get_write_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_write_stats)
+
+
+def reset_write_stats() -> None:
+    with _stats_lock:
+        for key in _write_stats:
+            _write_stats[key] = 0
+
+
+def _count_write(written: bool, size: int) -> None:
+    with _stats_lock:
+        if written:
+            _write_stats["files_written"] += 1
+            _write_stats["bytes_written"] += size
+        else:
+            _write_stats["files_skipped"] += 1
+            _write_stats["bytes_skipped"] += size
+
+
+def write_bytes_if_changed(data: bytes, path: str, fsync: bool = False) -> bool:
+    """
+    Atomically write data unless the file already holds exactly these bytes.
+    Only a same-size file is read back, so changed content usually costs a single stat().
+    """
+    p = Path(path)
+    try:
+        if p.stat().st_size == len(data) and p.read_bytes() == data:
+            _count_write(False, len(data))
+            return False
+    except FileNotFoundError:
+        pass
+    write_bytes_atomic(data, path, fsync=fsync)
+    return True
+
+
+def _create_temp(p: Path) -> Tuple[int, str]:
+    # Created 0666 like a plain open(), so the kernel applies the current umask
+    # (tempfile.mkstemp would create it 0600)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        tmp = str(p.parent / f".{p.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+def write_bytes_atomic(data: bytes, path: str, fsync: bool = False) -> None:
+    """
+    Write bytes to a temp file in the target directory and rename it into place,
+    so readers never see a partially written file.
+    With fsync, file data is flushed before the rename and the directory is queued
+    for sync_directories(), so one directory fsync covers a batch of files.
+    """
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = _create_temp(p)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            if hasattr(os, "fchmod"):
+                # A replaced file keeps its permissions
+                try:
+                    os.fchmod(fh.fileno(), p.stat().st_mode & 0o777)
+                except FileNotFoundError:
+                    pass
+            fh.write(data)
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    _count_write(True, len(data))
+    if fsync:
+        with _stats_lock:
+            _pending_dir_syncs.add(str(p.parent))
+
+
+def sync_directories() -> int:
+    """
+    fsync every directory that received an fsync'd write since the last call,
+    making the renames durable. Returns the number of directories synced.
+    """
+    with _stats_lock:
+        dirs = list(_pending_dir_syncs)
+        _pending_dir_syncs.clear()
+    for d in dirs:
+        try:
+            fd = os.open(d, os.O_RDONLY)
+        except OSError:  # e.g. directories cannot be opened on Windows
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return len(dirs)
@@ -0,0 +1,248 @@
+# src/variants.py
+"""
+Multi-market variant fan-out.
+
+Each product is sanity-checked and turned into facts once. Its prices are
+converted into every market currency in one vectorized pass over the whole catalog
+(local FX table, no network), then the artifacts are rendered once and only the
+price-dependent parts are patched per variant:
+
+    product page   price_block
+    FAQ            answers to price questions
+    comparison     price aspect, product prices and verdict
+
+Every other block, FAQ answer and comparison aspect is shared between the variants.
+The result for a variant equals running the normal agents on the facts with the converted price.
+
+FX table (JSON): {"base": "USD", "rates": {"USD": 1.0, "INR": 83.0, ...}, "decimals": {"JPY": 0}}
+where rates are units of each currency per base unit.
+
+    python -m src.variants --catalog catalog.jsonl --fx examples/fx_rates.json \\
+        --variants us:USD,eu:EUR,in:INR --outdir out
+"""
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+from .agents.comparison_agent import (
+    _assemble_comparison,
+    build_fictional_product_b,
+    compare_products,
+    fictional_price,
+)
+from .agents.content_block_agent import generate_price_block
+from .agents.facts_extractor_agent import extract_facts
+from .agents.question_generator_agent import generate_questions
+from .agents.renderer_agent import write_outputs
+from .agents.sanity_agent import run_batch_sanity_checks
+from .agents.template_engine_agent import INTENT_PRICE, classify_question, render_faq, render_product_page
+from .models import ProductModel
+from .utils import read_json
+
+logger = logging.getLogger("Variants")
+
+# (variant name, currency), e.g. ("eu", "EUR")
+Variant = Tuple[str, str]
+
+
+class FXTable:
+    def __init__(self, rates: Dict[str, float], decimals: Optional[Dict[str, int]] = None, base: str = "USD"):
+        self.base = base
+        self.rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        self.decimals = {code.upper(): int(d) for code, d in (decimals or {}).items()}
+
+    @classmethod
+    def load(cls, path: str) -> "FXTable":
+        data = read_json(path)
+        return cls(data["rates"], data.get("decimals"), data.get("base", "USD"))
+
+    def rate_vector(self, codes: Sequence[str]) -> np.ndarray:
+        missing = sorted({c for c in codes if c.upper() not in self.rates})
+        if missing:
+            raise ValueError(f"No FX rate for {', '.join(missing)}")
+        return np.array([self.rates[c.upper()] for c in codes], dtype=np.float64)
+
+
+def convert_prices(amounts: Sequence[float], currencies: Sequence[str], targets: Sequence[str], fx: FXTable) -> np.ndarray:
+    """
+    (products x targets) matrix of converted amounts, rounded to each target's decimals.
+    Amounts already in the target currency are passed through untouched.
+    """
+    amounts = np.array(amounts, dtype=np.float64)  # None -> nan
+    source_rates = fx.rate_vector(currencies)
+    target_rates = fx.rate_vector(targets)
+    converted = amounts[:, None] * (target_rates[None, :] / source_rates[:, None])
+    decimals = [fx.decimals.get(t.upper(), 2) for t in targets]
+    for d in set(decimals):
+        cols = [j for j, dj in enumerate(decimals) if dj == d]
+        converted[:, cols] = np.round(converted[:, cols], d)
+    same = np.array([c.upper() for c in currencies])[:, None] == np.array([t.upper() for t in targets])[None, :]
+    return np.where(same, amounts[:, None], converted)
+
+
+def _variant_amount(price: Dict[str, Any], currency: str, converted: float, fx: FXTable) -> Any:
+    """
+    The amount as the agents would see it: the original value in the source currency
+    (so that variant matches the single-currency output), None for a missing price,
+    and a whole number for currencies without minor units.
+    """
+    if price.get("amount") is None:
+        return None
+    if str(price.get("currency", "")).upper() == currency.upper():
+        return price["amount"]
+    return int(converted) if fx.decimals.get(currency.upper(), 2) == 0 else converted
+
+
+def render_variants(
+    facts: Dict[str, Any],
+    questions: List[Dict[str, Any]],
+    variant_prices: Sequence[Tuple[str, float, str]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Render a product once and patch the price-dependent parts for each
+    (variant, amount, currency). Unchanged blocks are shared, not copied.
+    """
+    page = render_product_page(facts)
+    faq = render_faq(questions, facts)
+    product_b = build_fictional_product_b(facts)
+    comparison = compare_products(facts, product_b)
+    ingredients_aspect, _, benefits_aspect = comparison["comparisons"]
+    price_questions = [
+        i for i, q in enumerate(questions)
+        if (q.get("intent") or classify_question(q.get("question", "").lower())) == INTENT_PRICE
+    ]
+
+    variants = {}
+    for name, amount, currency in variant_prices:
+        price = {"amount": amount, "currency": currency}
+        variant_facts = dict(facts, price=price)
+
+        variant_page = dict(page, price_block=generate_price_block(variant_facts))
+
+        variant_faq = list(faq)
+        for i in price_questions:
+            variant_faq[i] = render_faq([questions[i]], variant_facts)[0]
+
+        variant_b = dict(product_b, price={"amount": fictional_price(float(amount or 0)), "currency": currency})
+        variant_comparison = _assemble_comparison(variant_facts, variant_b, ingredients_aspect, benefits_aspect)
+
+        variants[name] = {"product_page": variant_page, "faq": variant_faq, "comparison": variant_comparison}
+    return variants
+
+
+def fan_out_catalog(
+    products: Iterable[ProductModel],
+    variants: Sequence[Variant],
+    fx: FXTable,
+    outdir: str,
+    store: Any = None,
+    output_format: str = "pretty",
+) -> Dict[str, Any]:
+    """
+    Generate and write every (product, variant) pair: files under
+    <outdir>/<product_id>/<variant>/, or store entries keyed "<product_id>/<variant>".
+    """
+    started = time.perf_counter()
+    products = list(products)
+    for product, issues in zip(products, run_batch_sanity_checks(products)):
+        if issues:
+            logger.warning("Sanity issues for %s: %s", product.id, issues)
+    facts_list = [extract_facts(p) for p in products]
+    targets = [currency for _, currency in variants]
+    prices = convert_prices(
+        [f["price"]["amount"] for f in facts_list],
+        [f["price"]["currency"] for f in facts_list],
+        targets,
+        fx,
+    ).tolist()
+
+    for facts, row in zip(facts_list, prices):
+        questions = generate_questions(facts)
+        rendered = render_variants(
+            facts,
+            questions,
+            [
+                (name, _variant_amount(facts["price"], currency, amount, fx), currency)
+                for (name, currency), amount in zip(variants, row)
+            ],
+        )
+        product_dir = quote(str(facts["product_id"]), safe="")
+        for name, artifacts in rendered.items():
+            write_outputs(
+                artifacts["product_page"],
+                artifacts["faq"],
+                artifacts["comparison"],
+                f"{outdir}/{product_dir}/{name}",
+                store=store,
+                output_format=output_format,
+                store_key=f"{facts['product_id']}/{name}",
+            )
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "products": len(products),
+        "variants": len(variants),
+        "outputs": len(products) * len(variants),
+        "wall_s": round(elapsed, 4),
+    }
+    logger.info("Rendered %d products x %d variants in %.2fs", len(products), len(variants), elapsed)
+    return report
+
+
+def parse_variants(text: str) -> List[Variant]:
+    """
+    "us:USD,eu:EUR" -> [("us", "USD"), ("eu", "EUR")]; a bare currency names its own variant.
+    """
+    variants = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, currency = part.rpartition(":")
+        variants.append((name or currency.lower(), currency.upper()))
+    return variants
+
+
+def main():
+    import argparse
+    import json
+
+    from .agents.ingest_agent import iter_catalog
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Render every product once per market/currency variant")
+    parser.add_argument("--catalog", "-c", required=True)
+    parser.add_argument("--fx", required=True, help="FX table JSON (see examples/fx_rates.json)")
+    parser.add_argument("--variants", "-v", required=True, help="Comma-separated name:CURRENCY pairs, e.g. us:USD,eu:EUR")
+    parser.add_argument("--outdir", "-o", default="out")
+    parser.add_argument("--output-mode", choices=["files", "cas", "shards"], default="files")
+    parser.add_argument("--compression", choices=["none", "gzip", "lzma"], default="none")
+    parser.add_argument("--format", choices=["pretty", "compact", "msgpack", "cbor"], default="pretty")
+    args = parser.parse_args()
+
+    configure_logging(batch=True)
+
+    store = None
+    if args.output_mode == "cas":
+        from .artifact_store import ContentStore
+        store = ContentStore(args.outdir)
+    elif args.output_mode == "shards":
+        from .shard_writer import ShardWriter
+        store = ShardWriter(args.outdir, compression=None if args.compression == "none" else args.compression)
+    try:
+        report = fan_out_catalog(
+            iter_catalog(args.catalog),
+            parse_variants(args.variants),
+            FXTable.load(args.fx),
+            args.outdir,
+            store=store,
+            output_format=args.format,
+        )
+    finally:
+        if hasattr(store, "close"):
+            store.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+# src/watcher.py
+"""
+Watch mode: regenerate products as their input files change.
+
+The input directory is polled by mtime and size; on Linux an inotify watch (through
+ctypes, no extra dependency) wakes the loop as soon as something is written, so polling
+becomes a fallback. A changed file is processed once it has been quiet for `debounce`
+seconds, so an editor save or a bulk copy causes one regeneration, not several.
+
+Files may hold one product or a catalog (see ingest_catalog). Only products whose
+fingerprint differs from the build manifest (the one src.scheduler writes) are regenerated,
+using one warm compiled graph in this process. A status file records the queue length and
+the last scan / change / processed timestamps.
+
+    python -m src.watcher --input-dir incoming --outdir out
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from . import resilience
+from .agents.ingest_agent import ingest_catalog
+from .models import ProductModel
+from .scheduler import fingerprint, load_manifest
+from .utils import write_json
+
+logger = logging.getLogger("Watcher")
+
+INPUT_SUFFIXES = (".json", ".jsonl", ".ndjson")
+
+# (mtime_ns, size)
+Signature = Tuple[int, int]
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class InotifyWakeup:
+    """
+    Blocks until the directory sees a change or the timeout passes. Events are only a wakeup
+    signal: the directory scan decides what changed, so a missed or coalesced event is harmless.
+    """
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    @classmethod
+    def create(cls, directory: str) -> Optional["InotifyWakeup"]:
+        """
+        An inotify wakeup, or None where inotify is unavailable (non-Linux, limits reached).
+        """
+        try:
+            return cls(directory)
+        except (OSError, AttributeError) as exc:
+            logger.info("inotify unavailable (%s); polling only", exc)
+            return None
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0.0))
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def scan_directory(directory: str, exclude: Iterable[str] = ()) -> Dict[str, Signature]:
+    """
+    (mtime_ns, size) of every input file directly in directory, except the paths in exclude.
+    """
+    excluded = {os.path.abspath(path) for path in exclude}
+    signatures = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.lower().endswith(INPUT_SUFFIXES):
+                continue
+            if excluded and os.path.abspath(entry.path) in excluded:
+                continue  # the watcher's own status / manifest when outdir is the input dir
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except FileNotFoundError:
+                continue  # removed between listing and stat
+            signatures[entry.path] = (st.st_mtime_ns, st.st_size)
+    return signatures
+
+
+class DirectoryWatcher:
+    """
+    Long-running loop that regenerates the products of changed input files.
+    `process(product)` does the work; by default graph.run_product into <outdir>/<product_id>/
+    with `run_options`.
+    """
+
+    def __init__(
+        self,
+        input_dir: str,
+        outdir: str,
+        poll_interval: float = 2.0,
+        debounce: float = 1.0,
+        status_path: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+        status_interval: float = 60.0,
+        use_inotify: bool = True,
+        process: Optional[Callable[[ProductModel], Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        **run_options,
+    ):
+        self.input_dir = str(input_dir)
+        self.outdir = Path(outdir)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.status_path = status_path or str(self.outdir / "watch_status.json")
+        self.manifest_path = manifest_path or str(self.outdir / "build_manifest.json")
+        self.status_interval = status_interval
+        self.run_options = run_options
+        self._process = process or self._run_graph
+        self._clock = clock
+        self._stop = threading.Event()
+        self._inotify = InotifyWakeup.create(self.input_dir) if use_inotify else None
+        self.index = None  # one ArtifactIndex for the whole run when run_options has index_path
+        self.store = None  # one ContentStore / ShardWriter under outdir for the whole run
+
+        self.manifest = load_manifest(self.manifest_path)
+        self._seen: Dict[str, Signature] = {}
+        # path -> (signature, clock time it was first seen with that signature)
+        self._pending: Dict[str, Tuple[Signature, float]] = {}
+        self._in_flight = 0
+        self.status: Dict[str, Any] = {
+            "pid": os.getpid(),
+            "input_dir": self.input_dir,
+            "backend": "inotify" if self._inotify else "polling",
+            "state": "starting",
+            "started_at": _now_iso(),
+            "queue_length": 0,
+            "tracked_files": 0,
+            "processed": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "degraded": 0,
+            "llm_breaker": None,
+            "last_scan_at": None,
+            "last_change_at": None,
+            "last_processed_at": None,
+            "last_error": None,
+        }
+        self._written_status: Optional[Dict[str, Any]] = None
+        self._status_written_at = 0.0
+
+    def _run_graph(self, product: ProductModel) -> None:
+        from .graph import run_product
+
+        result = run_product(
+            product,
+            str(self.outdir / quote(product.id, safe="")),
+            index=self.index,
+            store=self.store,
+            **self.run_options,
+        )
+        if not result.get("is_valid"):
+            raise RuntimeError("; ".join(str(e) for e in result.get("errors") or ["validation failed"]))
+        if result.get("degraded"):
+            # Written without the LLM fallback of these nodes; regenerated on its next change
+            logger.warning("%s degraded: %s", product.id, ", ".join(result.get("degraded_nodes") or []))
+            self.status["degraded"] += 1
+
+    def _write_status(self, state: str, force: bool = False) -> None:
+        """
+        Rewrite the status file when something other than the scan and breaker clocks changed,
+        and otherwise every status_interval seconds, so idle polls do not touch the disk.
+        """
+        self.status.update(
+            state=state,
+            queue_length=len(self._pending) + self._in_flight,
+            tracked_files=len(self._seen),
+            llm_breaker=resilience.llm_breaker.stats(),
+        )
+        content = {key: value for key, value in self.status.items() if key != "last_scan_at"}
+        content["llm_breaker"] = {k: v for k, v in content["llm_breaker"].items() if k != "time_in_state_s"}
+        now = self._clock()
+        if not force and content == self._written_status and now - self._status_written_at < self.status_interval:
+            return
+        write_json(self.status, self.status_path)
+        self._written_status = content
+        self._status_written_at = now
+
+    def _own_files(self) -> List[str]:
+        # Never inputs, even when outdir is the input directory
+        files = [self.status_path, self.manifest_path]
+        if self.run_options.get("output_mode") == "shards":
+            files += [str(self.outdir / "shards.json"), str(self.outdir / "index.jsonl")]
+        return files
+
+    def poll_once(self) -> List[str]:
+        """
+        Scan once and process every file that has been quiet for `debounce` seconds.
+        Returns the files processed.
+        """
+        now = self._clock()
+        current = scan_directory(self.input_dir, exclude=self._own_files())
+        self.status["last_scan_at"] = _now_iso()
+
+        for path in set(self._seen) - set(current):
+            # Outputs are left in place: the product may have moved to another file
+            logger.info("Input removed: %s", path)
+            del self._seen[path]
+        for path in set(self._pending) - set(current):
+            del self._pending[path]
+        for path, sig in current.items():
+            if self._seen.get(path) == sig:
+                self._pending.pop(path, None)
+            elif path not in self._pending or self._pending[path][0] != sig:
+                self._pending[path] = (sig, now)  # (re)start the quiet period
+                self.status["last_change_at"] = _now_iso()
+
+        ready = sorted(path for path, (_, changed) in self._pending.items() if now - changed >= self.debounce)
+        for path in ready:
+            sig, _ = self._pending.pop(path)
+            self._process_file(path)
+            self._seen[path] = sig
+        self._write_status("processing" if self._pending else "idle")
+        return ready
+
+    def _process_file(self, path: str) -> None:
+        try:
+            products = ingest_catalog(path)
+        except Exception as exc:
+            # Retried when the file changes again
+            logger.error("Cannot read %s: %s", path, exc)
+            self.status.update(failed=self.status["failed"] + 1, last_error=f"{path}: {exc}")
+            return
+
+        changed = []
+        for product in products:
+            fp = fingerprint(product)
+            if self.manifest.get(product.id) == fp:
+                self.status["unchanged"] += 1
+            else:
+                changed.append((product, fp))
+        logger.info("%s: %d products, %d to regenerate", path, len(products), len(changed))
+
+        self._in_flight = len(changed)
+        self._write_status("processing")
+        for product, fp in changed:
+            try:
+                self._process(product)
+            except Exception as exc:
+                # Its old fingerprint stays in the manifest, so the next change retries it
+                logger.error("Failed %s: %s", product.id, exc)
+                self.status.update(failed=self.status["failed"] + 1, last_error=f"{product.id}: {exc}")
+            else:
+                self.manifest[product.id] = fp
+                self.status.update(processed=self.status["processed"] + 1, last_processed_at=_now_iso())
+            self._in_flight -= 1
+        if changed:
+            write_json({"format": 1, "products": self.manifest}, self.manifest_path)
+            if hasattr(self.store, "flush"):
+                self.store.flush()  # this file's records readable from the shards
+            if self.index is not None:
+                self.index.flush()  # one index transaction per changed file
+
+    def _next_timeout(self) -> float:
+        if not self._pending:
+            return self.poll_interval
+        now = self._clock()
+        due = min(changed + self.debounce for _, changed in self._pending.values())
+        return min(self.poll_interval, max(due - now, 0.0))
+
+    def run(self, max_cycles: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Loop until stop() (or max_cycles scans). Returns the final status.
+        """
+        if self._process == self._run_graph:
+            from .graph import get_compiled_graph, open_store
+
+            get_compiled_graph()  # compile once, before the first change arrives
+            if self.run_options.get("index_path"):
+                from .artifact_index import ArtifactIndex
+
+                self.index = ArtifactIndex(self.run_options["index_path"])
+            self.store = open_store(
+                self.run_options.get("output_mode", "files"),
+                str(self.outdir),
+                self.run_options.get("output_compression"),
+                self.index,
+            )
+        logger.info("Watching %s (%s)", self.input_dir, self.status["backend"])
+        cycles = 0
+        try:
+            while not self._stop.is_set():
+                self.poll_once()
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+                timeout = self._next_timeout()
+                if self._inotify is not None:
+                    self._inotify.wait(timeout)
+                else:
+                    self._stop.wait(timeout)
+        finally:
+            self._write_status("stopped", force=True)
+            if self._inotify is not None:
+                self._inotify.close()
+            if hasattr(self.store, "close"):
+                self.store.close()  # flushes shard locations into the index
+            if self.index is not None:
+                self.index.close()
+        return self.status
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main():
+    import argparse
+    import signal
+
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Watch a directory of product files and regenerate changed products")
+    parser.add_argument("--input-dir", "-i", required=True)
+    parser.add_argument("--outdir", "-o", default="out")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between directory scans")
+    parser.add_argument("--debounce", type=float, default=1.0, help="Quiet period before a changed file is processed")
+    parser.add_argument("--status", default=None, help="Status file (default: <outdir>/watch_status.json)")
+    parser.add_argument(
+        "--status-interval", type=float, default=60.0, help="Seconds between status rewrites while nothing changes"
+    )
+    parser.add_argument("--no-inotify", action="store_true", help="Poll only")
+    parser.add_argument("--template", "-t", default=None)
+    parser.add_argument("--format", choices=["pretty", "compact", "msgpack", "cbor"], default="pretty")
+    args = parser.parse_args()
+
+    configure_logging(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    watcher = DirectoryWatcher(
+        args.input_dir,
+        args.outdir,
+        poll_interval=args.interval,
+        debounce=args.debounce,
+        status_path=args.status,
+        status_interval=args.status_interval,
+        use_inotify=not args.no_inotify,
+        page_template=args.template,
+        output_format=args.format,
+    )
+    signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# src/work_queue.py
+"""
+Durable work queue for sharing one catalog run between several workers or machines.
+
+Jobs (one per product) live in a SQLite file. A worker leases a batch of jobs for a
+visibility timeout and extends the lease while it works; a job whose lease runs out
+(e.g. the worker was killed) becomes visible again and is picked up by another worker.
+Failed jobs are retried up to max_retries times, then moved to the dead-letter state.
+
+    python -m src.work_queue --db run.sqlite enqueue --catalog catalog.jsonl
+    python -m src.work_queue --db run.sqlite work --outdir out        # on every worker
+    python -m src.work_queue --db run.sqlite stats
+
+Workers only use lease / extend / ack / fail, so another backend with the same methods
+can replace SQLiteWorkQueue. Note that SQLite locking is only as reliable as the shared
+filesystem: use a local disk or a filesystem with working POSIX locks.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from .models import ProductModel
+
+logger = logging.getLogger("WorkQueue")
+
+QUEUED, LEASED, DONE, DEAD = "queued", "leased", "done", "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, available_at);
+"""
+
+
+class Lease:
+    def __init__(self, job_id: str, token: str, payload: Dict[str, Any], attempt: int):
+        self.job_id = job_id
+        self.token = token
+        self.payload = payload
+        self.attempt = attempt
+
+    def __repr__(self) -> str:
+        return f"Lease({self.job_id!r}, attempt={self.attempt})"
+
+
+class SQLiteWorkQueue:
+    """
+    Lease-based job queue in one SQLite file. Each instance owns a connection and
+    may be shared by the threads of one worker.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_retries: int = 3,
+        retry_backoff: float = 0.0,
+        busy_timeout: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._clock = clock
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "SQLiteWorkQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never lease the same job
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def enqueue(self, jobs: Iterable[Tuple[str, Dict[str, Any]]], replace: bool = False) -> int:
+        """
+        Add (job_id, payload) pairs. Existing job ids are kept unless replace is set,
+        so re-running the enqueue step of a partially finished run is safe.
+        """
+        now = self._clock()
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        rows = [(job_id, json.dumps(payload, ensure_ascii=False), QUEUED, now) for job_id, payload in jobs]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                f"{verb} INTO jobs (job_id, payload, state, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            return conn.total_changes - before
+
+        added = self._transaction(insert)
+        logger.info("Enqueued %d of %d jobs", added, len(rows))
+        return added
+
+    def enqueue_products(self, products: Iterable[ProductModel], replace: bool = False) -> int:
+        return self.enqueue(((p.id, asdict(p)) for p in products), replace=replace)
+
+    def requeue_dead(self) -> int:
+        def requeue(conn):
+            return conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, available_at = 0, updated_at = ? WHERE state = ?",
+                (QUEUED, self._clock(), DEAD),
+            ).rowcount
+
+        return self._transaction(requeue)
+
+    # -----------------------------
+    # Worker side
+    # -----------------------------
+    def lease(self, owner: str, n: int = 1, visibility_timeout: float = 300.0) -> List[Lease]:
+        """
+        Lease up to n visible jobs: queued ones whose backoff has passed, and leased ones
+        whose lease expired. An expired job that already used all attempts is dead-lettered.
+        """
+        max_attempts = self.max_retries + 1
+
+        def take(conn):
+            now = self._clock()
+            rows = conn.execute(
+                "SELECT job_id, payload, state, attempts FROM jobs "
+                "WHERE (state = ? AND available_at <= ?) OR (state = ? AND lease_expires <= ?) "
+                "ORDER BY rowid LIMIT ?",
+                (QUEUED, now, LEASED, now, n),
+            ).fetchall()
+            leases = []
+            for job_id, payload, state, attempts in rows:
+                if state == LEASED and attempts >= max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET state = ?, lease_token = NULL, last_error = ?, updated_at = ? WHERE job_id = ?",
+                        (DEAD, "lease expired", now, job_id),
+                    )
+                    logger.warning("Dead-lettered %s after %d expired attempts", job_id, attempts)
+                    continue
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_token = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE job_id = ?",
+                    (LEASED, owner, token, now + visibility_timeout, now, job_id),
+                )
+                if state == LEASED:
+                    logger.info("Reclaimed expired lease on %s", job_id)
+                leases.append(Lease(job_id, token, json.loads(payload), attempts + 1))
+            return leases
+
+        return self._transaction(take)
+
+    def extend(self, lease: Lease, visibility_timeout: float = 300.0) -> bool:
+        """
+        Push the lease deadline out; False when the lease was lost to another worker.
+        """
+        def touch(conn):
+            now = self._clock()
+            return conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND lease_token = ? AND state = ?",
+                (now + visibility_timeout, now, lease.job_id, lease.token, LEASED),
+            ).rowcount == 1
+
+        return self._transaction(touch)
+
+    def ack(self, lease: Lease) -> bool:
+        def done(conn):
+            return conn.execute(
+                "UPDATE jobs SET state = ?, lease_token = NULL, last_error = NULL, updated_at = ? "
+                "WHERE job_id = ? AND lease_token = ? AND state = ?",
+                (DONE, self._clock(), lease.job_id, lease.token, LEASED),
+            ).rowcount == 1
+
+        return self._transaction(done)
+
+    def fail(self, lease: Lease, error: str) -> Optional[str]:
+        """
+        Record a failed attempt. Returns the job's new state (queued for a retry, or dead),
+        or None when the lease was no longer held.
+        """
+        def failed(conn):
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE job_id = ? AND lease_token = ? AND state = ?",
+                (lease.job_id, lease.token, LEASED),
+            ).fetchone()
+            if row is None:
+                return None
+            now = self._clock()
+            state = DEAD if row[0] > self.max_retries else QUEUED
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_token = NULL, last_error = ?, available_at = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (state, error, now + self.retry_backoff * row[0], now, lease.job_id),
+            )
+            return state
+
+        return self._transaction(failed)
+
+    # -----------------------------
+    # Inspection
+    # -----------------------------
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, DEAD: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, attempts, last_error FROM jobs WHERE state = ? ORDER BY job_id", (DEAD,)
+            ).fetchall()
+        return [{"job_id": j, "attempts": a, "error": e} for j, a, e in rows]
+
+
+def _process_with_graph(product: ProductModel, outdir: str) -> None:
+    from .graph import run_product
+
+    result = run_product(product, outdir)
+    if not result.get("is_valid"):
+        errors = result.get("errors") or [result.get("error") or "validation failed"]
+        raise RuntimeError("; ".join(str(e) for e in errors))
+
+
+def run_worker(
+    queue: Any,
+    outdir: str,
+    worker_id: Optional[str] = None,
+    batch_size: int = 1,
+    visibility_timeout: float = 300.0,
+    poll_interval: float = 1.0,
+    exit_when_idle: bool = True,
+    process: Callable[[ProductModel, str], None] = _process_with_graph,
+) -> Dict[str, int]:
+    """
+    Lease, process and acknowledge jobs until the queue has nothing left to lease.
+    Each product goes through the LangGraph pipeline into <outdir>/<product_id>/.
+    A heartbeat thread extends held leases every visibility_timeout / 3 seconds.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    stats = {"processed": 0, "failed": 0, "lost": 0}
+    held: Dict[str, Lease] = {}
+    held_lock = threading.Lock()
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.wait(visibility_timeout / 3):
+            with held_lock:
+                leases = list(held.values())
+            for lease in leases:
+                if not queue.extend(lease, visibility_timeout):
+                    logger.warning("%s lost the lease on %s", worker_id, lease.job_id)
+
+    beat = threading.Thread(target=heartbeat, name=f"lease-heartbeat-{worker_id}", daemon=True)
+    beat.start()
+    try:
+        while True:
+            leases = queue.lease(worker_id, batch_size, visibility_timeout)
+            if not leases:
+                counts = queue.counts()
+                # Leased jobs may still come back if their worker dies, so wait them out
+                if exit_when_idle and not counts[QUEUED] and not counts[LEASED]:
+                    break
+                time.sleep(poll_interval)
+                continue
+            with held_lock:
+                held.update((lease.job_id, lease) for lease in leases)
+            for lease in leases:
+                try:
+                    product = ProductModel.from_dict(lease.payload)
+                    process(product, str(Path(outdir) / quote(lease.job_id, safe="")))
+                except Exception as exc:
+                    state = queue.fail(lease, f"{type(exc).__name__}: {exc}")
+                    logger.error("%s failed %s (attempt %d): %s -> %s", worker_id, lease.job_id, lease.attempt, exc, state)
+                    stats["failed"] += 1
+                else:
+                    if queue.ack(lease):
+                        stats["processed"] += 1
+                    else:
+                        # Lease expired and the job was handed to another worker meanwhile
+                        stats["lost"] += 1
+                finally:
+                    with held_lock:
+                        held.pop(lease.job_id, None)
+    finally:
+        stop.set()
+        beat.join()
+    logger.info("Worker %s done: %s", worker_id, stats)
+    return stats
+
+
+def main():
+    import argparse
+
+    from .agents.ingest_agent import iter_catalog
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Shared SQLite work queue for catalog runs")
+    parser.add_argument("--db", "-d", required=True, help="Queue database (on storage shared by all workers)")
+    parser.add_argument("--max-retries", type=int, default=3)
+    sub = parser.add_subparsers(dest="command", required=True)
+    enqueue = sub.add_parser("enqueue", help="Add one job per catalog product")
+    enqueue.add_argument("--catalog", "-c", required=True)
+    enqueue.add_argument("--replace", action="store_true", help="Reset jobs that already exist")
+    work = sub.add_parser("work", help="Process jobs until the queue is drained")
+    work.add_argument("--outdir", "-o", default="out")
+    work.add_argument("--worker-id", default=None)
+    work.add_argument("--batch-size", type=int, default=1)
+    work.add_argument("--visibility-timeout", type=float, default=300.0)
+    work.add_argument("--wait", action="store_true", help="Keep polling for new jobs instead of exiting when idle")
+    sub.add_parser("stats", help="Job counts per state and dead letters")
+    sub.add_parser("requeue-dead", help="Give dead-lettered jobs a fresh set of retries")
+    args = parser.parse_args()
+
+    configure_logging(batch=True)
+    with SQLiteWorkQueue(args.db, max_retries=args.max_retries) as queue:
+        if args.command == "enqueue":
+            queue.enqueue_products(iter_catalog(args.catalog), replace=args.replace)
+        elif args.command == "work":
+            run_worker(
+                queue,
+                args.outdir,
+                worker_id=args.worker_id,
+                batch_size=args.batch_size,
+                visibility_timeout=args.visibility_timeout,
+                exit_when_idle=not args.wait,
+            )
+        elif args.command == "requeue-dead":
+            print(f"Requeued {queue.requeue_dead()} jobs")
+        print(json.dumps({"counts": queue.counts(), "dead": queue.dead_letters()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# src/worker_pool.py
+"""
+Warm process pool for running the graph over a catalog.
+
+Importing langgraph / langchain and compiling the graph takes seconds per process. With
+the forkserver start method the pool imports and compiles once in the forkserver
+(src.worker_preload); every worker is forked from that warm process and starts on its
+first product immediately. Workers are recycled after `recycle_after` products to bound
+memory growth, and the replacements are forked warm too.
+
+Platforms without forkserver fall back to "spawn", with each worker warming up in its
+initializer instead.
+
+    python -m src.worker_pool --catalog catalog.jsonl --outdir out --processes 4
+"""
+import contextlib
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from .logging_setup import TEXT_FORMAT
+from .models import ProductModel
+
+logger = logging.getLogger("WorkerPool")
+
+PRELOAD_MODULES = ["src.worker_preload"]
+PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+
+# Per-worker settings, set by _init_worker
+_worker_options: Dict[str, Any] = {}
+_worker_store: Any = None  # ContentStore shared by the worker's products in cas mode
+
+
+def _init_worker(outdir: str, options: Dict[str, Any], log_level: Optional[int], preloaded: bool) -> None:
+    global _worker_store
+    if preloaded and "src.worker_preload" not in sys.modules:
+        logger.warning("Forkserver preload failed; worker %d is warming up on its own", os.getpid())
+
+    from .graph import get_compiled_graph
+
+    if log_level is not None:
+        # Synchronous handler: pool workers exit without running atexit, which would lose queued records
+        logging.basicConfig(level=log_level, format=TEXT_FORMAT)
+        logging.getLogger().setLevel(log_level)
+    _worker_options.update(options, outdir=outdir)
+    if options.get("output_mode") == "cas":
+        # Blobs and manifests are written atomically, so workers can share the root
+        from .artifact_store import ContentStore
+
+        _worker_store = ContentStore(outdir)
+    get_compiled_graph()  # no-op when inherited from the forkserver
+
+
+def _run_one(product: ProductModel) -> Tuple[str, Optional[str], Any, Any]:
+    from .artifact_index import IndexRecorder
+    from .graph import run_product
+    from .shard_writer import ShardRecorder
+
+    options = dict(_worker_options)
+    root = options.pop("outdir")
+    outdir = str(Path(root) / quote(product.id, safe=""))
+    # Index writes and shard records go back to the parent, which owns the one
+    # ArtifactIndex and the one ShardWriter of the run
+    index_path = options.pop("index_path", None)
+    recorder = IndexRecorder(index_path) if index_path else None
+    shards = ShardRecorder(root) if options.get("output_mode") == "shards" else None
+    try:
+        result = run_product(product, outdir, index=recorder, store=shards or _worker_store, **options)
+    except Exception as exc:
+        return product.id, f"{type(exc).__name__}: {exc}", None, None
+    if not result.get("is_valid"):
+        error = "; ".join(str(e) for e in result.get("errors") or ["validation failed"])
+        return product.id, error, recorder, shards
+    return product.id, None, recorder, shards
+
+
+@contextlib.contextmanager
+def _pythonpath(path: str) -> Iterator[None]:
+    """
+    Prepend path to PYTHONPATH for processes started inside the block, then restore it.
+    """
+    original = os.environ.get("PYTHONPATH")
+    entries = [p for p in (original or "").split(os.pathsep) if p]
+    if path not in entries:
+        os.environ["PYTHONPATH"] = os.pathsep.join([path] + entries)
+    try:
+        yield
+    finally:
+        if original is None:
+            os.environ.pop("PYTHONPATH", None)
+        else:
+            os.environ["PYTHONPATH"] = original
+
+
+class WarmWorkerPool:
+    """
+    Process pool whose workers start with the graph already compiled.
+    Extra keyword arguments are passed to graph.run_product for every product; with
+    index_path the pool opens one ArtifactIndex and records every worker's products in it,
+    and with output_mode="shards" one ShardWriter under outdir appends them all.
+    """
+
+    def __init__(
+        self,
+        outdir: str,
+        processes: Optional[int] = None,
+        recycle_after: Optional[int] = 500,
+        start_method: Optional[str] = None,
+        log_level: Optional[int] = logging.WARNING,
+        **options,
+    ):
+        methods = multiprocessing.get_all_start_methods()
+        self.start_method = start_method or ("forkserver" if "forkserver" in methods else "spawn")
+        ctx = multiprocessing.get_context(self.start_method)
+        preloaded = self.start_method == "forkserver"
+        if preloaded:
+            ctx.set_forkserver_preload(PRELOAD_MODULES)
+        started = time.perf_counter()
+        # The forkserver does not inherit sys.path (it is a fresh interpreter that silently
+        # skips preload modules it cannot import), so expose the project root while the pool
+        # starts it; later workers are forked from it and need no environment
+        with _pythonpath(PROJECT_ROOT) if preloaded else contextlib.nullcontext():
+            self._pool = ctx.Pool(
+                processes,
+                initializer=_init_worker,
+                initargs=(outdir, options, log_level, preloaded),
+                maxtasksperchild=recycle_after,
+            )
+        self.startup_s = time.perf_counter() - started
+        self.processes = processes or os.cpu_count() or 1
+        self.index = None
+        if options.get("index_path"):
+            from .artifact_index import ArtifactIndex
+
+            self.index = ArtifactIndex(options["index_path"])
+        self.store = None
+        if options.get("output_mode") == "shards":
+            from .shard_writer import ShardWriter
+
+            self.store = ShardWriter(outdir, compression=options.get("output_compression"), index=self.index)
+
+    def imap(self, products: Iterable[ProductModel]) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Yield (product_id, error or None) per product, in completion order.
+        """
+        for product_id, error, recorder, shards in self._pool.imap_unordered(_run_one, products, chunksize=1):
+            if recorder is not None:
+                recorder.replay(self.index)
+            if shards is not None:
+                shards.replay(self.store)
+            yield product_id, error
+
+    def run(self, products: Iterable[ProductModel]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        first = None
+        done = 0
+        failed = []
+        for product_id, error in self.imap(products):
+            if first is None:
+                first = time.perf_counter() - started
+            done += 1
+            if error is not None:
+                failed.append({"product_id": product_id, "error": error})
+        wall = time.perf_counter() - started
+        report = {
+            "start_method": self.start_method,
+            "processes": self.processes,
+            "products": done,
+            "failed": failed,
+            "startup_s": round(self.startup_s, 4),
+            "time_to_first_s": round(first or 0.0, 4),
+            "wall_s": round(wall, 4),
+            "products_per_s": round(done / wall, 1) if wall else 0.0,
+        }
+        logger.info("Processed %d products in %.2fs (%d failed)", done, wall, len(failed))
+        return report
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+        self._close_outputs()
+
+    def terminate(self) -> None:
+        self._pool.terminate()
+        self._pool.join()
+        self._close_outputs()
+
+    def _close_outputs(self) -> None:
+        if self.store is not None:
+            self.store.close()  # flushes shard locations into the index
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self) -> "WarmWorkerPool":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+
+def main():
+    import argparse
+    import json
+
+    from .agents.ingest_agent import iter_catalog
+    from .logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Run the graph over a catalog with a warm process pool")
+    parser.add_argument("--catalog", "-c", required=True)
+    parser.add_argument("--outdir", "-o", default="out")
+    parser.add_argument("--processes", "-p", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--recycle-after", type=int, default=500, help="Replace a worker after N products")
+    parser.add_argument("--format", choices=["pretty", "compact", "msgpack", "cbor"], default="pretty")
+    args = parser.parse_args()
+
+    configure_logging(batch=True)
+    with WarmWorkerPool(
+        args.outdir, processes=args.processes, recycle_after=args.recycle_after, output_format=args.format
+    ) as pool:
+        report = pool.run(iter_catalog(args.catalog))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+# src/worker_preload.py
+"""
+Imported once by the forkserver of src.worker_pool.WarmWorkerPool: loads the heavy
+dependencies and compiles the graph so every forked worker inherits them ready to use.
+Do not import this module for any other purpose.
+"""
+import langchain_core  # noqa: F401
+import langchain_openai  # noqa: F401
+import langgraph.graph  # noqa: F401
+import pydantic  # noqa: F401
+
+from src.graph import get_compiled_graph
+
+get_compiled_graph()
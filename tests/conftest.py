@@ -5,3 +5,29 @@ import os
 root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if root not in sys.path:
     sys.path.insert(0, root)
+
+from src.models import ProductModel  # noqa: E402
+
+# Fixed, so artifacts generated from equal products are identical
+INGESTED_AT = "2025-01-01T00:00:00+00:00"
+
+
+def product_data(i=1, price=100.0, currency="INR", ingredients=("Vitamin C",), benefits=("Hydration",), **fields):
+    """
+    Input dict for product p<i> named "Product <i>"; other fields (description, how_to_use,
+    metadata, ...) are added as given.
+    """
+    data = {
+        "product_id": f"p{i}",
+        "name": f"Product {i}",
+        "price": {"amount": price, "currency": currency},
+        "ingredients": list(ingredients),
+        "benefits": list(benefits),
+        "metadata": {"ingested_at": INGESTED_AT},
+    }
+    data.update(fields)
+    return data
+
+
+def make_product(i=1, **kwargs) -> ProductModel:
+    return ProductModel.from_dict(product_data(i, **kwargs))
@@ -0,0 +1,87 @@
+import sys
+
+import pytest
+
+from src.agents.renderer_agent import write_outputs
+from src.artifact_index import ArtifactIndex, main
+from src.shard_writer import ShardReader, ShardWriter
+
+
+def artifacts(i, verdict="Product A is cheaper"):
+    page = {
+        "product_id": f"p{i}",
+        "title": f"Product {i}",
+        "ingredients_block": [{"name": "Vitamin C", "description": ""}, {"name": f"Extract {i}", "description": ""}],
+        "benefits_block": [],
+        "price_block": {"amount": 100.0 + i, "currency": "INR"},
+    }
+    faq = [{"id": "1", "category": "Info", "question": "Name?", "answer": f"Product {i}"}]
+    comparison = {
+        "product_A": {"name": f"Product {i}", "ingredients": ["Vitamin C", f"Extract {i}"], "benefits": ["Hydration"]},
+        "comparisons": [],
+        "verdict": verdict,
+    }
+    return page, faq, comparison
+
+
+def test_index_files_and_queries(tmp_path):
+    db = str(tmp_path / "index.sqlite")
+    with ArtifactIndex(db, batch_size=2) as index:
+        for i in range(5):
+            write_outputs(*artifacts(i), str(tmp_path / f"p{i}"), index=index)
+        write_outputs(*artifacts(2, verdict="Product B is cheaper"), str(tmp_path / "p2"), index=index)
+        assert index.stats["commits"] == 3
+
+    with ArtifactIndex(db) as index:
+        assert index.products_with_ingredient("vitamin c") == ["p0", "p1", "p2", "p3", "p4"]
+        assert index.products_with_ingredient("Extract 3") == ["p3"]
+        assert index.products_with_benefit("Hydration") == ["p0", "p1", "p2", "p3", "p4"]
+        assert index.products_with_verdict("Product A is cheaper") == ["p0", "p1", "p3", "p4"]
+        assert index.products_with_verdict("B is", substring=True) == ["p2"]
+        product = index.get_product("p2")
+        assert product["title"] == "Product 2"
+        assert product["price_amount"] == 102.0
+        assert product["faq_count"] == 1
+        assert product["ingredients"] == ["Vitamin C", "Extract 2"]
+        assert product["locations"]["faq"] == {"path": str(tmp_path / "p2" / "faq.json")}
+        assert index.get_product("missing") is None
+
+
+def test_shard_writer_feeds_offsets(tmp_path):
+    root = tmp_path / "shards"
+    with ArtifactIndex(str(tmp_path / "index.sqlite")) as index:
+        with ShardWriter(str(root), compression="gzip", index=index) as writer:
+            for i in range(3):
+                write_outputs(*artifacts(i), str(root), store=writer, index=index)
+        location = index.get_product("p1")["locations"]["faq"]
+
+    assert location["shard"] == "shard-00000.jsonl.gz"
+    with ShardReader(str(root)) as reader:
+        assert reader.get("p1", "faq") == artifacts(1)[1]
+
+
+def test_run_product_batches_into_a_shared_index(tmp_path):
+    from src.graph import run_product
+    from src.models import ProductModel
+
+    db = str(tmp_path / "index.sqlite")
+    with ArtifactIndex(db, batch_size=10) as index:
+        for i in range(3):
+            product = ProductModel.from_dict({
+                "product_id": f"p{i}", "name": f"Product {i}", "price": {"amount": 100.0, "currency": "INR"},
+                "ingredients": ["Vitamin C"], "benefits": ["Hydration"],
+            })
+            run_product(product, str(tmp_path / f"p{i}"), index=index)
+        # rendered into the open index, nothing committed yet
+        assert index.stats["products"] == 3 and index.stats["commits"] == 0
+    with ArtifactIndex(db) as index:
+        assert index.products_with_ingredient("Vitamin C") == ["p0", "p1", "p2"]
+
+
+def test_cli_rejects_missing_database(tmp_path, monkeypatch, capsys):
+    db = tmp_path / "typo.sqlite"
+    monkeypatch.setattr(sys, "argv", ["artifact_index", "--db", str(db), "stats"])
+    with pytest.raises(SystemExit):
+        main()
+    assert "index database not found" in capsys.readouterr().err
+    assert not db.exists()
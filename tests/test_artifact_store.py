@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from src.artifact_store import ContentStore
+from src.agents.renderer_agent import write_outputs
+
+
+def artifacts(pid):
+    page = {"product_id": pid, "title": pid, "usage_block": {"title": "Usage Instructions", "text": "Follow product label instructions."}}
+    faq = [{"id": "1", "category": "Usage", "question": "How?", "answer": "Apply daily."}]
+    comparison = {"verdict": "Product A is cheaper", "comparisons": []}
+    return page, faq, comparison
+
+
+def test_roundtrip_is_identical(tmp_path):
+    store = ContentStore(str(tmp_path))
+    page, faq, comparison = artifacts("p1")
+    write_outputs(page, faq, comparison, str(tmp_path), store=store)
+    restored = store.read_product("p1")
+    assert json.dumps(restored["product_page"]) == json.dumps(page)
+    assert restored["faq"] == faq
+    assert restored["comparison_page"] == comparison
+
+
+def test_shared_blocks_are_stored_once(tmp_path):
+    store = ContentStore(str(tmp_path))
+    for pid in ("p1", "p2"):
+        write_outputs(*artifacts(pid), str(tmp_path), store=store)
+    # the usage block and the FAQ item are blobs shared by both products; ids, titles and the
+    # comparison stay inline in the manifests
+    assert store.stats["blobs_written"] == 2
+    assert store.stats["blobs_deduplicated"] == 2
+    assert store.list_products() == ["p1", "p2"]
+    assert len(list((tmp_path / "blobs").rglob("*.json"))) == 2
+    manifest = json.loads(store.manifest_path("p1").read_bytes())
+    assert manifest["artifacts"]["product_page"]["fields"]["title"] == {"value": "p1"}
+
+
+def test_generic_faq_items_are_shared_between_products(tmp_path):
+    store = ContentStore(str(tmp_path))
+    generic = {"id": "1", "category": "Usage", "question": "How often?", "answer": "Apply daily."}
+    for pid in ("p1", "p2"):
+        named = {"id": "2", "category": "Pricing", "question": "Price?", "answer": f"{pid} costs 100 INR."}
+        entry = store.put_artifact([generic, named])
+        assert entry["type"] == "array"
+        assert store.get_artifact(entry) == [generic, named]
+    # the generic item is stored once, the answers naming each product once per product
+    assert store.stats["blobs_written"] == 3
+    assert store.stats["blobs_deduplicated"] == 1
+
+
+def test_store_requires_a_product_id(tmp_path):
+    store = ContentStore(str(tmp_path))
+    page, faq, comparison = artifacts("p1")
+    del page["product_id"]
+    with pytest.raises(ValueError):
+        write_outputs(page, faq, comparison, str(tmp_path), store=store)
+    write_outputs(page, faq, comparison, str(tmp_path), store=store, store_key="p1")
+    assert store.list_products() == ["p1"]
@@ -26,3 +26,40 @@ def test_compare_common_ingredients(A):
     }
     comparison = compare_products(A, B)
     assert "Vitamin C" in comparison["comparisons"][0]["common"]
+
+
+@pytest.fixture
+def catalog():
+    return [
+        {"name": "P0", "ingredients": ["Vitamin C", "Glycerin", "Niacinamide"], "benefits": ["Brightening"],
+         "price": {"amount": 699, "currency": "INR"}},
+        {"name": "P1", "ingredients": ["vitamin c", "Glycerin"], "benefits": ["Brightening"],
+         "price": {"amount": 599, "currency": "INR"}},
+        {"name": "P2", "ingredients": ["Retinol"], "benefits": ["Anti-aging"],
+         "price": {"amount": 999, "currency": "INR"}},
+        {"name": "P3", "ingredients": ["Retinol", "Glycerin"], "benefits": ["Anti-aging"],
+         "price": {"amount": 899, "currency": "INR"}},
+    ]
+
+
+def test_find_similar_products_ranks_by_jaccard(catalog):
+    from src.agents.comparison_agent import find_similar_products
+    neighbours = find_similar_products(catalog, k=2)
+    assert [idx for idx, _ in neighbours[0]] == [1, 3]
+    assert neighbours[0][0][1] == pytest.approx(0.75)
+    assert all(idx != i for i, matches in enumerate(neighbours) for idx, _ in matches)
+
+
+def test_compare_against_catalog_keeps_schema(catalog):
+    from src.agents.comparison_agent import compare_against_catalog
+    rows = compare_against_catalog(catalog, k=1)
+    assert rows[2][0] == compare_products(catalog[2], catalog[3])
+    assert rows[0][0]["verdict"] == "Product B is cheaper"
+
+
+def test_compare_products_batch_matches_single(catalog):
+    from src.agents.comparison_agent import compare_products_batch
+    catalog[0]["ingredients"].append("GLYCERIN")
+    catalog[1]["benefits"] = ["brightening", "Brightening"]
+    pairs = [(a, b) for a in range(len(catalog)) for b in range(len(catalog))]
+    assert compare_products_batch(catalog, pairs) == [compare_products(catalog[a], catalog[b]) for a, b in pairs]
@@ -0,0 +1,61 @@
+import json
+import sys
+
+import pytest
+
+from src.dry_run import dry_run, plan_product, project, token_counter
+from tests.conftest import make_product
+
+
+def chars(text):
+    return len(text)
+
+
+def test_complete_product_needs_no_llm():
+    plan = plan_product(make_product(1, ingredients=["Vitamin C", "Glycerin"]), chars)
+    assert plan["fallbacks"] == {}
+    assert plan["deterministic_s"] > 0
+
+
+def test_short_faq_is_predicted_with_prompt_and_completion_tokens():
+    plan = plan_product(make_product(1, benefits=[]), chars)
+    assert list(plan["fallbacks"]) == ["faq"]
+    faq = plan["fallbacks"]["faq"]
+    assert faq["reason"] == "14 FAQ items"
+    assert faq["prompt_tokens"] > faq["completion_tokens"] > 0
+
+
+def test_dry_run_summarizes_and_writes_details(tmp_path):
+    products = [
+        make_product(1, ingredients=["Vitamin C", "Glycerin"]),
+        make_product(2, ingredients=["Retinol"], benefits=[]),
+        make_product(3, ingredients=[], benefits=[]),
+    ]
+    details = tmp_path / "plans.jsonl"
+    report = dry_run(products, details_path=str(details), count_tokens=chars, concurrency=2)
+    assert report["products"] == 3
+    assert report["products_with_fallback"] == 2
+    assert report["fallbacks"] == {"product_page": 0, "faq": 2, "comparison": 0}
+    assert report["token_counter"] == "chars"
+    assert report["projection"]["llm_calls"] == 2
+    assert [json.loads(line)["product_id"] for line in details.read_text().splitlines()] == ["p2", "p3"]
+
+
+def test_projection_applies_concurrency_and_rate_limits():
+    fallback = {"prompt_tokens": 1000, "completion_tokens": 200}
+    plans = [{"deterministic_s": 0.0, "fallbacks": {"faq": fallback}} for _ in range(8)]
+    result = project(plans, concurrency=4, latency=1.0, output_tps=100.0)
+    assert result["wall_s"] == pytest.approx(6.0)  # 8 calls of 3s over 4 workers
+    assert result["bound_by"] == "concurrency"
+    assert result["total_tokens"] == 9600
+    assert result["cost_usd"] == pytest.approx((8000 * 0.15 + 1600 * 0.60) / 1e6, abs=1e-4)
+
+    limited = project(plans, concurrency=4, latency=1.0, output_tps=100.0, rpm=60)
+    assert limited["bound_by"] == "rpm_limit" and limited["wall_s"] == pytest.approx(8.0)
+
+
+def test_token_counter_falls_back_without_tiktoken(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    count, name = token_counter()
+    assert name == "chars/4"
+    assert count("abcdefgh") == 2
@@ -0,0 +1,57 @@
+import json
+
+from src.agents.ingest_agent import ingest_directory, iter_catalog, iter_directory, list_product_files
+
+
+def write_products(directory, n):
+    for i in range(n):
+        data = {"product_id": f"p{i:03d}", "name": f"Product {i}", "price": {"amount": 10.0 + i, "currency": "INR"}}
+        if i % 2:
+            data = {"product": data}  # wrapped, as ingest_from_file accepts
+        (directory / f"p{i:03d}.json").write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_lists_json_files_by_name(tmp_path):
+    write_products(tmp_path, 3)
+    (tmp_path / ".hidden.json").write_text("{}")
+    (tmp_path / "notes.txt").write_text("")
+    (tmp_path / "sub.json").mkdir()
+    assert [p.rsplit("/", 1)[-1] for p in list_product_files(str(tmp_path))] == ["p000.json", "p001.json", "p002.json"]
+
+
+def test_ordered_and_unordered_yield_every_product(tmp_path):
+    write_products(tmp_path, 50)
+    ordered = [p.id for p in iter_directory(str(tmp_path), workers=4, prefetch=2, chunk_size=3)]
+    assert ordered == [f"p{i:03d}" for i in range(50)]
+    unordered = [p.id for p in iter_directory(str(tmp_path), workers=4, ordered=False, chunk_size=3)]
+    assert sorted(unordered) == ordered
+    assert [p.id for p in iter_catalog(str(tmp_path))] == ordered
+
+
+def test_unreadable_files_are_reported_and_skipped(tmp_path):
+    write_products(tmp_path, 4)
+    (tmp_path / "p001.json").write_text("{not json")
+    (tmp_path / "p002.json").write_text("[1, 2]")
+    products, errors = ingest_directory(str(tmp_path), workers=2, chunk_size=1)
+    assert [p.id for p in products] == ["p000", "p003"]
+    assert [e["path"].rsplit("/", 1)[-1] for e in errors] == ["p001.json", "p002.json"]
+    assert all(e["error"] for e in errors)
+
+
+def test_stopping_early_cancels_prefetched_reads(tmp_path):
+    write_products(tmp_path, 40)
+    products = iter_directory(str(tmp_path), workers=2, prefetch=2, chunk_size=1)
+    assert next(products).id == "p000"
+    products.close()
+
+
+def test_nan_price_is_read_as_ingest_from_file_reads_it(tmp_path):
+    import math
+
+    from src.agents.ingest_agent import ingest_from_file
+
+    path = tmp_path / "nan.json"
+    path.write_text('{"product_id": "nan", "name": "NaN", "price": {"amount": NaN, "currency": "INR"}}', encoding="utf-8")
+    (product,), errors = ingest_directory(str(tmp_path))
+    assert errors == []
+    assert math.isnan(product.price) and math.isnan(ingest_from_file(str(path)).price)
@@ -0,0 +1,77 @@
+import io
+import json
+import logging
+
+import pytest
+
+from src.logging_setup import SamplingFilter, configure_logging, parse_logger_map, product_context, stop_logging
+from src.models import ProductModel
+from src.orchestrator import generate_artifacts
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_records_carry_product_id(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging(fmt="json", stream=stream)
+    with product_context("sku-1"):
+        logging.getLogger("Test").info("hello %s", "world")
+    logging.getLogger("Test").warning("outside")
+    stop_logging()
+
+    first, second = records(stream)
+    assert first["message"] == "hello world" and first["product_id"] == "sku-1"
+    assert first["logger"] == "Test" and first["level"] == "INFO"
+    assert "product_id" not in second
+
+
+def test_batch_mode_replaces_per_product_lines_with_summary(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging(fmt="json", stream=stream, batch=True)
+    product = ProductModel.from_dict({"product_id": "p1", "name": "P", "price": {"amount": 1, "currency": "INR"}})
+    for _ in range(3):
+        generate_artifacts(product)
+    stop_logging()
+
+    lines = records(stream)
+    assert all(r["level"] != "INFO" or r["logger"] == "Logging" for r in lines)
+    warnings = [r for r in lines if r["level"] == "WARNING"]
+    assert len(warnings) == 3 and all(r["product_id"] == "p1" for r in warnings)  # no benefits
+    summary = lines[-1]["summary"]
+    assert summary["suppressed"]["QuestionGeneratorAgent: Generated %d questions"] == 3
+
+
+def test_sampling_and_rate_limit():
+    now = [0.0]
+    f = SamplingFilter({"Sampled": 0.25, "Muted": 0}, {"Limited": 2}, clock=lambda: now[0])
+
+    def passes(name, level=logging.INFO):
+        return f.filter(logging.LogRecord(name, level, __file__, 1, "msg", None, None))
+
+    assert [passes("Sampled") for _ in range(8)] == [True, False, False, False] * 2
+    assert not passes("Muted") and passes("Muted", logging.WARNING)
+    assert [passes("Limited") for _ in range(3)] == [True, True, False]
+    now[0] = 0.5  # one token refilled
+    assert [passes("Limited") for _ in range(2)] == [True, False]
+    assert passes("Limited", logging.ERROR)
+    assert f.dropped == {"Sampled": 6, "Muted": 1, "Limited": 2}
+
+
+def test_parse_logger_map():
+    assert parse_logger_map("A=0.5, B=10") == {"A": 0.5, "B": 10.0}
+    assert parse_logger_map("") == {}
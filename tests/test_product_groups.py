@@ -0,0 +1,73 @@
+from src.models import ProductModel
+from src.orchestrator import generate_artifacts
+from src.product_groups import generate_grouped, group_products
+from src.agents.facts_extractor_agent import extract_facts
+
+
+def variant(pid, name, price, description="A 10% Vitamin C serum.", ingredients=("Vitamin C", "Glycerin", "Niacinamide"),
+            benefits=("Brightening", "Hydration"), currency="INR"):
+    return ProductModel.from_dict({
+        "product_id": pid,
+        "name": name,
+        "description": description,
+        "price": {"amount": price, "currency": currency},
+        "ingredients": list(ingredients),
+        "benefits": list(benefits),
+        "how_to_use": "Apply in the morning.",
+        "metadata": {"source": f"feed-{pid}"},
+    })
+
+
+def catalog():
+    return [
+        variant("serum-30", "Serum 30ml", 699),
+        variant("serum-50", "Serum 50ml", 999),
+        variant("cream", "Cream", 499, ingredients=("Ceramides", "Squalane")),
+        variant("serum-pack", "Serum 3-pack", 1899, currency="USD"),
+        # Summary and description answers fall back to the name
+        variant("plain-1", "Plain 1", 100, description=""),
+        variant("plain-2", "Plain 2", 120, description="", benefits=("Hydration",)),
+        variant("plain-3", "Plain 3", 150, description=""),
+    ]
+
+
+def test_groups_ignore_variant_fields_only():
+    facts = [extract_facts(p) for p in catalog()]
+    assert group_products(facts) == [[0, 1, 3], [2], [4, 6], [5]]
+
+
+def test_outputs_identical_to_per_product_generation():
+    products = catalog()
+    result = generate_grouped(products)
+    for product, grouped in zip(products, result["artifacts"]):
+        assert grouped == generate_artifacts(product)
+
+    report = result["report"]
+    assert (report["products"], report["groups"], report["largest_group"]) == (7, 4, 3)
+    assert report["dedup_ratio"] == 1.75
+
+
+def test_page_template_rendered_per_variant(tmp_path):
+    template = {"blocks": [{"key": "headline", "title": "Headline", "text": "{{ name }} for {{ price.amount }}"}]}
+    result = generate_grouped(catalog()[:2], page_template=template)
+    assert [a["product_page"]["headline"]["text"] for a in result["artifacts"]] == [
+        "Serum 30ml for 699.0", "Serum 50ml for 999.0"
+    ]
+
+
+def test_llm_fallback_runs_per_variant():
+    calls = []
+
+    def fallback(facts):
+        calls.append(facts["product_id"])
+        # Free text: the name can appear in any answer, not just the name question
+        return [
+            {"id": "1", "category": "Product Information", "question": "What is the name of the product?", "answer": facts["name"]},
+            {"id": "2", "category": "Usage", "question": "How should the product be used?", "answer": f"Apply {facts['name']} daily."},
+        ]
+
+    products = [variant(f"p{i}", f"Mini {i}", 99, ingredients=("Glycerin",), benefits=()) for i in range(3)]
+    faqs = [a["faq"] for a in generate_grouped(products, faq_fallback=fallback)["artifacts"]]
+    assert calls == ["p0", "p1", "p2"]
+    assert [faq[0]["answer"] for faq in faqs] == ["Mini 0", "Mini 1", "Mini 2"]
+    assert [faq[1]["answer"] for faq in faqs] == ["Apply Mini 0 daily.", "Apply Mini 1 daily.", "Apply Mini 2 daily."]
@@ -30,3 +30,37 @@ def test_product_page_structure(facts):
 def test_product_page_title(facts):
     page = render_product_page(facts)
     assert page["title"] == "GlowBoost Vitamin C Serum"
+
+
+def test_default_template_is_byte_identical(facts):
+    import json
+    from src.agents.template_engine_agent import DEFAULT_PAGE_TEMPLATE
+    for variant in (facts, {**facts, "how_to_use": "", "side_effects": "", "description": ""}):
+        expected = json.dumps(render_product_page(variant), ensure_ascii=False, indent=2)
+        actual = json.dumps(render_product_page(variant, DEFAULT_PAGE_TEMPLATE), ensure_ascii=False, indent=2)
+        assert actual == expected
+
+
+def test_template_variants_and_patterns(facts):
+    template = {
+        "blocks": [{"key": "usage_block", "title": "Use", "text": "{{ how_to_use }}"}],
+        "variants": {"sunscreen": {"blocks": [{"key": "usage_block", "title": "Use", "text": "Reapply. {{ how_to_use }}"}]}},
+    }
+    page = render_product_page(facts, template)
+    assert list(page) == ["product_id", "title", "metadata", "usage_block"]
+    assert page["usage_block"] == {"title": "Use", "text": "Apply daily."}
+    sunscreen = {**facts, "metadata": {"category": "sunscreen"}}
+    assert render_product_page(sunscreen, template)["usage_block"]["text"] == "Reapply. Apply daily."
+
+
+def test_template_file_recompiled_on_change(facts, tmp_path):
+    import json
+    import os
+    from src.agents.template_engine_agent import load_page_template
+    path = tmp_path / "page.json"
+    path.write_text(json.dumps({"blocks": [{"key": "price_block", "generator": "price"}]}))
+    first = load_page_template(path)
+    assert load_page_template(path) is first
+    path.write_text(json.dumps({"blocks": [{"key": "summary_block", "generator": "summary"}]}))
+    os.utime(path, ns=(1, 1))
+    assert "summary_block" in render_product_page(facts, str(path))
@@ -0,0 +1,79 @@
+import json
+import pstats
+import time
+
+from src.graph import get_compiled_graph, run_product
+from src.profiling import PipelineProfiler, node_times, pstats_to_collapsed, reset_node_times, wrap_node
+from tests.conftest import make_product
+
+
+def test_wrap_node_names_frame_and_times_calls():
+    reset_node_times()
+    wrapped = wrap_node("faq", lambda state: state + 1)
+    assert wrapped(1) == 2
+    assert wrapped.__code__.co_name == "node:faq"
+    assert node_times()["faq"]["calls"] == 1
+
+
+def test_unprofiled_runs_use_the_plain_graph(tmp_path):
+    assert get_compiled_graph() is not get_compiled_graph(True)
+    assert get_compiled_graph() is get_compiled_graph(False) is get_compiled_graph(profiled=0)
+    reset_node_times()
+    assert run_product(make_product(), str(tmp_path / "out"))["is_valid"]
+    assert node_times() == {}
+
+
+def test_cprofile_run_attributes_time_to_nodes(tmp_path):
+    profiler = PipelineProfiler("cprofile", output=str(tmp_path / "prof" / "run"))
+    with profiler.run():
+        run_product(make_product(), str(tmp_path / "out"), profiled=True)
+    paths = profiler.write()
+
+    assert set(paths) == {"pstats", "collapsed", "summary"}
+    stats = pstats.Stats(paths["pstats"])
+    assert any(name == "node:faq" for _, _, name in stats.stats)
+    collapsed = (tmp_path / "prof" / "run.collapsed").read_text().splitlines()
+    assert any(";node:comparison;" in line for line in collapsed)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+    summary = json.loads((tmp_path / "prof" / "run.json").read_text())
+    assert set(summary["nodes"]) >= {"sanity", "facts", "product_page", "faq", "comparison", "validate", "render"}
+
+
+def test_sampling_every_nth_product(tmp_path):
+    profiler = PipelineProfiler("sample", every=2, output=str(tmp_path / "prof"), interval=0.001)
+    busy = wrap_node("busy", lambda state: time.sleep(0.03))
+    flags = []
+    for _ in range(4):
+        with profiler.product() as profiled:
+            flags.append(profiled)
+            busy(None)
+    paths = profiler.write()
+
+    assert flags == [True, False, True, False]
+    summary = json.loads(open(paths["summary"]).read())
+    assert summary["products_profiled"] == 2 and summary["samples"] > 0
+    assert summary["nodes"]["busy"]["calls"] == 4
+    assert "node:busy" in open(paths["collapsed"]).read()
+
+
+def test_pstats_to_collapsed_splits_time_by_caller():
+    def leaf():
+        sum(range(20000))
+
+    def a():
+        leaf()
+
+    def b():
+        leaf()
+        leaf()
+
+    import cProfile
+    prof = cProfile.Profile()
+    prof.enable()
+    a()
+    b()
+    prof.disable()
+    stacks = pstats_to_collapsed(pstats.Stats(prof), min_us=0)
+    via_a = sum(v for k, v in stacks.items() if k.startswith("a (") and ";leaf (" in k)
+    via_b = sum(v for k, v in stacks.items() if k.startswith("b (") and ";leaf (" in k)
+    assert via_b > via_a > 0
@@ -31,3 +31,15 @@ def test_generate_questions_ingredient_related(facts):
     qs = generate_questions(facts)
     ing_qs = [q for q in qs if "contain" in q["question"].lower()]
     assert len(ing_qs) >= 1
+
+
+def test_generate_questions_batch_matches_single(facts):
+    from src.agents.question_generator_agent import generate_questions_batch
+    bags = [facts, {**facts, "product_id": "p1", "ingredients": []}, {}]
+    assert generate_questions_batch(bags) == [generate_questions(f) for f in bags]
+
+
+def test_question_plan_shared_per_shape(facts):
+    from src.agents.question_generator_agent import question_plan
+    assert question_plan(False, True, 2, 2) is question_plan(False, True, 2, 2)
+    assert len(question_plan(True, True, 5, 3)) == 15
@@ -0,0 +1,161 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src import graph, langchain_orchestrator, resilience
+from src.agents import comparison_agent
+from src.agents.validator_agent import validate_outputs
+from src.graph import run_product, validation_router
+from src.models import ProductModel
+from src.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from src.state import PipelineState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ConnectionError("endpoint down")
+
+
+def short_faq_product(i=1):
+    # One ingredient and no benefits: the deterministic FAQ has 14 items, so the LLM tops it up
+    return ProductModel.from_dict({
+        "product_id": f"p{i}",
+        "name": f"Product {i}",
+        "price": {"amount": 100.0, "currency": "INR"},
+        "ingredients": ["Vitamin C"],
+        "benefits": [],
+    })
+
+
+def test_breaker_opens_at_failure_rate_and_short_circuits():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, cooldown=10, clock=clock)
+    breaker.call(lambda: 1)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == CLOSED  # 2 of 3 failed, but fewer than min_calls
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+    assert calls == []
+    assert breaker.stats()["short_circuits"] == 1
+
+
+def test_half_open_lets_one_probe_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, cooldown=10, clock=clock)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # the probe is still in flight
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 25
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+    stats = breaker.stats()
+    assert stats["trips"] == 2
+    assert stats["probes"] == 2
+    assert stats["time_in_state_s"] == {CLOSED: 0.0, OPEN: 25.0, HALF_OPEN: 0.0}
+
+
+def test_interrupted_probe_does_not_wedge_the_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, cooldown=10, clock=clock)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    clock.now = 10
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(interrupted)
+    assert breaker.state == OPEN
+    clock.now = 20
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_invoke_stops_retrying_at_deadline():
+    calls = []
+
+    def invoke(prompt):
+        calls.append(prompt)
+        time.sleep(0.02)
+        return SimpleNamespace(content="not json")
+
+    llm = SimpleNamespace(invoke=invoke)
+    with pytest.raises(TimeoutError):
+        langchain_orchestrator._invoke(
+            langchain_orchestrator.FAQ_PROMPT, llm, {}, retries=3, deadline=time.monotonic() + 0.01
+        )
+    assert len(calls) == 1
+
+
+def test_failed_fallback_keeps_deterministic_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(resilience, "llm_breaker", CircuitBreaker(min_calls=2, cooldown=60))
+    calls = []
+
+    def generate_faq(facts, deadline=None):
+        calls.append(deadline)
+        raise ConnectionError("endpoint down")
+
+    monkeypatch.setattr(graph, "generate_faq", generate_faq)
+
+    for i in range(3):
+        result = run_product(short_faq_product(i), str(tmp_path / f"p{i}"), node_timeout=5)
+        assert result["is_valid"]
+        assert result["degraded"] and result["degraded_nodes"] == ["faq"]
+        assert len(result["faq"]) == 14
+        assert (tmp_path / f"p{i}" / "faq.json").exists()
+
+    # The third product found the breaker open and did not call the LLM
+    assert len(calls) == 2
+    assert all(deadline is not None for deadline in calls)
+    stats = resilience.llm_breaker.stats()
+    assert stats["state"] == OPEN and stats["short_circuits"] == 1
+
+
+def test_exhausted_product_budget_skips_fallback_and_retries(tmp_path, monkeypatch):
+    monkeypatch.setattr(resilience, "llm_breaker", CircuitBreaker())
+    monkeypatch.setattr(graph, "generate_faq", lambda facts, deadline=None: pytest.fail("LLM called"))
+    result = run_product(short_faq_product(), str(tmp_path / "out"), product_timeout=0)
+    assert result["degraded"]
+    assert resilience.llm_breaker.stats()["calls"] == 0
+
+    state = PipelineState(product={}, deadline_at=time.monotonic() - 1)
+    assert validation_router(state) == graph.END
+    assert state.retry_count == 0
+
+
+def test_exhausted_product_budget_is_recorded_in_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(resilience, "llm_breaker", CircuitBreaker())
+    monkeypatch.setattr(comparison_agent, "compare_products", lambda a, b: {})
+    result = run_product(short_faq_product(), str(tmp_path / "out"), product_timeout=0)
+    assert not result["is_valid"]
+    assert result["errors"] == ["Missing comparison", "Product time budget exhausted"]
+
+
+def test_short_faq_is_accepted_only_when_the_faq_degraded():
+    faq = [{"id": str(i), "category": "Usage", "question": "Q?", "answer": "A."} for i in range(14)]
+    state = PipelineState(product={}, faq=faq, degraded=True, degraded_nodes=["comparison"])
+    assert "FAQ missing or < 15 items" in validate_outputs(state).errors
+    state = PipelineState(product={}, faq=faq, degraded=True, degraded_nodes=["faq"])
+    assert "FAQ missing or < 15 items" not in validate_outputs(state).errors
@@ -0,0 +1,59 @@
+import pytest
+from src.models import ProductModel
+from src.agents.sanity_agent import run_sanity_checks, run_batch_sanity_checks
+
+
+def make_product(pid, name="Serum", price=699.0, currency="INR", benefits=("Hydration",)):
+    return ProductModel(
+        id=pid,
+        name=name,
+        description="",
+        price=price,
+        currency=currency,
+        ingredients=["Vitamin C"],
+        benefits=list(benefits),
+        how_to_use="",
+        side_effects="",
+    )
+
+
+@pytest.fixture
+def catalog():
+    return [
+        make_product("p1"),
+        make_product("p2", name=""),
+        make_product("p3", price=-5.0, benefits=()),
+        make_product("p4", price=None),
+        make_product("p5", currency="USD", price=9.99),
+    ]
+
+
+def test_batch_matches_single_product_checks(catalog):
+    catalog.append(make_product("p6", price=float("nan")))
+    batch = run_batch_sanity_checks(catalog, catalog_rules=False)
+    single = [run_sanity_checks(p)[1] for p in catalog]
+    assert batch == single
+    assert single[3] == single[5] == ["missing_price"]
+
+
+def test_batch_flags_missing_price(catalog):
+    issues = run_batch_sanity_checks(catalog, catalog_rules=False)
+    assert issues[3] == ["missing_price"]
+
+
+def test_catalog_rules_duplicates_and_outliers():
+    products = [make_product(f"p{i}", price=100.0 + i) for i in range(10)]
+    products.append(make_product("p0", price=5000.0))
+    issues = run_batch_sanity_checks(products)
+    assert issues[0] == ["duplicate_product_id"]
+    assert issues[-1] == ["duplicate_product_id", "price_outlier"]
+    assert all(i == [] for i in issues[1:-1])
+
+
+def test_outliers_are_found_per_currency():
+    products = [make_product(f"i{i}", price=100.0 + i) for i in range(6)]
+    products += [make_product(f"u{i}", currency="USD", price=10.0 + i) for i in range(6)]
+    products.insert(3, make_product("u-big", currency="USD", price=900.0))
+    products.append(make_product("e1", currency="EUR", price=1e6))  # group too small
+    flagged = [p.id for p, i in zip(products, run_batch_sanity_checks(products)) if "price_outlier" in i]
+    assert flagged == ["u-big"]
@@ -0,0 +1,76 @@
+from src.scheduler import (
+    CONTENT_CHANGED,
+    NEW,
+    PRICE_CHANGED,
+    UNCHANGED,
+    PriorityScheduler,
+    WeightedFairQueue,
+    classify,
+    fingerprint,
+    load_manifest,
+    run_scheduled,
+)
+from tests.conftest import make_product
+
+
+def test_classify_against_previous_manifest():
+    previous = {"p1": fingerprint(make_product(1)), "p2": fingerprint(make_product(2)), "p3": fingerprint(make_product(3))}
+    reingested = make_product(1, metadata={"ingested_at": "2026-01-01T00:00:00+00:00"})
+    assert classify(reingested, previous) == UNCHANGED  # ingested_at is ignored
+    assert classify(make_product(2, price=120.0), previous) == PRICE_CHANGED
+    assert classify(make_product(3, description="New formula"), previous) == CONTENT_CHANGED
+    assert classify(make_product(4), previous) == NEW
+
+
+def test_urgent_classes_first_without_starving_bulk():
+    q = WeightedFairQueue({"urgent": 8.0, "bulk": 1.0})
+    for i in range(100):
+        q.put(f"b{i}", "bulk")
+    for i in range(10):
+        q.put(f"u{i}", "urgent")
+    first = [q.get()[0] for _ in range(11)]
+    assert first.count("urgent") == 10
+
+    q = WeightedFairQueue({"urgent": 8.0, "bulk": 1.0})
+    for i in range(90):
+        q.put(i, "urgent")
+        q.put(i, "bulk")
+    served = [q.get()[0] for _ in range(45)]
+    assert 4 <= served.count("bulk") <= 6  # about a 1/9 share
+    q.close()
+    assert len([q.get() for _ in range(135)]) == 135 and q.get() is None
+
+
+def test_run_scheduled_orders_by_class_and_updates_manifest(tmp_path):
+    manifest = str(tmp_path / "build_manifest.json")
+    catalog = [make_product(i) for i in range(20)]
+    done = []
+    report = run_scheduled(catalog, str(tmp_path), manifest, run_one=lambda p: done.append(p.id))
+    assert report[NEW]["done"] == 20 and "p95" in report[NEW]["latency_s"]
+    assert set(load_manifest(manifest)) == {p.id for p in catalog}
+
+    changed = [make_product(i, price=150.0) if i == 17 else make_product(i) for i in range(20)]
+    changed.append(make_product(99))
+    scheduler = PriorityScheduler(str(tmp_path), load_manifest(manifest), skip_unchanged=False, run_one=lambda p: None)
+    for p in changed:
+        scheduler.submit(p)
+    report = scheduler.start().join()
+    assert [pid for _, pid in scheduler.order[:2]] in (["p17", "p99"], ["p99", "p17"])
+    assert report[UNCHANGED]["done"] == 19 and report[PRICE_CHANGED]["done"] == 1
+
+    failing = PriorityScheduler(str(tmp_path), {}, skip_unchanged=True, run_one=lambda p: 1 / 0).start()
+    failing.submit(make_product(5))
+    assert failing.join()[NEW]["failed"] == 1
+    assert "p5" not in failing.manifest
+
+
+def test_workers_share_one_shard_writer(tmp_path):
+    from src.shard_writer import ShardReader
+
+    report = run_scheduled(
+        [make_product(i) for i in range(12)], str(tmp_path), workers=4, run_options={"output_mode": "shards"}
+    )
+    assert report[NEW]["done"] == 12
+    with ShardReader(str(tmp_path)) as reader:
+        assert sorted(reader.product_ids(), key=lambda pid: int(pid[1:])) == [f"p{i}" for i in range(12)]
+        assert reader.get("p7", "faq") and not (tmp_path / "p7").exists()
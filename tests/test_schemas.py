@@ -0,0 +1,58 @@
+import copy
+
+import pytest
+from pydantic import ValidationError
+
+from src import langchain_orchestrator, models
+from src.agents.validator_agent import validate_outputs
+from src.models import FAQ_VALIDATOR, ProductModel, validate_artifacts_batch
+from src.orchestrator import generate_artifacts
+from src.state import PipelineState
+
+
+def artifacts(i=1):
+    result = generate_artifacts(ProductModel.from_dict({
+        "product_id": f"p{i}",
+        "name": f"Product {i}",
+        "price": {"amount": 100.0, "currency": "INR"},
+        "ingredients": ["Vitamin C", "Glycerin"],
+        "benefits": ["Hydration"],
+    }))
+    return {key: result[key] for key in ("product_page", "faq", "comparison")}
+
+
+def test_llm_path_uses_the_shared_schemas():
+    assert not hasattr(langchain_orchestrator, "FAQItem")
+    assert langchain_orchestrator.FAQ_VALIDATOR is models.FAQ_VALIDATOR
+    faq = langchain_orchestrator._sanitize_and_fill_faq([{"question": "What is it?", "answer": "A serum"}], {})
+    assert len(faq) == 15
+
+
+def test_batch_reports_field_errors_per_item():
+    good = artifacts(1)
+    bad = copy.deepcopy(artifacts(2))
+    bad["faq"][3]["answer"] = {"source": "manual"}
+    del bad["comparison"]["verdict"]
+    errors = validate_artifacts_batch([good, bad, good])
+    assert errors[0] == [] and errors[2] == []
+    assert {(err["loc"], err["type"]) for err in errors[1]} == {
+        ("faq.3.answer", "string_type"),
+        ("comparison.verdict", "missing"),
+    }
+
+
+def test_validators_reject_wrong_types():
+    with pytest.raises(ValidationError):
+        FAQ_VALIDATOR.validate_python([{"id": "1", "category": "x", "question": "q", "answer": None}])
+
+
+def test_validate_outputs_checks_fields_of_deterministic_output():
+    state = PipelineState(product={}, **artifacts())
+    assert validate_outputs(state).is_valid
+    assert state.validation_errors == []
+
+    state.product_page["ingredients_block"] = "Vitamin C"
+    validate_outputs(state)
+    assert not state.is_valid
+    assert [err["loc"] for err in state.validation_errors] == ["product_page.ingredients_block"]
+    assert "product_page.ingredients_block" in state.error
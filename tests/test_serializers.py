@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from src.agents.renderer_agent import write_outputs
+from src.serializers import SERIALIZERS, get_serializer
+
+SAMPLE = {
+    "product_id": "sku-1",
+    "title": "Glow Serum — 10% Vitamin C",
+    "price": {"amount": 699.5, "currency": "INR"},
+    "counts": [0, 1, -1, -33, 127, 128, 255, 256, 65536, -129, 2**40, -(2**40), 2**64 - 1, -(2**63)],
+    "flags": [True, False, None],
+    "blocks": [{"id": str(i), "text": "x" * i} for i in (0, 31, 32, 255, 256, 70000)],
+    "many": list(range(20)),
+    "wide": {f"k{i}": i for i in range(20)},
+}
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_round_trip(name):
+    serializer = SERIALIZERS[name]
+    assert serializer.loads(serializer.dumps(SAMPLE)) == SAMPLE
+
+
+def test_pretty_matches_previous_output():
+    assert get_serializer("pretty").dumps(SAMPLE) == json.dumps(SAMPLE, ensure_ascii=False, indent=2).encode()
+
+
+def test_known_encodings():
+    msgpack = get_serializer("msgpack").dumps
+    cbor = get_serializer("cbor").dumps
+    assert msgpack({"a": [1, -1, None]}) == bytes([0x81, 0xA1, 0x61, 0x93, 0x01, 0xFF, 0xC0])
+    assert msgpack(1000) == b"\xcd\x03\xe8"
+    assert cbor({"a": [1, -1, None]}) == bytes([0xA1, 0x61, 0x61, 0x83, 0x01, 0x20, 0xF6])
+    assert cbor(1000) == b"\x19\x03\xe8"
+    assert cbor(1.5) == b"\xfb\x3f\xf8\x00\x00\x00\x00\x00\x00"
+    # Half-precision floats from other encoders decode too
+    assert get_serializer("cbor").loads(b"\xf9\x3e\x00") == 1.5
+
+
+def test_unsupported_values_raise():
+    with pytest.raises(TypeError):
+        get_serializer("msgpack").dumps({1, 2})
+    with pytest.raises(OverflowError):
+        get_serializer("cbor").dumps(2**64)
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
+
+
+def test_write_outputs_uses_format_extension(tmp_path):
+    page = {"product_id": "p1", "title": "T"}
+    faq = [{"question": "Q?", "answer": "A"}]
+    comparison = {"verdict": "V"}
+    write_outputs(page, faq, comparison, str(tmp_path), output_format="cbor")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["comparison_page.cbor", "faq.cbor", "product_page.cbor"]
+    assert get_serializer("cbor").loads((tmp_path / "faq.cbor").read_bytes()) == faq
+
+    write_outputs(page, faq, comparison, str(tmp_path), output_format="compact")
+    assert json.loads((tmp_path / "product_page.json").read_text(encoding="utf-8")) == page
@@ -0,0 +1,122 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+from src.agents.ingest_agent import ingest_catalog
+from src.models import ProductModel
+from src.orchestrator import generate_artifacts
+from src.server import ArtifactService, TTLCache, make_server
+
+PRODUCT = {
+    "product_id": "serum-1",
+    "name": "Glow Serum",
+    "price": {"amount": 699, "currency": "INR"},
+    "ingredients": ["Vitamin C", "Hyaluronic Acid"],
+    "benefits": ["Brightening"],
+    "metadata": {"ingested_at": "2025-01-01T00:00:00+00:00"},
+}
+
+
+def test_ingest_catalog_formats(tmp_path):
+    other = dict(PRODUCT, product_id="serum-2")
+    (tmp_path / "a.json").write_text(json.dumps([PRODUCT, other]))
+    (tmp_path / "b.json").write_text(json.dumps({"products": [PRODUCT, other]}))
+    (tmp_path / "c.jsonl").write_text(json.dumps(PRODUCT) + "\n\n" + json.dumps(other) + "\n")
+    (tmp_path / "d.json").write_text(json.dumps({"product": PRODUCT}))
+    for name, count in (("a.json", 2), ("b.json", 2), ("c.jsonl", 2), ("d.json", 1)):
+        products = ingest_catalog(str(tmp_path / name))
+        assert [p.id for p in products] == ["serum-1", "serum-2"][:count]
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts least recently used "b"
+    assert cache.get("b") is None and cache.evictions == 1
+    now[0] = 11
+    assert cache.get("a") is None and cache.expirations == 1
+
+
+def test_concurrent_requests_are_coalesced():
+    release = threading.Event()
+    calls = []
+
+    def slow_generate(product):
+        calls.append(product.id)
+        release.wait(5)
+        return generate_artifacts(product)
+
+    service = ArtifactService({"serum-1": ProductModel.from_dict(PRODUCT)}, generate=slow_generate)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get("serum-1"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while service.counters["coalesced"] + service.counters["misses"] < 8:
+        pass
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["serum-1"]
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert service.get("serum-1") is results[0]
+    stats = service.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 7, 1)
+    assert service.get("missing") is None
+
+
+def test_leader_that_finished_after_the_cache_lookup_is_not_repeated():
+    calls = []
+
+    def generate(product):
+        calls.append(product.id)
+        return generate_artifacts(product)
+
+    service = ArtifactService({"serum-1": ProductModel.from_dict(PRODUCT)}, generate=generate)
+    first = service.get("serum-1")
+    # The unlocked lookup misses just before the leader stores its result
+    lookup = service.cache.get
+    lookups = []
+
+    def racy_get(key):
+        lookups.append(key)
+        return None if len(lookups) == 1 else lookup(key)
+
+    service.cache.get = racy_get
+    assert service.get("serum-1") is first
+    assert calls == ["serum-1"]
+    assert (service.counters["misses"], service.counters["hits"]) == (1, 1)
+
+
+def test_http_endpoints():
+    service = ArtifactService({"serum-1": ProductModel.from_dict(PRODUCT)})
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/products/serum-1/faq") as resp:
+            faq = json.loads(resp.read())
+        assert len(faq) == 15
+        with urllib.request.urlopen(f"{base}/products/serum-1") as resp:
+            everything = json.loads(resp.read())
+        assert everything["faq"] == faq
+        assert everything["product_page"]["title"] == "Glow Serum"
+        assert everything["comparison"]["verdict"]
+        for path in ("/products/unknown", "/products/serum-1/reviews", "/nope"):
+            try:
+                urllib.request.urlopen(base + path)
+                raise AssertionError(path)
+            except urllib.error.HTTPError as err:
+                assert err.code == 404
+        with urllib.request.urlopen(f"{base}/stats") as resp:
+            stats = json.loads(resp.read())
+        assert stats["hits"] == 1 and stats["generated"] == 1 and stats["hit_rate"] == 0.5
+        assert "p95" in stats["latency_ms"]
+    finally:
+        server.shutdown()
+        server.server_close()
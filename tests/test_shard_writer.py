@@ -0,0 +1,57 @@
+import hashlib
+import pytest
+from src.shard_writer import ShardReader, ShardWriter
+
+
+def artifacts(i):
+    return {
+        "product_page": {"product_id": f"p{i}", "title": f"Product {i}", "text": hashlib.sha256(str(i).encode()).hexdigest() * 4},
+        "faq": [{"id": "1", "question": "Name?", "answer": f"Product {i}"}],
+    }
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "lzma"])
+def test_roundtrip_with_rotation(tmp_path, compression):
+    with ShardWriter(str(tmp_path), max_shard_bytes=2048, compression=compression, block_bytes=512) as writer:
+        for i in range(60):
+            writer.put_product(f"p{i}", artifacts(i))
+
+    assert len(list((tmp_path / "product_page").iterdir())) > 1
+    with ShardReader(str(tmp_path)) as reader:
+        assert len(reader.product_ids()) == 60
+        for i in (0, 17, 59):
+            assert reader.get_product(f"p{i}") == artifacts(i)
+
+
+def test_reopen_appends_and_rejects_other_compression(tmp_path):
+    with ShardWriter(str(tmp_path), compression="gzip") as writer:
+        writer.put_product("p0", artifacts(0))
+    with ShardWriter(str(tmp_path), compression="gzip") as writer:
+        writer.put_product("p1", artifacts(1))
+    with ShardReader(str(tmp_path)) as reader:
+        assert reader.get("p0", "faq") == artifacts(0)["faq"]
+        assert reader.get("p1", "faq") == artifacts(1)["faq"]
+    with pytest.raises(ValueError):
+        ShardWriter(str(tmp_path), compression="lzma")
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_concurrent_writers_on_one_root(tmp_path, compression):
+    import threading
+
+    def write(thread):
+        # One short-lived writer per product, as render_node used to open them
+        for i in range(thread * 40, thread * 40 + 40):
+            with ShardWriter(str(tmp_path), max_shard_bytes=8192, compression=compression) as writer:
+                writer.put_product(f"p{i}", artifacts(i))
+
+    threads = [threading.Thread(target=write, args=(t,)) for t in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with ShardReader(str(tmp_path)) as reader:
+        assert len(reader.product_ids()) == 160
+        for i in range(160):
+            assert reader.get_product(f"p{i}") == artifacts(i)
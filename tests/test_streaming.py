@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from src.orchestrator import generate_artifacts
+from src.streaming import StreamingExecutor, run_streaming
+from tests.conftest import make_product, product_data
+
+
+def test_streams_catalog_to_per_product_files(tmp_path):
+    catalog = tmp_path / "catalog.jsonl"
+    catalog.write_text("".join(json.dumps(product_data(i)) + "\n" for i in range(40)))
+    report = run_streaming(str(catalog), str(tmp_path / "out"), workers=3, writers=2, queue_size=4)
+
+    assert report["products"] == report["written"] == 40
+    assert report["failed"] == []
+    assert report["queues"]["input"]["max_depth"] <= 4
+    assert set(report["stages"]) == {"read", "generate", "write"}
+    faq = json.loads((tmp_path / "out" / "p7" / "faq.json").read_text(encoding="utf-8"))
+    assert faq == generate_artifacts(make_product(7))["faq"]
+
+
+def test_generation_failures_are_reported_and_skipped(tmp_path):
+    def generate(p):
+        if p.id == "p3":
+            raise ValueError("boom")
+        return generate_artifacts(p)
+
+    products = [make_product(i) for i in range(6)]
+    report = StreamingExecutor(str(tmp_path), workers=2, generate=generate).run(products)
+    assert report["written"] == 5
+    assert report["failed"] == [{"product_id": "p3", "error": "ValueError: boom"}]
+    assert not (tmp_path / "p3").exists()
+
+
+def test_reader_failure_aborts(tmp_path):
+    def products():
+        yield make_product(0)
+        raise OSError("disk gone")
+
+    with pytest.raises(RuntimeError) as err:
+        StreamingExecutor(str(tmp_path), workers=2).run(products())
+    assert isinstance(err.value.__cause__, OSError)
+
+
+def test_worker_base_exception_aborts_instead_of_hanging(tmp_path):
+    class Stop(BaseException):
+        pass
+
+    def generate(p):
+        if p.id == "p2":
+            raise Stop()
+        return generate_artifacts(p)
+
+    products = [make_product(i) for i in range(30)]
+    with pytest.raises(RuntimeError) as err:
+        StreamingExecutor(str(tmp_path), workers=1, queue_size=2, generate=generate).run(products)
+    assert isinstance(err.value.__cause__, Stop)
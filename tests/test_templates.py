@@ -0,0 +1,35 @@
+import pytest
+from src.agents.question_generator_agent import generate_questions
+from src.agents.template_engine_agent import render_faq, classify_question
+
+
+@pytest.fixture
+def facts():
+    return {
+        "product_id": "p1",
+        "name": "GlowBoost Vitamin C Serum",
+        "description": "A lightweight 10% Vitamin C serum.",
+        "ingredients": ["Vitamin C", "Hyaluronic Acid", "Rice Price Extract"],
+        "benefits": ["Brightening", "Hydration"],
+        "how_to_use": "Apply daily.",
+        "side_effects": "",
+        "price": {"amount": 699, "currency": "INR"},
+        "metadata": {"source": "test"},
+    }
+
+
+def test_question_intents_match_text_classification(facts):
+    for q in generate_questions(facts):
+        assert q["intent"] == classify_question(q["question"].lower()), q["question"]
+
+
+def test_intent_dispatch_matches_text_fallback(facts):
+    questions = generate_questions(facts)
+    free_form = [{k: v for k, v in q.items() if k != "intent"} for q in questions]
+    assert render_faq(questions, facts) == render_faq(free_form, facts)
+
+
+def test_free_form_question_answers(facts):
+    faq = render_faq([{"id": "1", "question": "Is there any irritation risk?"}], facts)
+    assert faq[0]["answer"] == "Patch test recommended for sensitive skin."
+    assert faq[0]["category"] == "General"
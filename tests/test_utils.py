@@ -0,0 +1,37 @@
+import os
+from src.utils import get_write_stats, reset_write_stats, write_json
+
+
+def test_write_json_skips_unchanged_content(tmp_path):
+    path = tmp_path / "out" / "faq.json"
+    reset_write_stats()
+    assert write_json({"a": 1}, str(path)) is True
+    os.utime(path, ns=(1, 1))
+    assert write_json({"a": 1}, str(path)) is False
+    assert path.stat().st_mtime_ns == 1
+    assert write_json({"a": 2}, str(path), fsync=True) is True
+    assert path.read_text(encoding="utf-8") == '{\n  "a": 2\n}'
+
+    stats = get_write_stats()
+    assert stats["files_written"] == 2
+    assert stats["files_skipped"] == 1
+    assert stats["bytes_skipped"] == len('{\n  "a": 1\n}')
+
+
+def test_write_json_is_atomic_and_keeps_permissions(tmp_path):
+    path = tmp_path / "page.json"
+    write_json({"a": 1}, str(path))
+    os.chmod(path, 0o640)
+    write_json({"a": 2}, str(path), pretty=False)
+    assert os.listdir(tmp_path) == ["page.json"]
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert path.read_text(encoding="utf-8") == '{"a": 2}'
+
+
+def test_new_files_follow_the_current_umask(tmp_path):
+    old = os.umask(0o027)
+    try:
+        write_json({"a": 1}, str(tmp_path / "new.json"))
+    finally:
+        os.umask(old)
+    assert (tmp_path / "new.json").stat().st_mode & 0o777 == 0o640
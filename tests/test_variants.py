@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from src.agents.comparison_agent import build_fictional_product_b, compare_products
+from src.agents.facts_extractor_agent import extract_facts
+from src.agents.question_generator_agent import generate_questions
+from src.agents.template_engine_agent import render_faq, render_product_page
+from src.variants import FXTable, convert_prices, fan_out_catalog, parse_variants, render_variants
+from tests.conftest import make_product
+
+FX = FXTable({"USD": 1.0, "EUR": 0.92, "INR": 83.0, "JPY": 150.0}, decimals={"JPY": 0})
+SERUM = {
+    "description": "A 10% Vitamin C serum.",
+    "ingredients": ["Vitamin C", "Hyaluronic Acid", "Glycerin"],
+    "benefits": ["Brightening", "Hydration"],
+    "how_to_use": "Apply in the morning.",
+}
+
+
+def test_convert_prices_matrix():
+    prices = convert_prices([830.0, 10.0, 699], ["INR", "USD", "INR"], ["USD", "EUR", "JPY", "INR"], FX)
+    assert prices.shape == (3, 4)
+    assert prices[0].tolist() == [10.0, 9.2, 1500.0, 830.0]
+    assert prices[1].tolist() == [10.0, 9.2, 1500.0, 830.0]
+    assert prices[2].tolist() == [8.42, 7.75, 1263.0, 699.0]
+
+
+def test_unknown_currency_rejected():
+    with pytest.raises(ValueError, match="XYZ"):
+        convert_prices([1.0], ["INR"], ["XYZ"], FX)
+
+
+def test_parse_variants():
+    assert parse_variants("us:USD, eu:eur,JPY") == [("us", "USD"), ("eu", "EUR"), ("jpy", "JPY")]
+
+
+def test_each_variant_matches_a_full_run_on_converted_facts():
+    facts = extract_facts(make_product(1, price=830.0, **SERUM))
+    questions = generate_questions(facts)
+    variants = render_variants(facts, questions, [("us", 10.0, "USD"), ("in", 830.0, "INR"), ("jp", 1500, "JPY")])
+
+    for name, amount, currency in [("us", 10.0, "USD"), ("in", 830.0, "INR"), ("jp", 1500, "JPY")]:
+        vfacts = dict(facts, price={"amount": amount, "currency": currency})
+        assert variants[name]["product_page"] == render_product_page(vfacts)
+        assert variants[name]["faq"] == render_faq(questions, vfacts)
+        assert variants[name]["comparison"] == compare_products(vfacts, build_fictional_product_b(vfacts))
+
+    # Price-independent blocks are shared, not recomputed
+    assert variants["us"]["product_page"]["summary_block"] is variants["jp"]["product_page"]["summary_block"]
+
+
+def test_fan_out_writes_per_variant_directories(tmp_path):
+    products = [make_product(1, price=830.0, **SERUM), make_product(2, price=10.0, currency="USD", **SERUM)]
+    report = fan_out_catalog(
+        products,
+        [("us", "USD"), ("in", "INR")],
+        FX,
+        str(tmp_path),
+    )
+    assert report["outputs"] == 4
+
+    page = json.loads((tmp_path / "p2" / "in" / "product_page.json").read_text())
+    assert page["price_block"] == {"amount": 830.0, "currency": "INR"}
+    # A variant in the product's own currency is the single-currency output
+    page = json.loads((tmp_path / "p1" / "in" / "product_page.json").read_text())
+    assert page == render_product_page(extract_facts(products[0]))
+    comparison = json.loads((tmp_path / "p1" / "us" / "comparison_page.json").read_text())
+    assert comparison["comparisons"][1]["common"] == ["currency: USD"]
+    assert comparison["product_B"]["price"] == {"amount": 11.5, "currency": "USD"}
@@ -0,0 +1,162 @@
+import json
+import os
+
+from src.utils import read_json
+from src.watcher import DirectoryWatcher, InotifyWakeup, scan_directory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_product(path, pid, price=100.0, mtime=None):
+    path.write_text(json.dumps({
+        "product_id": pid,
+        "name": f"Product {pid}",
+        "price": {"amount": price, "currency": "INR"},
+        "ingredients": ["Vitamin C"],
+        "benefits": ["Hydration"],
+    }))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def make_watcher(tmp_path, processed, **kw):
+    clock = FakeClock()
+    watcher = DirectoryWatcher(
+        str(tmp_path / "in"),
+        str(tmp_path / "out"),
+        debounce=1.0,
+        use_inotify=False,
+        process=lambda p: processed.append(p.id),
+        clock=clock,
+        **kw,
+    )
+    return watcher, clock
+
+
+def test_scan_ignores_hidden_and_other_files(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / ".a.json.swp").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+    assert list(scan_directory(str(tmp_path))) == [str(tmp_path / "a.json")]
+
+
+def test_debounce_and_incremental_regeneration(tmp_path):
+    (tmp_path / "in").mkdir()
+    processed = []
+    watcher, clock = make_watcher(tmp_path, processed)
+    write_product(tmp_path / "in" / "a.json", "a", mtime=1_000)
+
+    assert watcher.poll_once() == []  # still inside the quiet period
+    clock.now = 0.5
+    write_product(tmp_path / "in" / "a.json", "a", price=120.0, mtime=2_000)
+    assert watcher.poll_once() == []  # changed again: quiet period restarts
+    clock.now = 1.2
+    assert watcher.poll_once() == []
+    clock.now = 1.6
+    assert watcher.poll_once() == [str(tmp_path / "in" / "a.json")]
+    assert processed == ["a"]
+
+    # Touched but identical product: file is re-read, product is not regenerated
+    write_product(tmp_path / "in" / "a.json", "a", price=120.0, mtime=3_000)
+    catalog = [{"product_id": pid, "name": pid, "price": {"amount": 1, "currency": "INR"}} for pid in ("b", "c")]
+    (tmp_path / "in" / "catalog.jsonl").write_text("\n".join(json.dumps(p) for p in catalog))
+    clock.now = 5.0
+    watcher.poll_once()
+    clock.now = 6.0
+    watcher.poll_once()
+    assert processed == ["a", "b", "c"]
+
+    status = read_json(str(tmp_path / "out" / "watch_status.json"))
+    assert status["state"] == "idle"
+    assert status["queue_length"] == 0
+    assert status["tracked_files"] == 2
+    assert (status["processed"], status["unchanged"], status["failed"]) == (3, 1, 0)
+    assert status["last_processed_at"] is not None
+    assert set(read_json(str(tmp_path / "out" / "build_manifest.json"))["products"]) == {"a", "b", "c"}
+
+
+def test_restart_skips_products_in_manifest(tmp_path):
+    (tmp_path / "in").mkdir()
+    write_product(tmp_path / "in" / "a.json", "a")
+    processed = []
+    watcher, clock = make_watcher(tmp_path, processed)
+    watcher.poll_once()
+    clock.now = 2.0
+    watcher.poll_once()
+
+    watcher, clock = make_watcher(tmp_path, processed)
+    watcher.poll_once()
+    clock.now = 2.0
+    watcher.poll_once()
+    assert processed == ["a"]
+
+
+def test_unreadable_file_and_failures_are_reported(tmp_path):
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "broken.json").write_text("{not json")
+    write_product(tmp_path / "in" / "a.json", "a")
+
+    def fail(product):
+        raise RuntimeError("boom")
+
+    watcher = DirectoryWatcher(
+        str(tmp_path / "in"), str(tmp_path / "out"), debounce=0.0, use_inotify=False, process=fail
+    )
+    status = watcher.run(max_cycles=1)
+    assert status["state"] == "stopped"
+    assert status["failed"] == 2
+    assert "broken.json" in status["last_error"]
+    assert "a" not in watcher.manifest
+
+
+def test_inotify_wakeup(tmp_path):
+    wakeup = InotifyWakeup.create(str(tmp_path))
+    if wakeup is None:
+        return  # not Linux
+    try:
+        assert wakeup.wait(0.01) is False
+        (tmp_path / "a.json").write_text("{}")
+        assert wakeup.wait(1.0) is True
+    finally:
+        wakeup.close()
+
+
+def test_idle_polls_do_not_rewrite_status(tmp_path):
+    (tmp_path / "in").mkdir()
+    write_product(tmp_path / "in" / "a.json", "a")
+    watcher, clock = make_watcher(tmp_path, [], status_interval=30.0)
+    watcher.poll_once()
+    clock.now = 2.0
+    watcher.poll_once()
+    status_file = tmp_path / "out" / "watch_status.json"
+    os.utime(status_file, ns=(1, 1))
+
+    for now in (3.0, 10.0, 31.0):
+        clock.now = now
+        watcher.poll_once()
+        assert status_file.stat().st_mtime_ns == 1
+    clock.now = 32.5  # status_interval since the last write: last_scan_at is refreshed
+    watcher.poll_once()
+    assert status_file.stat().st_mtime_ns != 1
+
+
+def test_own_files_are_not_inputs_when_outdir_is_the_input_dir(tmp_path):
+    (tmp_path / "in").mkdir()
+    write_product(tmp_path / "in" / "a.json", "a")
+    processed = []
+    watcher = DirectoryWatcher(
+        str(tmp_path / "in"), str(tmp_path / "in"), debounce=0.0, use_inotify=False,
+        process=lambda p: processed.append(p.id),
+    )
+    watcher.poll_once()
+    assert (tmp_path / "in" / "watch_status.json").exists()
+    assert (tmp_path / "in" / "build_manifest.json").exists()
+    watcher.poll_once()
+    assert processed == ["a"]
+    assert watcher.status["tracked_files"] == 1 and watcher.status["failed"] == 0
@@ -0,0 +1,76 @@
+import threading
+
+from src.work_queue import DEAD, DONE, SQLiteWorkQueue, run_worker
+from tests.conftest import make_product
+
+
+def test_workers_share_queue_without_duplicates(tmp_path):
+    db = str(tmp_path / "queue.sqlite")
+    with SQLiteWorkQueue(db) as queue:
+        assert queue.enqueue_products(make_product(i) for i in range(60)) == 60
+        assert queue.enqueue_products([make_product(0)]) == 0  # idempotent
+
+    seen = []
+    lock = threading.Lock()
+
+    def process(p, outdir):
+        with lock:
+            seen.append(p.id)
+
+    def worker(n):
+        with SQLiteWorkQueue(db) as queue:
+            run_worker(queue, str(tmp_path), worker_id=f"w{n}", batch_size=4, process=process)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(seen) == sorted(f"p{i}" for i in range(60))
+    with SQLiteWorkQueue(db) as queue:
+        assert queue.counts()[DONE] == 60
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    now = [1000.0]
+    queue = SQLiteWorkQueue(str(tmp_path / "q.sqlite"), clock=lambda: now[0])
+    queue.enqueue_products([make_product(1)])
+    (stale,) = queue.lease("killed-worker", visibility_timeout=30)
+    assert queue.lease("other", visibility_timeout=30) == []
+
+    now[0] += 31
+    (fresh,) = queue.lease("other", visibility_timeout=30)
+    assert fresh.job_id == "p1" and fresh.attempt == 2
+    assert queue.ack(stale) is False
+    assert queue.extend(stale) is False
+    assert queue.ack(fresh) is True
+    assert queue.counts()[DONE] == 1
+
+
+def test_failures_retry_then_dead_letter(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "q.sqlite"), max_retries=2)
+    queue.enqueue_products([make_product(1), make_product(2)])
+    attempts = []
+
+    def process(p, outdir):
+        attempts.append(p.id)
+        if p.id == "p2":
+            raise ValueError("bad product")
+
+    stats = run_worker(queue, str(tmp_path), process=process, poll_interval=0)
+    assert attempts.count("p2") == 3
+    assert stats == {"processed": 1, "failed": 3, "lost": 0}
+    assert queue.counts()[DEAD] == 1
+    assert queue.dead_letters() == [{"job_id": "p2", "attempts": 3, "error": "ValueError: bad product"}]
+
+    assert queue.requeue_dead() == 1
+    assert queue.lease("w")[0].job_id == "p2"
+
+
+def test_worker_runs_graph_per_product(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "q.sqlite"))
+    queue.enqueue_products([make_product(1), make_product(2)])
+    stats = run_worker(queue, str(tmp_path / "out"))
+    assert stats["processed"] == 2
+    assert (tmp_path / "out" / "p2" / "faq.json").exists()
@@ -0,0 +1,51 @@
+import json
+import os
+
+from src.artifact_index import ArtifactIndex
+from src.worker_pool import WarmWorkerPool
+from tests.conftest import make_product
+
+
+def test_pool_runs_graph_and_recycles_workers(tmp_path):
+    with WarmWorkerPool(str(tmp_path), processes=2, recycle_after=2, output_format="compact") as pool:
+        report = pool.run([make_product(i) for i in range(5)])
+
+    assert report["products"] == 5 and report["failed"] == []
+    page = json.loads((tmp_path / "p4" / "product_page.json").read_text(encoding="utf-8"))
+    assert page["title"] == "Product 4"
+
+
+def test_pool_records_every_worker_in_one_index(tmp_path):
+    db = str(tmp_path / "index.sqlite")
+    with WarmWorkerPool(str(tmp_path), processes=2, index_path=db) as pool:
+        report = pool.run([make_product(i) for i in range(4)])
+        assert pool.index.stats["products"] == 4 and pool.index.stats["commits"] == 0
+
+    assert report["failed"] == []
+    with ArtifactIndex(db) as index:
+        assert index.products_with_benefit("Hydration") == ["p0", "p1", "p2", "p3"]
+        assert index.get_product("p2")["locations"]["faq"]["path"].endswith("faq.json")
+
+
+def test_pool_leaves_pythonpath_unchanged(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", "/opt/elsewhere")
+    with WarmWorkerPool(str(tmp_path), processes=1) as pool:
+        assert os.environ["PYTHONPATH"] == "/opt/elsewhere"
+        report = pool.run([make_product(0)])
+    assert report["failed"] == []
+
+
+def test_pool_appends_all_workers_to_one_shard_root(tmp_path):
+    from src.shard_writer import ShardReader
+
+    db = str(tmp_path / "index.sqlite")
+    root = tmp_path / "shards"
+    with WarmWorkerPool(str(root), processes=2, output_mode="shards", output_compression="gzip", index_path=db) as pool:
+        report = pool.run([make_product(i) for i in range(6)])
+
+    assert report["failed"] == []
+    with ShardReader(str(root)) as reader:
+        assert sorted(reader.product_ids()) == [f"p{i}" for i in range(6)]
+        assert reader.get("p3", "product_page")["title"] == "Product 3"
+    with ArtifactIndex(db) as index:
+        assert index.get_product("p3")["locations"]["faq"]["shard"] == "shard-00000.jsonl.gz"